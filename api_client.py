@@ -0,0 +1,194 @@
+import threading
+import time
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+import exceptions
+from circuit_breaker import CircuitBreaker
+from scheduler import TokenBucket
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 25
+
+try:
+    import brotli  # noqa: F401
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+
+
+class PracticumClient:
+    """HTTP-клиент с пулом keep-alive соединений к API Яндекс.Практикум.
+
+    Один экземпляр разделяется всеми вызовами get_api_answer: соединения
+    к одному хосту переиспользуются, и TLS-рукопожатие не повторяется
+    на каждом опросе. Запросы проходят через общий предохранитель:
+    сетевые ошибки, ответы 5xx и 429 считаются сбоями API.
+
+    Клиент запоминает валидаторы ответа (ETag, Last-Modified) для
+    каждой пары (адрес, токен) и повторяет их в условном запросе
+    с теми же параметрами. Если сервер их поддерживает, неизменившийся
+    ответ приходит как 304 без тела. Токен может быть общим у
+    нескольких подписчиков, поэтому вместе с валидаторами хранится
+    разобранный ответ (remember_answer), и на 304 любой из них получает
+    его (cached_answer); без сохраненного ответа валидаторы
+    не отправляются.
+
+    Каждый запрос ограничен таймаутами timeout = (установка соединения,
+    ожидание данных): зависший сокет завершается исключением
+    requests.Timeout и считается сбоем API.
+
+    Если задан rate_limit, запросы равномерно распределяются во времени:
+    не более rate_limit запросов в секунду, без всплесков. Момент
+    отправки запроса после этой паузы (time.perf_counter) сохраняется
+    в response.sent_at, чтобы время ответа считалось без нее.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        breaker: Optional[CircuitBreaker] = None,
+        timeout: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+        rate_limit: float = 0,
+    ) -> None:
+        """Сессия с пулом соединений, предохранителем и таймаутами."""
+        self.timeout = timeout
+        self.bucket: Optional[TokenBucket] = None
+        self.bucket_lock = threading.Lock()
+        self.limit_rate(rate_limit)
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.session = requests.Session()
+        self.session.headers['Connection'] = 'keep-alive'
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        self.validators: Dict[
+            Tuple[str, str], Tuple[tuple, dict, Optional[dict]]
+        ] = {}
+        self.validators_lock = threading.Lock()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(
+        self, url: str, headers: dict, params: dict, stream: bool = False
+    ) -> requests.Response:
+        """Выполняем GET-запрос через общий пул соединений.
+
+        При stream=True тело ответа 200 еще не прочитано, поэтому
+        успех учитывает тот, кто его дочитает (см. read_api_answer).
+        """
+        if not self.breaker.allow():
+            retry_in = self.breaker.retry_in()
+            raise exceptions.CircuitOpenError(
+                'Запрос к API не выполнен: предохранитель разомкнут, '
+                f'повтор через {retry_in:.0f} с.',
+                retry_in
+            )
+        self.throttle()
+        key = (url, headers.get('Authorization', str()))
+        params_key = tuple(sorted(params.items()))
+        sent_at = time.perf_counter()
+        try:
+            response = self.session.get(
+                url=url,
+                headers=self.conditional_headers(key, params_key, headers),
+                params=params,
+                stream=stream,
+                timeout=self.timeout,
+            )
+        except RequestException:
+            self.breaker.record_failure()
+            raise
+        response.sent_at = sent_at
+        if response.status_code == HTTPStatus.OK:
+            self.remember_validators(key, params_key, response)
+        if (
+            response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        ):
+            self.breaker.record_failure()
+        elif not stream or response.status_code != HTTPStatus.OK:
+            self.breaker.record_success()
+        return response
+
+    def limit_rate(self, rate_limit: float) -> None:
+        """Задаем предел запросов в секунду; 0 снимает ограничение."""
+        with self.bucket_lock:
+            self.bucket = (
+                TokenBucket(rate_limit, capacity=1) if rate_limit else None
+            )
+
+    def throttle(self) -> None:
+        """Ждем своей очереди в пределах rate_limit."""
+        with self.bucket_lock:
+            if self.bucket is None:
+                return
+            delay = self.bucket.consume()
+        if delay:
+            time.sleep(delay)
+
+    def conditional_headers(
+        self, key: Tuple[str, str], params_key: tuple, headers: dict
+    ) -> dict:
+        """Добавляем к заголовкам валидаторы прошлого ответа."""
+        with self.validators_lock:
+            stored = self.validators.get(key)
+        if stored is None or stored[0] != params_key or stored[2] is None:
+            return headers
+        return {**headers, **stored[1]}
+
+    def remember_validators(
+        self, key: Tuple[str, str], params_key: tuple,
+        response: requests.Response
+    ) -> None:
+        """Запоминаем ETag и Last-Modified успешного ответа."""
+        validators = {}
+        if 'ETag' in response.headers:
+            validators['If-None-Match'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            validators['If-Modified-Since'] = response.headers[
+                'Last-Modified'
+            ]
+        with self.validators_lock:
+            if validators:
+                self.validators[key] = (params_key, validators, None)
+            else:
+                self.validators.pop(key, None)
+
+    def remember_answer(
+        self, url: str, headers: dict, params: dict, answer: dict
+    ) -> None:
+        """Запоминаем разобранный ответ, к которому относятся валидаторы."""
+        key = (url, headers.get('Authorization', str()))
+        params_key = tuple(sorted(params.items()))
+        with self.validators_lock:
+            stored = self.validators.get(key)
+            if stored is not None and stored[0] == params_key:
+                self.validators[key] = (params_key, stored[1], answer)
+
+    def cached_answer(
+        self, url: str, headers: dict, params: dict
+    ) -> Optional[dict]:
+        """Ответ, который сервер подтвердил ответом 304, или None."""
+        key = (url, headers.get('Authorization', str()))
+        params_key = tuple(sorted(params.items()))
+        with self.validators_lock:
+            stored = self.validators.get(key)
+        if stored is None or stored[0] != params_key:
+            return None
+        return stored[2]
+
+    def close(self) -> None:
+        """Закрываем все соединения пула."""
+        self.session.close()
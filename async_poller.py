@@ -0,0 +1,329 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Union
+
+from telegram import Bot
+
+import exceptions
+import homework
+import log_config
+from checkpoint import AccountCheckpoints
+from history import TransitionHistory
+from send_queue import GLOBAL_RATE, SendQueue
+from status_index import StatusIndex
+
+ACCOUNTS_PATH = os.getenv(
+    'ACCOUNTS_PATH', os.path.join(homework.BASE_DIR, 'accounts.json')
+)
+ACCOUNTS_CHECKPOINT_PATH = os.getenv(
+    'ACCOUNTS_CHECKPOINT_PATH',
+    os.path.join(homework.BASE_DIR, 'accounts_checkpoint.sqlite3'),
+)
+POLLER_CONCURRENCY = int(
+    os.getenv('POLLER_CONCURRENCY', homework.API_POOL_SIZE)
+)
+ACCOUNT_KEYS = ('name', 'practicum_token', 'chat_id')
+
+logger = logging.getLogger(__name__)
+
+
+class Account:
+    """Аккаунт студента: токен Яндекс.Практикум и чат для уведомлений."""
+
+    __slots__ = (
+        'name', 'headers', 'chat_id', 'current_timestamp', 'last_message',
+        'history', 'status_index', 'scheduler', 'errors', 'dashboard',
+        'checkpoints',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        practicum_token: str,
+        chat_id: Union[int, str],
+        history: Optional[TransitionHistory] = None,
+    ) -> None:
+        """Аккаунт с токеном practicum_token и чатом chat_id."""
+        self.name = name
+        self.headers = {'Authorization': f'OAuth {practicum_token}'}
+        self.chat_id = chat_id
+        self.current_timestamp = 0
+        self.last_message = str()
+        self.history = history or TransitionHistory()
+        self.status_index = StatusIndex(self.history)
+        self.scheduler = homework.build_scheduler(key=name)
+        self.errors = homework.build_error_aggregator()
+        self.dashboard = None
+        self.checkpoints: Optional[AccountCheckpoints] = None
+
+    def restore(self, checkpoints: AccountCheckpoints) -> None:
+        """Продолжаем с контрольной точки аккаунта и сохраняем ее дальше."""
+        state = checkpoints.load(self.name)
+        self.current_timestamp = state['current_timestamp']
+        self.last_message = state['message']
+        self.checkpoints = checkpoints
+
+    def save(self) -> None:
+        """Сохраняем контрольную точку; сбой только записываем в журнал."""
+        if self.checkpoints is None:
+            return
+        try:
+            self.checkpoints.save(
+                self.name, self.current_timestamp, self.last_message
+            )
+        except sqlite3.Error as error:
+            logger.error(
+                f'{self.name}: не удалось сохранить контрольную точку: '
+                f'{error}'
+            )
+
+
+def read_account_entries(path: str) -> List[dict]:
+    """Читаем и проверяем описания аккаунтов из JSON-файла конфигурации."""
+    with open(path, encoding='UTF-8') as file:
+        data = json.load(file)
+    if not isinstance(data, list):
+        raise exceptions.IncorrectTypeError(
+            f'Файл {path} должен содержать список аккаунтов.'
+        )
+    for entry in data:
+        missing = [key for key in ACCOUNT_KEYS if key not in entry]
+        if missing:
+            raise exceptions.MissingKeyError(
+                f'В описании аккаунта {entry} отсутствуют ключи: {missing}.'
+            )
+    return data
+
+
+def open_checkpoints(
+    path: str = ACCOUNTS_CHECKPOINT_PATH,
+) -> Optional[AccountCheckpoints]:
+    """Хранилище контрольных точек аккаунтов; None, если путь пустой."""
+    if not path:
+        return None
+    return AccountCheckpoints(path)
+
+
+def build_accounts(
+    entries: List[dict], checkpoints: Optional[AccountCheckpoints] = None
+) -> List[Account]:
+    """Создаем аккаунты по их описаниям.
+
+    Если задано хранилище checkpoints, аккаунты продолжают опрос
+    с сохраненных в нем временных меток.
+    """
+    accounts = [
+        Account(
+            entry['name'], entry['practicum_token'], entry['chat_id'],
+            homework.build_history(len(entries)),
+        )
+        for entry in entries
+    ]
+    if checkpoints is not None:
+        for account in accounts:
+            account.restore(checkpoints)
+    return accounts
+
+
+def load_accounts(
+    path: str, checkpoints: Optional[AccountCheckpoints] = None
+) -> List[Account]:
+    """Загружаем список аккаунтов из JSON-файла конфигурации."""
+    return build_accounts(read_account_entries(path), checkpoints)
+
+
+def poll_account(send_queue: SendQueue, account: Account) -> float:
+    """Одна итерация опроса аккаунта по сценарию homework.main().
+
+    Сообщение ставится в общую очередь отправки, функция возвращает
+    паузу до следующего опроса этого аккаунта.
+    """
+    response, homeworks, message, retry_after = homework.poll_statuses(
+        account.current_timestamp,
+        account.headers,
+        account.status_index,
+        account.errors,
+        account.dashboard,
+        log_prefix=f'{account.name}: ',
+    )
+    if response is not None:
+        account.current_timestamp = response['current_date']
+        account.scheduler.observe_many(homeworks)
+    elif message == account.last_message:
+        message = str()
+    homework.update_dashboard(send_queue, account.dashboard)
+    message = homework.join_messages(message, account.errors.digest())
+    if message:
+        send_queue.put(account.chat_id, message)
+        account.last_message = message
+    else:
+        logger.debug(
+            f'{account.name}: статус проверки домашней работы не изменился.'
+        )
+    account.save()
+    return account.scheduler.next_delay(retry_after)
+
+
+def ingest_account_homeworks(
+    accounts: Dict[str, Account],
+    send_queue: SendQueue,
+    name: Optional[str],
+    homeworks: List[dict],
+) -> None:
+    """Передаем записи, принятые вебхуком, в разбор и отправку аккаунта."""
+    account = accounts.get(name)
+    if account is None:
+        raise exceptions.MissingKeyError(f'Неизвестный аккаунт: {name}.')
+    message = homework.deliver_statuses(
+        send_queue,
+        account.chat_id,
+        account.status_index,
+        homeworks,
+        account.dashboard,
+    )
+    if message:
+        account.last_message = message
+        account.save()
+
+
+class AsyncPoller:
+    """Конкурентный опрос множества аккаунтов в одном процессе.
+
+    Блокирующие вызовы requests и python-telegram-bot выполняются
+    в пуле потоков, а event loop лишь планирует опросы. Семафор
+    ограничивает число одновременных опросов, поэтому пул потоков
+    и пул HTTP-соединений API_CLIENT не переполняются.
+    """
+
+    def __init__(
+        self,
+        send_queue: SendQueue,
+        accounts: List[Account],
+        concurrency: int = POLLER_CONCURRENCY,
+    ) -> None:
+        """Опрос accounts не более чем concurrency одновременно."""
+        self.send_queue = send_queue
+        self.accounts = accounts
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='poller'
+        )
+
+    async def poll(
+        self, account: Account, semaphore: asyncio.Semaphore
+    ) -> float:
+        """Опрашиваем аккаунт, соблюдая ограничение конкурентности."""
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            return await loop.run_in_executor(
+                self.executor, poll_account, self.send_queue, account
+            )
+
+    async def run_account(
+        self, account: Account, semaphore: asyncio.Semaphore
+    ) -> None:
+        """Бесконечный цикл опроса одного аккаунта."""
+        await asyncio.sleep(account.scheduler.initial_delay())
+        while True:
+            delay = homework.RETRY_TIME
+            try:
+                delay = await self.poll(account, semaphore)
+            except Exception as error:
+                logger.error(f'{account.name}: сбой опроса: {error}')
+            await asyncio.sleep(delay)
+
+    async def run(self) -> None:
+        """Запускаем опрос всех аккаунтов."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info(
+            f'Запущен опрос аккаунтов: {len(self.accounts)}, '
+            f'одновременно: {self.concurrency}.'
+        )
+        try:
+            await asyncio.gather(*(
+                self.run_account(account, semaphore)
+                for account in self.accounts
+            ))
+        finally:
+            self.executor.shutdown(wait=False)
+
+
+def run_accounts(
+    accounts: List[Account],
+    global_rate: float = GLOBAL_RATE,
+    servers: bool = True,
+    outbox_path: str = homework.OUTBOX_PATH,
+    history_path: str = homework.HISTORY_PATH,
+    on_start: Optional[Callable[[SendQueue], None]] = None,
+) -> None:
+    """Опрашиваем аккаунты до остановки процесса.
+
+    global_rate - доля общего лимита отправки Telegram, доступная
+    процессу; servers включает сервер метрик, прием вебхука и ответы
+    на команды; outbox_path - общий файл недоставленных сообщений,
+    из которого процесс разбирает только чаты своих аккаунтов;
+    history_path - общий файл снимков истории переходов аккаунтов;
+    on_start получает запущенную очередь отправки.
+    """
+    bot = Bot(token=homework.TELEGRAM_TOKEN)
+    snapshots = homework.start_history_snapshots(
+        {account.name: account.history for account in accounts},
+        history_path,
+    )
+    messages = homework.open_dashboard_messages()
+    for account in accounts:
+        account.dashboard = homework.build_dashboard(
+            bot, account.chat_id, account.history, messages
+        )
+    send_queue = SendQueue(
+        partial(homework.send_to_chat, bot),
+        global_rate=global_rate,
+        outbox=homework.build_outbox(
+            outbox_path, {account.chat_id for account in accounts}
+        ),
+    )
+    send_queue.start()
+    if on_start is not None:
+        on_start(send_queue)
+    if servers:
+        homework.start_servers(partial(
+            ingest_account_homeworks,
+            {account.name: account for account in accounts},
+            send_queue,
+        ))
+        homework.start_commands(bot, send_queue, {
+            str(account.chat_id): account.history for account in accounts
+        })
+    try:
+        asyncio.run(AsyncPoller(send_queue, accounts).run())
+    finally:
+        send_queue.stop()
+        if snapshots is not None:
+            snapshots.stop()
+
+
+def main() -> None:
+    """Опрос всех аккаунтов из файла конфигурации одним процессом."""
+    logger.info('Программа запущена в режиме нескольких аккаунтов!')
+    if not homework.TELEGRAM_TOKEN:
+        message = 'Недоступна переменная окружения!'
+        logger.critical(message)
+        sys.exit(message)
+    run_accounts(load_accounts(ACCOUNTS_PATH, open_checkpoints()))
+
+
+if __name__ == '__main__':
+    log_listener = log_config.setup_logging(homework.FORMAT)
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info('Работа программы завершена.')
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
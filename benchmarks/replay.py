@@ -0,0 +1,301 @@
+import argparse
+import io
+import json
+import logging
+import platform
+import random
+import sys
+import time
+from bisect import bisect_right
+from http import HTTPStatus
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import homework
+from benchmarks.run_benchmark import percentile, publish, revision
+from circuit_breaker import CircuitBreaker
+from error_digest import ErrorAggregator
+from history import TransitionHistory, parse_timestamp
+from status_index import StatusIndex
+
+REPLAY_CHAT_ID = 'replay'
+REPLAY_TOKEN = 'replay'
+
+Signature = Tuple[Hashable, str, str]
+
+
+def homework_key(record: dict) -> Hashable:
+    """Ключ работы, как в StatusIndex."""
+    return record.get('id', record['homework_name'])
+
+
+def signature(record: dict) -> Signature:
+    """Переход статуса: работа, статус и время изменения."""
+    return (
+        homework_key(record),
+        record['status'],
+        record.get('date_updated') or str(),
+    )
+
+
+def event_time(record: dict, current_date: float) -> float:
+    """Момент перехода: date_updated или, если его нет, время ответа."""
+    at = parse_timestamp(record.get('date_updated'))
+    return float(current_date) if at is None else at
+
+
+def read_recording(path: str) -> List[dict]:
+    """Читаем записанные ответы homework_statuses (JSON Lines)."""
+    with open(path, encoding='UTF-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class VirtualClock:
+    """Виртуальные часы: sleep мгновенно переводит время вперед."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        """Часы, показывающие время start."""
+        self.now = start
+
+    def __call__(self) -> float:
+        """Текущее виртуальное время."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Переводим часы на seconds секунд."""
+        self.now += max(0.0, seconds)
+
+
+class Timeline:
+    """Переходы статусов из записанных ответов API, упорядоченные по времени.
+
+    Одинаковые записи из разных ответов считаются одним переходом.
+    """
+
+    def __init__(self, responses: List[dict]) -> None:
+        """Собираем переходы из ответов responses."""
+        events = {}
+        for response in responses:
+            for record in response.get('homeworks') or []:
+                events.setdefault(signature(record), (
+                    event_time(record, response['current_date']), record
+                ))
+        ordered = sorted(events.values(), key=lambda event: event[0])
+        self.times = [at for at, _ in ordered]
+        self.records = [record for _, record in ordered]
+        self.event_times: Dict[Signature, float] = {
+            key: at for key, (at, _) in events.items()
+        }
+
+    def changes(self, from_date: float, now: float) -> List[dict]:
+        """Работы, изменившиеся с from_date по now, от новых к старым.
+
+        Как и API, для каждой работы возвращается ее последний статус.
+        """
+        seen = set()
+        records = []
+        for number in range(bisect_right(self.times, now) - 1, -1, -1):
+            if self.times[number] < from_date:
+                break
+            key = homework_key(self.records[number])
+            if key not in seen:
+                seen.add(key)
+                records.append(self.records[number])
+        return records
+
+    def time_of(self, record: dict) -> Optional[float]:
+        """Момент перехода из записи или None, если его там нет."""
+        return self.event_times.get(signature(record))
+
+    def __len__(self) -> int:
+        """Число переходов в записи."""
+        return len(self.times)
+
+
+class ReplayResponse:
+    """Ответ API в том виде, в каком его разбирает request_api_answer."""
+
+    def __init__(self, body: dict) -> None:
+        """Ответ со статусом 200 и телом body."""
+        self.status_code = HTTPStatus.OK
+        self.headers = {}
+        self.content = json.dumps(body, ensure_ascii=False).encode()
+        self.raw = io.BytesIO(self.content)
+
+
+class ReplayClient:
+    """Замена API_CLIENT: отвечает по записи на виртуальных часах."""
+
+    def __init__(self, timeline: Timeline, clock: VirtualClock) -> None:
+        """Клиент по переходам timeline на часах clock."""
+        self.timeline = timeline
+        self.clock = clock
+        self.breaker = CircuitBreaker(clock=clock)
+        self.calls = 0
+
+    def get(
+        self, url: str, headers: dict, params: dict, stream: bool = False
+    ) -> ReplayResponse:
+        """Ответ API на момент виртуального времени."""
+        self.calls += 1
+        now = self.clock()
+        return ReplayResponse({
+            'homeworks': self.timeline.changes(params['from_date'], now),
+            'current_date': int(now),
+        })
+
+    def remember_answer(
+        self, url: str, headers: dict, params: dict, answer: dict
+    ) -> None:
+        """Запись не отвечает 304, поэтому ответы не запоминаются."""
+
+    def cached_answer(
+        self, url: str, headers: dict, params: dict
+    ) -> Optional[dict]:
+        """Сохраненных ответов нет."""
+        return None
+
+
+class ReplayQueue:
+    """Замена очереди отправки: запоминает сообщения и время их отправки."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        """Пустая очередь на часах clock."""
+        self.clock = clock
+        self.messages: List[Tuple[float, Union[int, str], str]] = []
+
+    def put(self, chat_id: Union[int, str], text: str) -> None:
+        """Сообщение считается отправленным сразу."""
+        self.messages.append((self.clock(), chat_id, text))
+
+    def __len__(self) -> int:
+        """Число отправленных сообщений."""
+        return len(self.messages)
+
+
+class ReplayHistory(TransitionHistory):
+    """История переходов, которая считает задержку уведомления.
+
+    Задержка - время от перехода в записи до его обнаружения ботом;
+    уведомление о нем ставится в очередь в том же цикле опроса.
+    """
+
+    def __init__(self, timeline: Timeline, clock: VirtualClock) -> None:
+        """История переходов timeline на часах clock."""
+        super().__init__()
+        self.timeline = timeline
+        self.clock = clock
+        self.delays: List[float] = []
+
+    def record(self, homework: dict, timestamp: float = None) -> None:
+        """Запоминаем переход и его задержку по виртуальным часам."""
+        now = self.clock()
+        at = self.timeline.time_of(homework)
+        if at is not None:
+            self.delays.append(now - at)
+        super().record(homework, now if timestamp is None else timestamp)
+
+
+def replay(responses: List[dict], seed: int = 0, tail: float = None) -> dict:
+    """Прогоняем цикл опроса бота по записи на виртуальных часах.
+
+    Часы стартуют в момент первого перехода и останавливаются через
+    tail секунд (по умолчанию POLL_MAX_INTERVAL) после последнего.
+    На время прогона API_CLIENT и кэш ответов подменяются.
+    """
+    timeline = Timeline(responses)
+    if not len(timeline):
+        raise ValueError('В записи нет ни одного перехода статуса.')
+    if tail is None:
+        tail = homework.POLL_MAX_INTERVAL
+    clock = VirtualClock(timeline.times[0])
+    end = timeline.times[-1] + tail
+    client = ReplayClient(timeline, clock)
+    history = ReplayHistory(timeline, clock)
+    send_queue = ReplayQueue(clock)
+    saved = homework.API_CLIENT, homework.RESPONSE_CACHE
+    homework.API_CLIENT, homework.RESPONSE_CACHE = client, None
+    random.seed(seed)
+    try:
+        homework.poll_loop(
+            send_queue,
+            REPLAY_CHAT_ID,
+            {'Authorization': f'OAuth {REPLAY_TOKEN}'},
+            homework.build_scheduler(key=REPLAY_TOKEN),
+            StatusIndex(history),
+            ErrorAggregator(
+                homework.ERROR_SUPPRESS_WINDOW,
+                homework.ERROR_DIGEST_INTERVAL,
+                clock=clock,
+            ),
+            sleep=clock.sleep,
+            running=lambda: clock() <= end,
+        )
+    finally:
+        homework.API_CLIENT, homework.RESPONSE_CACHE = saved
+    return {
+        'simulated_seconds': round(clock() - timeline.times[0], 3),
+        'transitions': len(timeline),
+        'api_calls': client.calls,
+        'messages_sent': len(send_queue),
+        'notified_transitions': len(history.delays),
+        **delay_summary(history.delays),
+    }
+
+
+def delay_summary(delays: List[float]) -> dict:
+    """Средняя, p50, p95 и максимальная задержка уведомления в секундах."""
+    if not delays:
+        return dict.fromkeys(
+            ('delay_mean_s', 'delay_p50_s', 'delay_p95_s', 'delay_max_s')
+        )
+    return {
+        'delay_mean_s': round(sum(delays) / len(delays), 3),
+        'delay_p50_s': round(percentile(delays, 0.5), 3),
+        'delay_p95_s': round(percentile(delays, 0.95), 3),
+        'delay_max_s': round(max(delays), 3),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Прогон по файлу записи."""
+    responses = read_recording(args.recording)
+    start = time.perf_counter()
+    report = replay(responses, seed=args.seed, tail=args.tail)
+    return {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'elapsed_seconds': round(time.perf_counter() - start, 3),
+        **report,
+    }
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Параметры прогона."""
+    parser = argparse.ArgumentParser(
+        description='Прогон бота по записанным ответам API '
+                    'на виртуальных часах.'
+    )
+    parser.add_argument(
+        'recording',
+        help='Файл с ответами homework_statuses, по одному JSON в строке',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--tail', type=float,
+        help='Сколько секунд опрашивать после последнего перехода',
+    )
+    parser.add_argument(
+        '--output', help='Файл, в который дописывается результат (JSON Lines)'
+    )
+    parser.add_argument('--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if arguments.verbose else logging.CRITICAL,
+        stream=sys.stderr,
+    )
+    publish(run(arguments), arguments.output)
@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List
+
+from telegram import Bot
+
+import api_client
+import async_poller
+import homework
+from benchmarks.stub_servers import (
+    PracticumHandler, StubConfig, StubServer, TelegramHandler
+)
+from send_queue import SendQueue
+
+ENDPOINT_PATH = '/api/user_api/homework_statuses/'
+BENCH_TELEGRAM_TOKEN = '123456:benchmark'
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def revision() -> str:
+    """Текущая ревизия репозитория для сравнения запусков."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def make_accounts(count: int) -> List[async_poller.Account]:
+    """Аккаунты для прогона."""
+    return [
+        async_poller.Account(f'student{number}', f'token{number}', number)
+        for number in range(count)
+    ]
+
+
+def timed_poll(
+    send_queue: SendQueue, account: async_poller.Account
+) -> float:
+    """Длительность одного цикла опроса аккаунта."""
+    start = time.perf_counter()
+    async_poller.poll_account(send_queue, account)
+    return time.perf_counter() - start
+
+
+def run_round(
+    executor: ThreadPoolExecutor,
+    send_queue: SendQueue,
+    accounts: List[async_poller.Account],
+) -> List[float]:
+    """Один цикл опроса всех аккаунтов."""
+    return list(executor.map(partial(timed_poll, send_queue), accounts))
+
+
+def memory_per_account(
+    executor: ThreadPoolExecutor, send_queue: SendQueue, count: int
+) -> float:
+    """Прирост памяти Python на аккаунт после первого цикла опроса."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    accounts = make_accounts(count)
+    run_round(executor, send_queue, accounts)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Прогон бота против локальных заглушек."""
+    practicum_config = StubConfig(
+        latency=args.api_latency,
+        error_rate=args.api_error_rate,
+        homeworks=args.homeworks,
+        comment_size=args.comment_size,
+        change_rate=args.change_rate,
+        seed=args.seed,
+    )
+    telegram_config = StubConfig(
+        latency=args.telegram_latency,
+        error_rate=args.telegram_error_rate,
+        seed=args.seed,
+    )
+    saved = homework.ENDPOINT, homework.API_CLIENT
+    with StubServer(PracticumHandler, practicum_config) as practicum, \
+            StubServer(TelegramHandler, telegram_config) as telegram_stub:
+        homework.ENDPOINT = practicum.url + ENDPOINT_PATH
+        homework.API_CLIENT = api_client.PracticumClient(
+            pool_maxsize=args.concurrency
+        )
+        try:
+            bot = Bot(
+                token=BENCH_TELEGRAM_TOKEN, base_url=telegram_stub.url + '/bot'
+            )
+            send_queue = SendQueue(
+                partial(homework.send_to_chat, bot),
+                global_rate=args.send_rate,
+                chat_interval=0,
+            )
+            send_queue.start()
+            accounts = make_accounts(args.accounts)
+            latencies = []
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                start = time.perf_counter()
+                for _ in range(args.rounds):
+                    latencies.extend(run_round(executor, send_queue, accounts))
+                elapsed = time.perf_counter() - start
+                memory = memory_per_account(
+                    executor, send_queue, args.memory_accounts
+                )
+            send_queue.stop()
+            api_requests = practicum.requests
+            messages_sent = telegram_stub.requests
+        finally:
+            homework.API_CLIENT.close()
+            homework.ENDPOINT, homework.API_CLIENT = saved
+    return {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'polls': len(latencies),
+        'elapsed_seconds': round(elapsed, 3),
+        'polls_per_second': round(len(latencies) / elapsed, 1),
+        'cycle_p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'cycle_p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'memory_per_account_bytes': round(memory),
+        'api_requests': api_requests,
+        'messages_sent': messages_sent,
+        'messages_pending': len(send_queue),
+    }
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Параметры прогона."""
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный прогон бота против локальных заглушек.'
+    )
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--homeworks', type=int, default=5)
+    parser.add_argument('--comment-size', type=int, default=200)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--api-latency', type=float, default=0.005)
+    parser.add_argument('--api-error-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-latency', type=float, default=0.005)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.0)
+    parser.add_argument('--send-rate', type=float, default=1000)
+    parser.add_argument('--memory-accounts', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--output', help='Файл, в который дописывается результат (JSON Lines)'
+    )
+    parser.add_argument('--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+
+def publish(report: dict, output: str = None) -> None:
+    """Выводим результат в JSON и дописываем его в файл результатов."""
+    line = json.dumps(report, ensure_ascii=False)
+    print(line)
+    if output:
+        with open(output, 'a', encoding='UTF-8') as file:
+            file.write(line + '\n')
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if arguments.verbose else logging.CRITICAL,
+        stream=sys.stderr,
+    )
+    publish(run(arguments), arguments.output)
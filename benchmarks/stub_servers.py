@@ -0,0 +1,171 @@
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+
+
+class StubConfig:
+    """Поведение заглушки: задержка, доля ошибок и размер ответа."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        homeworks: int = 1,
+        comment_size: int = 100,
+        change_rate: float = 0.1,
+        seed: int = 0,
+    ) -> None:
+        """Параметры ответов заглушки."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.homeworks = homeworks
+        self.comment_size = comment_size
+        self.change_rate = change_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def roll(self, rate: float) -> bool:
+        """Случайное событие с заданной вероятностью."""
+        with self.lock:
+            return self.random.random() < rate
+
+    def choice(self, options: tuple) -> object:
+        """Случайный элемент последовательности."""
+        with self.lock:
+            return self.random.choice(options)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков заглушек."""
+
+    protocol_version = 'HTTP/1.1'
+    config: StubConfig = None
+
+    def send_json(self, status: int, data: object) -> None:
+        """Отправляем JSON-ответ с keep-alive."""
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def count_request(self) -> int:
+        """Учитываем запрос и возвращаем его порядковый номер."""
+        with self.server.lock:
+            self.server.requests += 1
+            return self.server.requests
+
+    def log_message(self, format: str, *args) -> None:
+        """Не пишем каждый запрос в журнал."""
+
+
+class PracticumHandler(StubHandler):
+    """Заглушка эндпоинта homework_statuses."""
+
+    def do_GET(self) -> None:
+        """Отдаем список домашних работ."""
+        self.count_request()
+        if self.config.latency:
+            time.sleep(self.config.latency)
+        if self.config.roll(self.config.error_rate):
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {})
+            return
+        changed = self.config.roll(self.config.change_rate)
+        homeworks = [
+            {
+                'id': number,
+                'homework_name': f'hw{number}',
+                'status': (
+                    self.config.choice(STATUSES) if changed
+                    else STATUSES[number % len(STATUSES)]
+                ),
+                'date_updated': '2022-01-01T10:00:00Z',
+                'lesson_name': 'Итоговый проект',
+                'reviewer_comment': 'ж' * self.config.comment_size,
+            }
+            for number in range(self.config.homeworks)
+        ]
+        self.send_json(
+            HTTPStatus.OK,
+            {'homeworks': homeworks, 'current_date': int(time.time())},
+        )
+
+
+class TelegramHandler(StubHandler):
+    """Заглушка метода sendMessage Telegram Bot API."""
+
+    def do_POST(self) -> None:
+        """Принимаем сообщение."""
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if self.config.latency:
+            time.sleep(self.config.latency)
+        if self.config.roll(self.config.error_rate):
+            self.send_json(HTTPStatus.TOO_MANY_REQUESTS, {
+                'ok': False,
+                'error_code': HTTPStatus.TOO_MANY_REQUESTS,
+                'description': 'Too Many Requests',
+                'parameters': {'retry_after': 1},
+            })
+            return
+        self.send_json(HTTPStatus.OK, {
+            'ok': True,
+            'result': {
+                'message_id': self.count_request(),
+                'date': int(time.time()),
+                'chat': {'id': payload.get('chat_id', 0), 'type': 'private'},
+                'text': payload.get('text', ''),
+            },
+        })
+
+
+class BacklogHTTPServer(ThreadingHTTPServer):
+    """Сервер с очередью подключений, рассчитанной на параллельных клиентов."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubServer:
+    """HTTP-заглушка в фоновом потоке на свободном локальном порту."""
+
+    def __init__(self, handler: type, config: StubConfig) -> None:
+        """Сервер на свободном порту с обработчиком handler."""
+        handler_class = type(
+            handler.__name__, (handler,), {'config': config}
+        )
+        self.server = BacklogHTTPServer(('127.0.0.1', 0), handler_class)
+        self.server.requests = 0
+        self.server.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Адрес заглушки."""
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def requests(self) -> int:
+        """Число обработанных запросов."""
+        return self.server.requests
+
+    def __enter__(self) -> 'StubServer':
+        """Запускаем заглушку."""
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Останавливаем заглушку и освобождаем порт."""
+        self.server.shutdown()
+        self.server.server_close()
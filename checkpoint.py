@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Optional, Union
+
+SQLITE_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Контрольная точка состояния бота, переживающая перезапуск.
+
+    Файл перезаписывается атомарно: данные пишутся во временный файл
+    в том же каталоге и подменяют прежний через os.replace, поэтому
+    при падении процесса на диске остается либо старая, либо новая
+    версия, но не обрезанная.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Контрольная точка в файле path."""
+        self.path = path
+
+    def load(self) -> dict:
+        """Загружаем сохраненную временную метку и последнее сообщение."""
+        state = {'current_timestamp': 0, 'message': str()}
+        try:
+            with open(self.path, encoding='UTF-8') as file:
+                data = json.load(file)
+            current_timestamp = int(data['current_timestamp'])
+            message = str(data['message'])
+        except FileNotFoundError:
+            return state
+        except (OSError, ValueError, TypeError, KeyError) as error:
+            logger.warning(
+                f'Не удалось прочитать контрольную точку {self.path}: {error}'
+            )
+            return state
+        state['current_timestamp'] = current_timestamp
+        state['message'] = message
+        return state
+
+    def save(self, current_timestamp: int, message: str) -> None:
+        """Атомарно сохраняем временную метку и последнее сообщение."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix='.checkpoint-', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(descriptor, 'w', encoding='UTF-8') as file:
+                json.dump(
+                    {
+                        'current_timestamp': current_timestamp,
+                        'message': message,
+                    },
+                    file,
+                    ensure_ascii=False,
+                )
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+class AccountCheckpoints:
+    """Контрольные точки аккаунтов в файле SQLite, по имени аккаунта.
+
+    Файл общий для всех процессов супервизора: воркер, получивший
+    аккаунт после перезапуска или перебалансировки, продолжает опрос
+    с сохраненной временной метки, а не запрашивает всю историю.
+    Соединение открывается в том процессе, который его использует.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Открываем файл path и создаем таблицу контрольных точек."""
+        self.path = path
+        self.connection = sqlite3.connect(
+            path, timeout=SQLITE_TIMEOUT, check_same_thread=False,
+            isolation_level=None,
+        )
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS checkpoints ('
+                'name TEXT PRIMARY KEY, from_date INTEGER NOT NULL, '
+                'message TEXT NOT NULL)'
+            )
+
+    def load(self, name: str) -> dict:
+        """Сохраненная временная метка и последнее сообщение аккаунта."""
+        state = {'current_timestamp': 0, 'message': str()}
+        try:
+            with self.lock:
+                row = self.connection.execute(
+                    'SELECT from_date, message FROM checkpoints '
+                    'WHERE name = ?',
+                    (name,),
+                ).fetchone()
+        except sqlite3.Error as error:
+            logger.warning(
+                f'Не удалось прочитать контрольную точку {name}: {error}'
+            )
+            return state
+        if row is not None:
+            state['current_timestamp'], state['message'] = row
+        return state
+
+    def save(self, name: str, current_timestamp: int, message: str) -> None:
+        """Сохраняем временную метку и последнее сообщение аккаунта."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO checkpoints '
+                '(name, from_date, message) VALUES (?, ?, ?)',
+                (name, current_timestamp, message),
+            )
+
+    def close(self) -> None:
+        """Закрываем соединение с базой."""
+        with self.lock:
+            self.connection.close()
+
+
+class DashboardMessages:
+    """Номера сообщений-сводок в файле SQLite, по чату.
+
+    После перезапуска сводка продолжает редактировать закрепленное
+    сообщение, а не отправляет и не закрепляет новое. Файл общий для
+    всех процессов супервизора.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Открываем файл path и создаем таблицу сводок."""
+        self.path = path
+        self.connection = sqlite3.connect(
+            path, timeout=SQLITE_TIMEOUT, check_same_thread=False,
+            isolation_level=None,
+        )
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS dashboards ('
+                'chat_id TEXT PRIMARY KEY, message_id INTEGER NOT NULL)'
+            )
+
+    def load(self, chat_id: Union[int, str]) -> Optional[int]:
+        """Номер сообщения-сводки чата или None, если его нет."""
+        try:
+            with self.lock:
+                row = self.connection.execute(
+                    'SELECT message_id FROM dashboards WHERE chat_id = ?',
+                    (str(chat_id),),
+                ).fetchone()
+        except sqlite3.Error as error:
+            logger.warning(
+                f'Не удалось прочитать сводку чата {chat_id}: {error}'
+            )
+            return None
+        return None if row is None else row[0]
+
+    def save(self, chat_id: Union[int, str], message_id: int) -> None:
+        """Запоминаем номер сообщения-сводки чата."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO dashboards (chat_id, message_id) '
+                'VALUES (?, ?)',
+                (str(chat_id), message_id),
+            )
+
+    def close(self) -> None:
+        """Закрываем соединение с базой."""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,104 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+FAILURE_THRESHOLD = 3
+BASE_TIMEOUT = 60
+MAX_TIMEOUT = 60 * 60
+
+
+def full_jitter(attempt: int, base: float, cap: float) -> float:
+    """Экспоненциальная пауза с полным джиттером: U(0, min(cap, base*2^n))."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Предохранитель для запросов к API Яндекс.Практикум.
+
+    После failure_threshold сбоев подряд предохранитель размыкается
+    (open) и отклоняет запросы на паузу с полным джиттером, растущую
+    экспоненциально с каждым новым размыканием. По истечении паузы
+    пропускается один пробный запрос (half-open): успех замыкает
+    предохранитель, сбой снова размыкает его. Один экземпляр
+    разделяется всеми аккаунтами, поэтому недоступный API не
+    опрашивается каждым из них по отдельности.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        base_timeout: float = BASE_TIMEOUT,
+        max_timeout: float = MAX_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Размыкаемся после failure_threshold сбоев подряд."""
+        self.failure_threshold = failure_threshold
+        self.base_timeout = base_timeout
+        self.max_timeout = max_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.attempt = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Можно ли сейчас выполнить запрос."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.open_until:
+                self.state = HALF_OPEN
+                self.probing = False
+                logger.info('Предохранитель API: пробный запрос.')
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Учитываем успешный запрос."""
+        with self.lock:
+            if self.state != CLOSED:
+                logger.info('Предохранитель API замкнут: запросы проходят.')
+            self.state = CLOSED
+            self.failures = 0
+            self.attempt = 0
+            self.probing = False
+
+    def record_failure(self) -> None:
+        """Учитываем сбой запроса."""
+        with self.lock:
+            self.failures += 1
+            if (
+                self.state == CLOSED
+                and self.failures < self.failure_threshold
+            ):
+                return
+            timeout = full_jitter(
+                self.attempt, self.base_timeout, self.max_timeout
+            )
+            self.attempt += 1
+            self.state = OPEN
+            self.probing = False
+            self.open_until = self.clock() + timeout
+            logger.warning(
+                f'Предохранитель API разомкнут на {timeout:.0f} с '
+                f'после сбоев подряд: {self.failures}.'
+            )
+
+    def retry_in(self) -> float:
+        """Через сколько секунд предохранитель пропустит запрос."""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_until - self.clock())
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Mapping, Optional
+
+from telegram import Bot, TelegramError, Update
+
+from history import TransitionHistory
+from send_queue import SendQueue
+
+LONG_POLL_TIMEOUT = 30
+ERROR_DELAY = 5
+HISTORY_LIMIT = 10
+TIME_FORMAT = '%d.%m %H:%M'
+HELP = (
+    'Команды:\n'
+    '/status - текущие статусы домашних работ\n'
+    '/history - последние изменения статусов'
+)
+NO_DATA = 'Бот пока не получил сведений о домашних работах.'
+
+logger = logging.getLogger(__name__)
+
+
+def render_status(
+    history: TransitionHistory, verdicts: Mapping[str, str]
+) -> str:
+    """Ответ на /status."""
+    statuses = history.statuses()
+    if not statuses:
+        return NO_DATA
+    return '\n'.join(['Статусы домашних работ:'] + [
+        f'{name}: {verdicts.get(status, status)}'
+        for name, status in statuses
+    ])
+
+
+def render_history(
+    history: TransitionHistory,
+    verdicts: Mapping[str, str],
+    limit: int = HISTORY_LIMIT,
+) -> str:
+    """Ответ на /history."""
+    transitions = history.recent(limit)
+    if not transitions:
+        return NO_DATA
+    return '\n'.join(['Последние изменения статусов:'] + [
+        f'{datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT)} '
+        f'{name}: {verdicts.get(status, status)}'
+        for timestamp, name, status in transitions
+    ])
+
+
+class CommandPoller:
+    """Ответы на команды /status и /history из локального состояния.
+
+    Фоновый поток получает обновления long polling (getUpdates) и
+    отвечает через очередь отправки только в известные чаты. Ответ
+    собирается из TransitionHistory аккаунта, к API Яндекс.Практикум
+    команды не обращаются.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        send_queue: SendQueue,
+        histories: Dict[str, TransitionHistory],
+        verdicts: Mapping[str, str],
+        timeout: int = LONG_POLL_TIMEOUT,
+    ) -> None:
+        """Ответы на команды по историям histories с ключом chat_id."""
+        self.bot = bot
+        self.send_queue = send_queue
+        self.histories = histories
+        self.verdicts = verdicts
+        self.timeout = timeout
+        self.offset: Optional[int] = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name='commands', daemon=True
+        )
+
+    def start(self) -> None:
+        """Запускаем прием команд."""
+        self.thread.start()
+        logger.info('Бот отвечает на команды /status и /history.')
+
+    def stop(self) -> None:
+        """Останавливаем прием команд после текущего запроса."""
+        self.stopped.set()
+
+    def reply(self, chat_id: str, text: str) -> Optional[str]:
+        """Ответ на команду или None, если отвечать не нужно."""
+        history = self.histories.get(chat_id)
+        if history is None or not text.startswith('/'):
+            return None
+        command = text.split()[0].split('@')[0].lower()
+        if command == '/status':
+            return render_status(history, self.verdicts)
+        if command == '/history':
+            return render_history(history, self.verdicts)
+        if command in ('/start', '/help'):
+            return HELP
+        return None
+
+    def handle(self, update: Update) -> None:
+        """Обрабатываем одно обновление."""
+        message = update.effective_message
+        if message is None or not message.text:
+            return
+        chat_id = message.chat_id
+        answer = self.reply(str(chat_id), message.text)
+        if answer is not None:
+            self.send_queue.put(chat_id, answer)
+
+    def poll(self) -> None:
+        """Один запрос getUpdates и обработка полученных обновлений."""
+        updates = self.bot.get_updates(
+            offset=self.offset,
+            timeout=self.timeout,
+            allowed_updates=['message'],
+        )
+        for update in updates:
+            self.offset = update.update_id + 1
+            self.handle(update)
+
+    def run(self) -> None:
+        """Фоновый цикл приема команд."""
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except TelegramError as error:
+                logger.warning(f'Не удалось получить команды: {error}')
+                time.sleep(ERROR_DELAY)
@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+import sqlite3
+from typing import (
+    Callable, Dict, Hashable, Iterable, Mapping, Optional, Tuple, Union,
+)
+
+from telegram import Bot, TelegramError
+from telegram.error import BadRequest, RetryAfter
+
+import exceptions
+import metrics
+from checkpoint import DashboardMessages
+from records import Homework
+from send_queue import MAX_MESSAGE_LENGTH
+
+MIN_INTERVAL = 10
+TITLE = 'Статусы домашних работ:'
+NOT_MODIFIED = 'message is not modified'
+
+logger = logging.getLogger(__name__)
+
+
+class Dashboard:
+    """Закрепленное сообщение со статусами всех работ в чате.
+
+    Вместо нового сообщения на каждый переход бот редактирует одно
+    сообщение. Текст собирается из последних статусов и отправляется,
+    только если он изменился и с прошлого обновления прошло не меньше
+    min_interval секунд; отложенное изменение очередь отправки
+    повторяет к next_update (см. update). Первое сообщение
+    отправляется и закрепляется; если его удалили, оно создается
+    заново.
+
+    flush обращается к Telegram, поэтому его через update вызывает
+    поток очереди отправки (см. SendQueue.refresh). Если задан
+    messages, номер сообщения сохраняется в нем и переживает
+    перезапуск.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: Union[int, str],
+        verdicts: Mapping[str, str],
+        min_interval: float = MIN_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        timeout: Optional[float] = None,
+        messages: Optional[DashboardMessages] = None,
+    ) -> None:
+        """Сводка для чата chat_id; текст статусов берется из verdicts."""
+        self.bot = bot
+        self.chat_id = chat_id
+        self.verdicts = verdicts
+        self.min_interval = min_interval
+        self.clock = clock
+        self.homeworks: Dict[Hashable, Homework] = {}
+        self.messages = messages
+        self.message_id: Optional[int] = (
+            messages.load(chat_id) if messages is not None else None
+        )
+        self.sent_text = str()
+        self.next_update = 0.0
+        self.timeout = timeout
+        self.lock = threading.Lock()
+
+    def observe(self, records: Iterable[Homework]) -> None:
+        """Запоминаем последние статусы работ."""
+        with self.lock:
+            for record in records:
+                key = record.get('id', record.homework_name)
+                current = self.homeworks.get(key)
+                if current is None or (
+                    record.date_updated >= current.date_updated
+                ):
+                    self.homeworks[key] = record
+
+    def seed(self, statuses: Iterable[Tuple[Hashable, str, str]]) -> None:
+        """Заполняем сводку статусами, восстановленными из истории.
+
+        statuses - тройки (ключ, homework_name, status), как в
+        TransitionHistory.keyed_statuses; записи из ответов API их
+        заменяют.
+        """
+        with self.lock:
+            for key, name, status in statuses:
+                if status in self.verdicts:
+                    self.homeworks.setdefault(key, Homework(name, status, key))
+
+    def render(self) -> str:
+        """Текст сообщения со статусами."""
+        lines = [TITLE] + [
+            f'{record.homework_name}: {self.verdicts[record.status]}'
+            for record in self.homeworks.values()
+        ]
+        text = '\n'.join(lines)
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[:MAX_MESSAGE_LENGTH - 1] + '…'
+        return text
+
+    def flush(self) -> bool:
+        """Обновляем сообщение, если есть что и пора; сообщаем, было ли оно.
+
+        Ошибки Telegram превращаются в SendingRetryAfterError и
+        SendingMessageReportError, как при отправке сообщений.
+        """
+        with self.lock:
+            if not self.homeworks:
+                return False
+            text = self.render()
+            if text == self.sent_text or self.clock() < self.next_update:
+                return False
+            try:
+                self.publish(text)
+            except RetryAfter as error:
+                self.next_update = self.clock() + error.retry_after
+                raise exceptions.SendingRetryAfterError(
+                    'Обновление сводки отложено Telegram: '
+                    f'повтор через {error.retry_after} с.',
+                    error.retry_after
+                ) from error
+            except TelegramError as error:
+                raise exceptions.SendingMessageReportError(
+                    f'Сбой при обновлении сводки: {error}'
+                ) from error
+            self.sent_text = text
+            self.next_update = self.clock() + self.min_interval
+            return True
+
+    def update(self) -> Optional[float]:
+        """Обновляем сообщение из потока очереди отправки.
+
+        Возвращает, через сколько секунд повторить, если изменение
+        отложено до next_update, иначе None.
+        """
+        self.flush()
+        with self.lock:
+            if not self.homeworks or self.render() == self.sent_text:
+                return None
+            return max(0.0, self.next_update - self.clock())
+
+    @metrics.timed('dashboard')
+    def publish(self, text: str) -> None:
+        """Редактируем сообщение или создаем и закрепляем новое."""
+        if self.message_id is not None:
+            try:
+                self.bot.edit_message_text(
+                    text, chat_id=self.chat_id, message_id=self.message_id,
+                    timeout=self.timeout,
+                )
+                return
+            except BadRequest as error:
+                if NOT_MODIFIED in str(error).lower():
+                    return
+                logger.warning(
+                    f'Сводку в чате {self.chat_id} не удалось изменить: '
+                    f'{error}. Отправляем новую.'
+                )
+        message = self.bot.send_message(
+            self.chat_id, text, timeout=self.timeout
+        )
+        self.message_id = message.message_id
+        self.remember()
+        try:
+            self.bot.pin_chat_message(
+                self.chat_id, self.message_id, disable_notification=True,
+                timeout=self.timeout,
+            )
+        except TelegramError as error:
+            logger.warning(
+                f'Сводку в чате {self.chat_id} не удалось закрепить: {error}'
+            )
+
+    def remember(self) -> None:
+        """Сохраняем номер сообщения; сбой только записываем в журнал."""
+        if self.messages is None:
+            return
+        try:
+            self.messages.save(self.chat_id, self.message_id)
+        except sqlite3.Error as error:
+            logger.error(
+                f'Не удалось сохранить сводку чата {self.chat_id}: {error}'
+            )
@@ -0,0 +1,121 @@
+import json
+from typing import IO, Callable, Iterator, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+HOMEWORK_FIELDS = frozenset(('id', 'homework_name', 'status', 'date_updated'))
+HOMEWORK_PREFIX = 'homeworks.item'
+SCALAR_EVENTS = frozenset(('string', 'number', 'boolean', 'null'))
+
+if orjson is not None:
+    loads = orjson.loads
+    DECODER_NAME = 'orjson'
+elif ujson is not None:
+    loads = ujson.loads
+    DECODER_NAME = 'ujson'
+else:
+    loads = json.loads
+    DECODER_NAME = 'json'
+
+DECODE_ERRORS: Tuple[type, ...] = (ValueError, UnicodeDecodeError)
+if ijson is not None:
+    DECODE_ERRORS += (ijson.JSONError,)
+
+STREAMING_AVAILABLE = ijson is not None
+
+
+def decode(content: bytes) -> object:
+    """Разбираем тело ответа самым быстрым из установленных декодеров."""
+    return loads(content)
+
+
+def iter_stream(fileobj: IO[bytes]) -> Iterator[Tuple[str, object]]:
+    """Потоково разбираем ответ API, не загружая его целиком.
+
+    Генерирует пары ('homework', запись) по мере чтения списка работ
+    и ('current_date', значение). От каждой работы остаются только
+    поля HOMEWORK_FIELDS, остальное, включая комментарии ревьюера,
+    отбрасывается, не попадая в память. Элемент списка, который не
+    является объектом, передается как есть (вложенный список - пустым).
+
+    Начало homeworks дает пару ('homeworks', пустой список или словарь)
+    либо ('homeworks', значение), если это не массив и не объект;
+    ключи объекта homeworks - пары ('homeworks_key', ключ). Так ответ
+    с homeworks неверного типа разбирается так же, как без потока.
+    """
+    record = None
+    field_prefix = HOMEWORK_PREFIX + '.'
+    for prefix, event, value in ijson.parse(fileobj, use_float=True):
+        if prefix == 'homeworks':
+            yield from homeworks_events(event, value)
+        elif prefix == HOMEWORK_PREFIX and event == 'start_map':
+            record = {}
+        elif prefix == HOMEWORK_PREFIX and event == 'end_map':
+            yield 'homework', record
+            record = None
+        elif prefix == HOMEWORK_PREFIX:
+            yield from item_events(event, value)
+        elif record is not None and event in SCALAR_EVENTS:
+            field = prefix[len(field_prefix):]
+            if prefix.startswith(field_prefix) and field in HOMEWORK_FIELDS:
+                record[field] = value
+        elif prefix == 'current_date' and event in SCALAR_EVENTS:
+            yield 'current_date', value
+
+
+def homeworks_events(
+    event: str, value: object
+) -> Iterator[Tuple[str, object]]:
+    """События ijson для самого ключа homeworks."""
+    if event == 'start_array':
+        yield 'homeworks', []
+    elif event == 'start_map':
+        yield 'homeworks', {}
+    elif event == 'map_key':
+        yield 'homeworks_key', value
+    elif event in SCALAR_EVENTS:
+        yield 'homeworks', value
+
+
+def item_events(event: str, value: object) -> Iterator[Tuple[str, object]]:
+    """События ijson для элемента homeworks, который не является объектом."""
+    if event in SCALAR_EVENTS:
+        yield 'homework', value
+    elif event == 'start_array':
+        yield 'homework', []
+
+
+def stream_decode(
+    fileobj: IO[bytes],
+    validate: Optional[Callable[[object], object]] = None,
+) -> dict:
+    """Собираем ответ API из потока в компактный словарь.
+
+    Если задан validate, каждая запись проверяется сразу после чтения,
+    и в список попадает результат проверки; ошибка в записи прерывает
+    разбор, не дочитывая остаток ответа.
+    """
+    response = {}
+    for kind, value in iter_stream(fileobj):
+        if kind == 'homework':
+            response['homeworks'].append(
+                value if validate is None else validate(value)
+            )
+        elif kind == 'homeworks_key':
+            response['homeworks'][value] = None
+        else:
+            response[kind] = value
+    return response
@@ -0,0 +1,96 @@
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+SUPPRESS_WINDOW = 60 * 60
+DIGEST_INTERVAL = 60 * 60
+TIME_FORMAT = '%d.%m %H:%M:%S'
+
+
+class ErrorGroup:
+    """Накопленные сведения об ошибках одного класса."""
+
+    __slots__ = ('count', 'suppressed', 'first_seen', 'last_seen', 'sent_at')
+
+    def __init__(self, now: float) -> None:
+        """Группа ошибок, впервые замеченная в момент now."""
+        self.count = 0
+        self.suppressed = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.sent_at = None
+
+
+class ErrorAggregator:
+    """Сводит уведомления о сбоях, чтобы не засыпать ими чат.
+
+    Ошибки группируются по классу исключения. О первой ошибке класса
+    сообщается сразу, повторы в течение window секунд после последнего
+    сообщения только подсчитываются и раз в digest_interval секунд
+    попадают в сводку с числом и временем первого и последнего
+    появления. Когда опрос снова проходит успешно, отправляется
+    сообщение о восстановлении, и группы сбрасываются.
+    """
+
+    def __init__(
+        self,
+        window: float = SUPPRESS_WINDOW,
+        digest_interval: float = DIGEST_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Группировка ошибок с окном подавления window секунд."""
+        self.window = window
+        self.digest_interval = digest_interval
+        self.clock = clock
+        self.groups: Dict[str, ErrorGroup] = {}
+        self.last_digest = clock()
+
+    def report(self, error: Exception) -> str:
+        """Учитываем ошибку; возвращаем текст уведомления или пустую строку."""
+        now = self.clock()
+        name = type(error).__name__
+        group = self.groups.get(name)
+        if group is None:
+            group = self.groups[name] = ErrorGroup(now)
+        group.count += 1
+        group.last_seen = now
+        if group.sent_at is not None and now - group.sent_at < self.window:
+            group.suppressed += 1
+            return str()
+        group.sent_at = now
+        return f'Сбой в работе программы: {error}'
+
+    def digest(self) -> str:
+        """Сводка подавленных ошибок, если пришло ее время."""
+        now = self.clock()
+        if now - self.last_digest < self.digest_interval:
+            return str()
+        self.last_digest = now
+        lines = [
+            f'{name}: {group.count} раз, '
+            f'впервые {self.format(group.first_seen)}, '
+            f'последний раз {self.format(group.last_seen)}'
+            for name, group in sorted(self.groups.items())
+            if group.suppressed
+        ]
+        if not lines:
+            return str()
+        for group in self.groups.values():
+            group.suppressed = 0
+        return '\n'.join(['Сводка ошибок:'] + lines)
+
+    def recover(self) -> str:
+        """Сообщение о восстановлении после ошибок или пустая строка."""
+        if not self.groups:
+            return str()
+        summary = ', '.join(
+            f'{name} ({group.count} раз)'
+            for name, group in sorted(self.groups.items())
+        )
+        self.groups.clear()
+        return f'Работа программы восстановлена после ошибок: {summary}.'
+
+    @staticmethod
+    def format(timestamp: float) -> str:
+        """Время события для сообщения."""
+        return datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT)
@@ -18,6 +18,14 @@ class NotOkStatusCodeError(Exception):
     """Запрос не выполнен."""
 
 
+class RetryAfterError(NotOkStatusCodeError):
+    """Запрос не выполнен, сервер просит повторить его позже."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class DecodingFailsError(Exception):
     """В ответ передан пустой или недопустимый JSON."""
 
@@ -38,6 +46,22 @@ class SendingMessageReportError(ErrorNotifications):
     """Сбой при отправке сообщения."""
 
 
+class SendingRetryAfterError(SendingMessageReportError):
+    """Telegram ограничил частоту отправки и просит повторить позже."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ErrorNotifications):
+    """Запрос к API не выполнен: предохранитель разомкнут."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class StandartDeviations(ErrorNotifications):
     """Исключения при штатных отклонениях от основного сценария."""
 
@@ -0,0 +1,430 @@
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+HISTORY_SIZE = 50
+HOMEWORKS_LIMIT = 50
+SNAPSHOT_INTERVAL = 60 * 10
+SQLITE_TIMEOUT = 5
+# Байт на переход: время (d), ссылка на предыдущий переход той же
+# работы (q), номер имени работы (I) и номер статуса (B).
+ENTRY_SIZE = 8 + 8 + 4 + 1
+# Оценки сверху для fit_size (имена работ до 64 символов): пустая
+# история, имя в таблице names вместе с name_index и last, последний
+# статус работы в current.
+HISTORY_OVERHEAD = 2048
+NAME_SIZE = 256
+HOMEWORK_SIZE = 256
+# Таблица имен хранит не больше двух имен на место в буфере.
+SLOT_SIZE = ENTRY_SIZE + 2 * NAME_SIZE
+
+Transition = Tuple[float, str, str]
+
+logger = logging.getLogger(__name__)
+
+STATUSES: List[str] = []
+STATUS_IDS: Dict[str, int] = {}
+STATUS_LOCK = threading.Lock()
+
+
+def status_id(status: str) -> int:
+    """Номер статуса в общей для всех историй таблице."""
+    number = STATUS_IDS.get(status)
+    if number is not None:
+        return number
+    with STATUS_LOCK:
+        if status not in STATUS_IDS:
+            if len(STATUSES) > 255:
+                raise ValueError(f'Слишком много статусов: {status}.')
+            STATUS_IDS[status] = len(STATUSES)
+            STATUSES.append(status)
+        return STATUS_IDS[status]
+
+
+def parse_timestamp(value: object) -> Optional[float]:
+    """Время из date_updated (ISO 8601) в секундах или None."""
+    if not isinstance(value, str) or not value:
+        return None
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def fit_size(
+    accounts: int, memory_limit: int, size: int = HISTORY_SIZE
+) -> int:
+    """Размер истории аккаунта, при котором все истории укладываются в лимит.
+
+    memory_limit - байты на истории всех accounts аккаунтов (0 - без
+    ограничения): буферы переходов, таблицы имен и последние статусы
+    не более чем HOMEWORKS_LIMIT работ. Результат не больше size; если
+    лимит меньше памяти истории из одного перехода, размер все равно 1,
+    и об этом пишется предупреждение.
+    """
+    if not memory_limit or not accounts:
+        return size
+    overhead = HISTORY_OVERHEAD + HOMEWORKS_LIMIT * HOMEWORK_SIZE
+    fitted = (memory_limit // accounts - overhead) // SLOT_SIZE
+    if fitted < 1:
+        logger.warning(
+            f'Лимит памяти истории {memory_limit} байт меньше минимального '
+            f'для {accounts} аккаунтов: {accounts * (overhead + SLOT_SIZE)}.'
+        )
+        return 1
+    return min(size, fitted)
+
+
+class TransitionHistory:
+    """Последние переходы статусов работ одного аккаунта в памяти.
+
+    Переходы лежат в кольцевом буфере из size записей, под который
+    память выделяется сразу: время, номер имени работы и номер статуса
+    хранятся в массивах array, имена - один раз в таблице names. Новые
+    записи вытесняют самые старые. Время переходов не убывает, поэтому
+    выборка за интервал ищет начало двоичным поиском; переходы одной
+    работы связаны ссылками prev, и выборка по имени обходит только их.
+
+    Кроме буфера хранится последний статус не более чем homeworks
+    работ, изменившихся последними. Записи добавляет StatusIndex,
+    а читают команды бота, поэтому ответ на команду не требует запроса
+    к API. Имена, вытесненные из буфера, периодически удаляются из
+    таблицы, поэтому память истории ограничена (см. fit_size).
+    """
+
+    def __init__(
+        self, size: int = HISTORY_SIZE, homeworks: int = HOMEWORKS_LIMIT
+    ) -> None:
+        """Буфер на size переходов и статусы не более чем homeworks работ."""
+        self.size = size
+        self.homeworks = homeworks
+        self.timestamps = array('d', bytes(8 * size))
+        self.prev = array('q', bytes(8 * size))
+        self.name_ids = array('I', bytes(4 * size))
+        self.status_ids = array('B', bytes(size))
+        self.count = 0
+        self.names: List[str] = []
+        self.name_index: Dict[str, int] = {}
+        self.last: Dict[int, int] = {}
+        self.current: Dict[Hashable, Tuple[str, str]] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def first(self) -> int:
+        """Порядковый номер самого старого хранимого перехода."""
+        return max(0, self.count - self.size)
+
+    def record(self, homework: dict, timestamp: float = None) -> None:
+        """Запоминаем переход статуса работы (по умолчанию - сейчас)."""
+        if timestamp is None:
+            timestamp = time.time()
+        name = homework['homework_name']
+        status = homework['status']
+        with self.lock:
+            self.remember(homework.get('id', name), name, status)
+            self.append(timestamp, name, status)
+
+    def remember(self, key: Hashable, name: str, status: str) -> None:
+        """Запоминаем последний статус работы; вызывается под блокировкой.
+
+        Если работ больше homeworks, забывается давнее всех измененная.
+        """
+        self.current.pop(key, None)
+        self.current[key] = (name, status)
+        if len(self.current) > self.homeworks:
+            del self.current[next(iter(self.current))]
+
+    def append(self, timestamp: float, name: str, status: str) -> None:
+        """Кладем переход в буфер; вызывается под блокировкой."""
+        name_id = self.name_index.get(name)
+        if name_id is None:
+            if len(self.names) >= 2 * self.size:
+                self.compact()
+            name_id = self.name_index[name] = len(self.names)
+            self.names.append(name)
+        if self.count:
+            timestamp = max(timestamp, self.timestamps[self.position(-1)])
+        position = self.count % self.size
+        self.timestamps[position] = timestamp
+        self.prev[position] = self.last.get(name_id, -1)
+        self.name_ids[position] = name_id
+        self.status_ids[position] = status_id(status)
+        self.last[name_id] = self.count
+        self.count += 1
+
+    def compact(self) -> None:
+        """Удаляем имена, которых нет в буфере; вызывается под блокировкой."""
+        numbers = range(self.first, self.count)
+        live = sorted({self.name_ids[self.position(n)] for n in numbers})
+        renumber = {old: new for new, old in enumerate(live)}
+        self.names = [self.names[old] for old in live]
+        self.name_index = {name: new for new, name in enumerate(self.names)}
+        self.last = {
+            renumber[old]: number for old, number in self.last.items()
+            if old in renumber
+        }
+        for number in numbers:
+            position = self.position(number)
+            self.name_ids[position] = renumber[self.name_ids[position]]
+
+    def position(self, number: int) -> int:
+        """Место перехода с порядковым номером number в буфере."""
+        if number < 0:
+            number += self.count
+        return number % self.size
+
+    def entry(self, number: int) -> Transition:
+        """Переход с порядковым номером number: (timestamp, name, status)."""
+        position = self.position(number)
+        return (
+            self.timestamps[position],
+            self.names[self.name_ids[position]],
+            STATUSES[self.status_ids[position]],
+        )
+
+    def statuses(self) -> List[Tuple[str, str]]:
+        """Последние известные статусы работ: (homework_name, status)."""
+        with self.lock:
+            return list(self.current.values())
+
+    def keyed_statuses(self) -> List[Tuple[Hashable, str, str]]:
+        """Последние статусы работ с ключами: (id, homework_name, status).
+
+        Ключ - id работы или, если его нет, ее имя, как в StatusIndex.
+        """
+        with self.lock:
+            return [
+                (key, name, status)
+                for key, (name, status) in self.current.items()
+            ]
+
+    def recent(self, limit: int) -> List[Transition]:
+        """Последние переходы, от старых к новым."""
+        with self.lock:
+            start = max(self.first, self.count - limit)
+            return [self.entry(number) for number in range(start, self.count)]
+
+    def between(
+        self,
+        start: float = 0,
+        end: float = float('inf'),
+        name: Optional[str] = None,
+    ) -> List[Transition]:
+        """Переходы со временем в [start, end), от старых к новым.
+
+        Если задан name, только переходы работы с этим именем.
+        """
+        with self.lock:
+            if name is not None:
+                return self.homework_between(start, end, name)
+            low, high = self.first, self.count
+            while low < high:
+                middle = (low + high) // 2
+                if self.timestamps[self.position(middle)] < start:
+                    low = middle + 1
+                else:
+                    high = middle
+            transitions = []
+            for number in range(low, self.count):
+                transition = self.entry(number)
+                if transition[0] >= end:
+                    break
+                transitions.append(transition)
+            return transitions
+
+    def homework_between(
+        self, start: float, end: float, name: str
+    ) -> List[Transition]:
+        """Переходы одной работы за интервал; вызывается под блокировкой."""
+        name_id = self.name_index.get(name)
+        number = self.last.get(name_id, -1)
+        transitions = []
+        while number >= self.first:
+            transition = self.entry(number)
+            if transition[0] < start:
+                break
+            if transition[0] < end:
+                transitions.append(transition)
+            number = self.prev[self.position(number)]
+        transitions.reverse()
+        return transitions
+
+    def snapshot(self) -> dict:
+        """Состояние истории в виде, пригодном для JSON."""
+        with self.lock:
+            return {
+                'transitions': [
+                    list(self.entry(number))
+                    for number in range(self.first, self.count)
+                ],
+                'current': [
+                    [key, name, status]
+                    for key, (name, status) in self.current.items()
+                ],
+            }
+
+    def restore(self, snapshot: dict) -> None:
+        """Восстанавливаем историю из снимка snapshot.
+
+        Если буфер меньше, чем было переходов в снимке, остаются самые
+        новые из них.
+        """
+        with self.lock:
+            for timestamp, name, status in snapshot['transitions']:
+                self.append(float(timestamp), str(name), str(status))
+            for key, name, status in snapshot['current']:
+                self.remember(key, str(name), str(status))
+
+    def nbytes(self) -> int:
+        """Память истории в байтах: буферы, таблица имен и статусы работ."""
+        with self.lock:
+            buffers = (
+                self.timestamps, self.prev, self.name_ids, self.status_ids
+            )
+            return (
+                sum(sys.getsizeof(buffer) for buffer in buffers)
+                + sys.getsizeof(self.names)
+                + sum(sys.getsizeof(name) for name in self.names)
+                + sys.getsizeof(self.name_index)
+                + sys.getsizeof(self.last)
+                + sum(sys.getsizeof(number) for number in self.last.values())
+                + sys.getsizeof(self.current)
+                + sum(
+                    sys.getsizeof(value) + sys.getsizeof(value[0])
+                    for value in self.current.values()
+                )
+            )
+
+    def __len__(self) -> int:
+        """Число хранимых переходов."""
+        return self.count - self.first
+
+
+class HistoryStore:
+    """Снимки историй переходов в файле SQLite, по ключу аккаунта.
+
+    Файл общий для всех процессов супервизора: каждый процесс пишет
+    и читает только снимки своих аккаунтов, поэтому история аккаунта
+    сохраняется, когда он переходит к другому воркеру.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Открываем файл path и создаем таблицу снимков."""
+        self.path = path
+        self.connection = sqlite3.connect(
+            path, timeout=SQLITE_TIMEOUT, check_same_thread=False,
+            isolation_level=None,
+        )
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS histories ('
+                'key TEXT PRIMARY KEY, snapshot TEXT NOT NULL)'
+            )
+
+    def load(self, histories: Dict[str, TransitionHistory]) -> int:
+        """Восстанавливаем истории из снимков; возвращаем их число.
+
+        Поврежденный снимок аккаунта пропускается с предупреждением.
+        """
+        restored = 0
+        for key, history in histories.items():
+            try:
+                with self.lock:
+                    row = self.connection.execute(
+                        'SELECT snapshot FROM histories WHERE key = ?',
+                        (key,),
+                    ).fetchone()
+                if row is None:
+                    continue
+                history.restore(json.loads(row[0]))
+            except (sqlite3.Error, ValueError, TypeError, KeyError) as error:
+                logger.warning(f'Не удалось прочитать историю {key}: {error}')
+                continue
+            restored += 1
+        return restored
+
+    def save(self, histories: Dict[str, TransitionHistory]) -> None:
+        """Сохраняем снимки историй одной транзакцией."""
+        rows = [
+            (key, json.dumps(history.snapshot(), ensure_ascii=False))
+            for key, history in histories.items()
+        ]
+        with self.lock:
+            self.connection.execute('BEGIN')
+            try:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO histories (key, snapshot) '
+                    'VALUES (?, ?)',
+                    rows,
+                )
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+
+    def close(self) -> None:
+        """Закрываем соединение с базой."""
+        with self.lock:
+            self.connection.close()
+
+
+class HistorySnapshots:
+    """Периодическое сохранение историй переходов на диск.
+
+    Фоновый поток раз в interval секунд сохраняет снимки историй в файл
+    SQLite path (см. HistoryStore); stop сохраняет их в последний раз.
+    Файл открывается в start, в том процессе, который его использует.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        histories: Dict[str, TransitionHistory],
+        interval: float = SNAPSHOT_INTERVAL,
+    ) -> None:
+        """Снимки histories в файле path раз в interval секунд."""
+        self.path = path
+        self.histories = histories
+        self.interval = interval
+        self.store: Optional[HistoryStore] = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name='history', daemon=True
+        )
+
+    def start(self) -> None:
+        """Восстанавливаем истории из файла и запускаем сохранение."""
+        self.store = HistoryStore(self.path)
+        restored = self.store.load(self.histories)
+        if restored:
+            logger.info(f'Восстановлена история переходов: {restored}.')
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Останавливаем сохранение и сохраняем истории в последний раз."""
+        self.stopped.set()
+        self.thread.join()
+        self.save()
+        self.store.close()
+
+    def save(self) -> None:
+        """Сохраняем снимок; сбой записи только записываем в журнал."""
+        try:
+            self.store.save(self.histories)
+        except sqlite3.Error as error:
+            logger.error(f'Не удалось сохранить историю переходов: {error}')
+
+    def run(self) -> None:
+        """Фоновый цикл сохранения."""
+        while not self.stopped.wait(self.interval):
+            self.save()
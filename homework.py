@@ -2,16 +2,37 @@ import logging
 import os
 import sys
 import time
+from functools import partial
 from http import HTTPStatus
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import requests
-from requests.exceptions import RequestException
+import urllib3
+from requests.exceptions import RequestException, Timeout
 
 from telegram import Bot, TelegramError
+from telegram.error import RetryAfter, TimedOut
 
 from dotenv import load_dotenv
 
+import api_client
+import decoders
 import exceptions
+import log_config
+import metrics
+import response_cache
+from checkpoint import Checkpoint, DashboardMessages
+from commands import CommandPoller
+from dashboard import Dashboard
+from error_digest import ErrorAggregator
+import history
+from history import HistorySnapshots, TransitionHistory
+from outbox import Outbox
+from records import Homework, validate_homework, validate_homeworks
+from scheduler import AdaptiveScheduler, parse_retry_after
+from send_queue import SendQueue
+from status_index import StatusIndex
+from webhook import start_webhook_server
 
 load_dotenv()
 
@@ -26,9 +47,64 @@ PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
+CHECKPOINT_PATH = os.getenv(
+    'CHECKPOINT_PATH', os.path.join(BASE_DIR, 'checkpoint.json')
+)
+OUTBOX_PATH = os.getenv(
+    'OUTBOX_PATH', os.path.join(BASE_DIR, 'outbox.sqlite3')
+)
+HISTORY_PATH = os.getenv(
+    'HISTORY_PATH', os.path.join(BASE_DIR, 'history.sqlite3')
+)
+HISTORY_SIZE = int(os.getenv('HISTORY_SIZE', history.HISTORY_SIZE))
+HISTORY_MEMORY_LIMIT = int(os.getenv('HISTORY_MEMORY_LIMIT', 0))
+HISTORY_SNAPSHOT_INTERVAL = int(
+    os.getenv('HISTORY_SNAPSHOT_INTERVAL', history.SNAPSHOT_INTERVAL)
+)
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 0))
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+WEBHOOK_RECONCILE_TIME = int(os.getenv('WEBHOOK_RECONCILE_TIME', 60 * 60))
+ERROR_SUPPRESS_WINDOW = int(os.getenv('ERROR_SUPPRESS_WINDOW', 60 * 60))
+ERROR_DIGEST_INTERVAL = int(os.getenv('ERROR_DIGEST_INTERVAL', 60 * 60))
+DASHBOARD_MODE = os.getenv('NOTIFY_MODE') == 'dashboard'
+DASHBOARD_INTERVAL = int(os.getenv('DASHBOARD_INTERVAL', 10))
+DASHBOARD_PATH = os.getenv(
+    'DASHBOARD_PATH', os.path.join(BASE_DIR, 'dashboard.sqlite3')
+)
+BOT_COMMANDS = os.getenv('BOT_COMMANDS') == '1'
+
 RETRY_TIME = 60 * 10
+POLL_MIN_INTERVAL = int(os.getenv('POLL_MIN_INTERVAL', 60))
+POLL_MAX_INTERVAL = int(os.getenv('POLL_MAX_INTERVAL', 60 * 60))
+POLL_REVIEWING_INTERVAL = int(os.getenv('POLL_REVIEWING_INTERVAL', 60 * 2))
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+API_POOL_SIZE = int(os.getenv('API_POOL_SIZE', api_client.POOL_MAXSIZE))
+API_RATE_LIMIT = float(os.getenv('API_RATE_LIMIT', 0))
+POLL_JITTER = float(os.getenv('POLL_JITTER', 0.1))
+POLL_STAGGER_WINDOW = float(os.getenv('POLL_STAGGER_WINDOW', RETRY_TIME))
+API_CONNECT_TIMEOUT = float(
+    os.getenv('API_CONNECT_TIMEOUT', api_client.CONNECT_TIMEOUT)
+)
+API_READ_TIMEOUT = float(
+    os.getenv('API_READ_TIMEOUT', api_client.READ_TIMEOUT)
+)
+SEND_TIMEOUT = float(os.getenv('SEND_TIMEOUT', 10))
+CYCLE_DEADLINE = float(
+    os.getenv('CYCLE_DEADLINE', API_CONNECT_TIMEOUT + API_READ_TIMEOUT)
+)
+API_STREAM_DECODE = (
+    os.getenv('API_DECODE_MODE') == 'stream' and decoders.STREAMING_AVAILABLE
+)
+API_CACHE_TTL = float(os.getenv('API_CACHE_TTL', 0))
+API_CACHE_SIZE = int(os.getenv('API_CACHE_SIZE', response_cache.MAX_ENTRIES))
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', response_cache.MEMORY)
+API_CACHE_PATH = os.getenv(
+    'API_CACHE_PATH', os.path.join(BASE_DIR, 'response_cache.sqlite3')
+)
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -38,14 +114,40 @@ HOMEWORK_VERDICTS = {
 
 logger = logging.getLogger(__name__)
 
+API_CLIENT = api_client.PracticumClient(
+    pool_maxsize=API_POOL_SIZE,
+    timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
+    rate_limit=API_RATE_LIMIT,
+)
+RESPONSE_CACHE = response_cache.build_cache(
+    API_CACHE_BACKEND, API_CACHE_TTL, API_CACHE_SIZE, API_CACHE_PATH
+)
+
 
 def send_message(bot: Bot, message: str) -> None:
     """Бот отправляет сообщение в чат со статусом домашней работы."""
+    send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+@metrics.timed('send_message', deadline=SEND_TIMEOUT)
+def send_to_chat(bot: Bot, chat_id: Union[int, str], message: str) -> None:
+    """Бот отправляет сообщение в указанный чат."""
     try:
         bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID,
-            text=message
+            chat_id=chat_id,
+            text=message,
+            timeout=SEND_TIMEOUT,
         )
+    except RetryAfter as error:
+        raise exceptions.SendingRetryAfterError(
+            'Telegram ограничил частоту отправки сообщений: '
+            f'повтор через {error.retry_after:.0f} с.',
+            error.retry_after
+        ) from error
+    except TimedOut as error:
+        raise exceptions.SendingMessageReportError(
+            f'Telegram не ответил за {SEND_TIMEOUT:.0f} с.'
+        ) from error
     except TelegramError as error:
         raise exceptions.SendingMessageReportError(
             'Сбой при отправке сообщения: '
@@ -57,36 +159,150 @@ def send_message(bot: Bot, message: str) -> None:
 
 def get_api_answer(current_timestamp: int) -> dict:
     """Получаем сведения о выполненных домашних работах за указанный период."""
+    return fetch_api_answer(current_timestamp, HEADERS)
+
+
+@metrics.timed('get_api_answer')
+def fetch_api_answer(current_timestamp: int, headers: dict) -> dict:
+    """Запрашиваем у API домашние работы аккаунта с указанными заголовками.
+
+    Если включен кэш ответов, аккаунты с одним токеном и from_date
+    получают ответ одного запроса. Длительность этапа включает ожидание
+    очереди API_RATE_LIMIT и кэша; с бюджетом API_CONNECT_TIMEOUT +
+    API_READ_TIMEOUT сравнивается только сам запрос (см. read_api_answer).
+    """
+    if RESPONSE_CACHE is None:
+        return request_api_answer(current_timestamp, headers)
+    return RESPONSE_CACHE.get_or_fetch(
+        response_cache.cache_key(
+            headers.get('Authorization', str()), current_timestamp
+        ),
+        partial(request_api_answer, current_timestamp, headers),
+    )
+
+
+def request_api_answer(current_timestamp: int, headers: dict) -> dict:
+    """Выполняем запрос к API и разбираем ответ."""
     params = {'from_date': current_timestamp}
     logger.info(
         'Началась проверка данных для получения '
         'ответа от API Яндекс.Практикум.'
     )
     try:
-        response = requests.get(url=ENDPOINT, headers=HEADERS, params=params)
+        response = API_CLIENT.get(
+            url=ENDPOINT, headers=headers, params=params,
+            stream=API_STREAM_DECODE
+        )
+    except Timeout as error:
+        raise exceptions.BadRequestError(
+            'API не ответил за отведенное время: '
+            f'{API_CONNECT_TIMEOUT:.0f} с на соединение, '
+            f'{API_READ_TIMEOUT:.0f} с на ответ.'
+        ) from error
     except RequestException as error:
         raise exceptions.BadRequestError(
             'Ошибка неправильного запроса: '
         ) from error
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return not_modified_answer(headers, params)
     if response.status_code != HTTPStatus.OK:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            raise exceptions.RetryAfterError(
+                f'Запрос не выполнен, статус ответа: {response.status_code}, '
+                f'повтор через {retry_after:.0f} с.',
+                retry_after
+            )
         raise exceptions.NotOkStatusCodeError(
             f'Запрос не выполнен, статус ответа: {response.status_code}.'
         )
     try:
-        return response.json()
-    except requests.exceptions.JSONDecodeError as error:
-        raise exceptions.DecodingFailsError(
-            'В ответ передан пустой или недопустимый JSON.'
-        ) from error
+        answer = read_api_answer(response)
     finally:
         logger.info(
             'Проверка данных для получения '
             'ответа от API Яндекс.Практикум завершена.'
         )
+    API_CLIENT.remember_answer(ENDPOINT, headers, params, answer)
+    return answer
+
+
+def not_modified_answer(headers: dict, params: dict) -> dict:
+    """Ответ на 304: тот, что сервер подтвердил, или пустой.
+
+    Сохраненный ответ получает любой подписчик с тем же токеном,
+    а не только тот, кто получил исходный 200.
+    """
+    logger.info('Ответ API не изменился с прошлого запроса.')
+    answer = API_CLIENT.cached_answer(ENDPOINT, headers, params)
+    if answer is None:
+        return {'homeworks': [], 'current_date': params['from_date']}
+    return answer
+
+
+def read_api_answer(response: requests.Response) -> dict:
+    """Читаем и разбираем тело ответа API.
+
+    Сбой чтения тела (при потоковом разборе оно читается здесь)
+    считается сбоем API, а дочитанное тело - успехом: при потоковом
+    разборе PracticumClient.get не учитывает ответ 200 до этого
+    момента. Время от отправки запроса до конца разбора сравнивается
+    с API_CONNECT_TIMEOUT + API_READ_TIMEOUT.
+    """
+    failed = False
+    try:
+        return decode_response(response)
+    except decoders.DECODE_ERRORS as error:
+        raise exceptions.DecodingFailsError(
+            'В ответ передан пустой или недопустимый JSON.'
+        ) from error
+    except (urllib3.exceptions.HTTPError, RequestException) as error:
+        failed = True
+        API_CLIENT.breaker.record_failure()
+        raise exceptions.BadRequestError(
+            f'Ответ API не удалось дочитать: {error}'
+        ) from error
+    finally:
+        if not failed:
+            API_CLIENT.breaker.record_success()
+        sent_at = getattr(response, 'sent_at', None)
+        if sent_at is not None:
+            metrics.check_deadline(
+                'get_api_answer',
+                time.perf_counter() - sent_at,
+                API_CONNECT_TIMEOUT + API_READ_TIMEOUT,
+            )
+
+
+def decode_response(response: requests.Response) -> dict:
+    """Разбираем тело ответа API выбранным декодером.
+
+    При потоковом разборе записи проверяются по одной по мере чтения.
+    """
+    if API_STREAM_DECODE:
+        response.raw.decode_content = True
+        return decoders.stream_decode(
+            response.raw,
+            partial(validate_homework, statuses=HOMEWORK_VERDICTS),
+        )
+    return decoders.decode(response.content)
 
 
 def check_response(response: dict) -> dict:
     """Проверяем ответ API на корректность."""
+    return check_response_fields(response)[0]
+
+
+@metrics.timed('check_response')
+def check_homeworks(response: dict) -> List[Homework]:
+    """Проверяем ответ API и все записи в нем, возвращаем их списком."""
+    return validate_homeworks(
+        check_response_fields(response), HOMEWORK_VERDICTS
+    )
+
+
+def check_response_fields(response: dict) -> List[dict]:
+    """Проверяем ключи ответа API и возвращаем список домашних работ."""
     logger.info('Началась проверка ответа API на корректность.')
     if not isinstance(response, dict):
         raise TypeError(
@@ -106,13 +322,12 @@ def check_response(response: dict) -> dict:
         raise exceptions.IncorrectTypeError(
             'Ожидаемый тип данных: список домашних работ.'
         )
-    homework = homeworks_list[0]
     if 'current_date' not in response:
         raise exceptions.NoNewTimestampFromServer(
             'В ответе отсутствует временная метка.'
         )
     logger.info('Проверка ответа API на корректность завершена.')
-    return homework
+    return homeworks_list
 
 
 def parse_status(homework: dict) -> str:
@@ -129,17 +344,114 @@ def parse_status(homework: dict) -> str:
         raise exceptions.UnknownHomeworkStatus(
             f'Словарь {homework} не содержит ключ status.'
         )
-    homework_status = homework['status']
-    homework_name = homework['homework_name']
-    if homework_status not in HOMEWORK_VERDICTS:
+    if homework['status'] not in HOMEWORK_VERDICTS:
         raise exceptions.UndocumentedHomeworkStatusError(
             'Указан недокументированный статус домашней работы!'
         )
-    verdict = HOMEWORK_VERDICTS[homework_status]
     logger.info('Получение статуса успешно завершено.')
+    return status_message(homework['homework_name'], homework['status'])
+
+
+def status_message(homework_name: str, status: str) -> str:
+    """Текст уведомления о статусе проверенной записи."""
     return (
         f'Изменился статус проверки работы "{homework_name}". '
-        f'{verdict}'
+        f'{HOMEWORK_VERDICTS[status]}'
+    )
+
+
+@metrics.timed('parse_status')
+def parse_statuses(
+    homeworks: List[Union[dict, Homework]], status_index: StatusIndex
+) -> str:
+    """Собираем одно сообщение о всех переходах статусов работ.
+
+    Сначала проверяется весь список, и только затем обновляется индекс,
+    поэтому ошибка в одной записи не оставляет его в промежуточном
+    состоянии. API возвращает работы от новых к старым, поэтому
+    в сообщении они идут в обратном порядке.
+    """
+    records = validate_homeworks(homeworks, HOMEWORK_VERDICTS)
+    with status_index.lock:
+        return '\n'.join(
+            status_message(record.homework_name, record.status)
+            for record in reversed(records)
+            if status_index.update(record)
+        )
+
+
+@metrics.timed('poll_cycle', deadline=CYCLE_DEADLINE)
+def poll_statuses(
+    current_timestamp: int,
+    headers: dict,
+    status_index: StatusIndex,
+    errors: ErrorAggregator,
+    dashboard: Optional[Dashboard] = None,
+    log_prefix: str = str(),
+) -> Tuple[Optional[dict], List[Homework], str, Optional[float]]:
+    """Одна итерация опроса API без отправки.
+
+    Возвращает ответ API (None при сбое), проверенные записи, текст
+    уведомления и паузу, запрошенную сервером. В режиме сводки
+    переходы статусов попадают в нее, а не в текст уведомления.
+    """
+    response = None
+    homeworks = []
+    message = str()
+    retry_after = None
+    try:
+        answer = fetch_api_answer(current_timestamp, headers)
+        homeworks = check_homeworks(answer)
+        message = parse_statuses(homeworks, status_index)
+    except exceptions.StandartDeviations as exc:
+        logger.error(f'{log_prefix}{exc}')
+        message = errors.recover()
+    except exceptions.ErrorNotifications as exc:
+        logger.error(f'{log_prefix}{exc}')
+    except Exception as error:
+        retry_after = getattr(error, 'retry_after', None)
+        logger.error(f'{log_prefix}Сбой в работе программы: {error}')
+        message = errors.report(error)
+    else:
+        response = answer
+        if dashboard is not None:
+            dashboard.observe(homeworks)
+            message = str()
+        message = join_messages(errors.recover(), message)
+    return response, homeworks, message, retry_after
+
+
+def deliver_statuses(
+    send_queue: SendQueue,
+    chat_id: Union[int, str],
+    status_index: StatusIndex,
+    homeworks: List[dict],
+    dashboard: Optional[Dashboard] = None,
+) -> str:
+    """Разбираем записи и уведомляем о переходах: сообщением или сводкой."""
+    records = validate_homeworks(homeworks, HOMEWORK_VERDICTS)
+    message = parse_statuses(records, status_index)
+    if dashboard is not None:
+        dashboard.observe(records)
+        update_dashboard(send_queue, dashboard)
+        return str()
+    if message:
+        send_queue.put(chat_id, message)
+    return message
+
+
+def ingest_homeworks(
+    status_index: StatusIndex,
+    send_queue: SendQueue,
+    account: Optional[str],
+    homeworks: List[dict],
+    dashboard: Optional[Dashboard] = None,
+) -> None:
+    """Передаем записи, принятые вебхуком, в разбор и отправку."""
+    if account is not None:
+        raise exceptions.MissingKeyError(f'Неизвестный аккаунт: {account}.')
+    deliver_statuses(
+        send_queue, TELEGRAM_CHAT_ID, status_index, homeworks, dashboard
     )
 
 
@@ -149,6 +461,212 @@ def check_tokens() -> bool:
     return all((PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID,))
 
 
+def build_scheduler(key: Optional[str] = None) -> AdaptiveScheduler:
+    """Планировщик опроса API с настройками из окружения.
+
+    key задает фазу первого опроса аккаунта внутри POLL_STAGGER_WINDOW.
+    Если включен прием событий вебхука, опрос API лишь сверяет
+    состояние раз в WEBHOOK_RECONCILE_TIME.
+    """
+    if WEBHOOK_PORT:
+        return AdaptiveScheduler(
+            min_interval=WEBHOOK_RECONCILE_TIME,
+            max_interval=WEBHOOK_RECONCILE_TIME,
+            base_interval=WEBHOOK_RECONCILE_TIME,
+            reviewing_interval=WEBHOOK_RECONCILE_TIME,
+            breaker=API_CLIENT.breaker,
+            key=key,
+            jitter=POLL_JITTER,
+        )
+    return AdaptiveScheduler(
+        min_interval=POLL_MIN_INTERVAL,
+        max_interval=POLL_MAX_INTERVAL,
+        base_interval=RETRY_TIME,
+        reviewing_interval=POLL_REVIEWING_INTERVAL,
+        breaker=API_CLIENT.breaker,
+        key=key,
+        jitter=POLL_JITTER,
+        stagger_window=POLL_STAGGER_WINDOW,
+    )
+
+
+def build_outbox(
+    path: str = OUTBOX_PATH,
+    chats: Optional[Iterable[Union[int, str]]] = None,
+) -> Optional[Outbox]:
+    """Хранилище недоставленных сообщений; None, если путь пустой.
+
+    chats ограничивает общий файл чатами процесса (см. Outbox).
+    """
+    if not path:
+        return None
+    return Outbox(path, chats)
+
+
+def build_history(accounts: int = 1) -> TransitionHistory:
+    """История переходов аккаунта.
+
+    Размер буфера не больше HISTORY_SIZE и уменьшается так, чтобы
+    истории всех accounts аккаунтов уложились в HISTORY_MEMORY_LIMIT
+    (см. history.fit_size).
+    """
+    return TransitionHistory(
+        history.fit_size(accounts, HISTORY_MEMORY_LIMIT, HISTORY_SIZE)
+    )
+
+
+def start_history_snapshots(
+    histories: Dict[str, TransitionHistory], path: str = HISTORY_PATH
+) -> Optional[HistorySnapshots]:
+    """Восстанавливаем истории из path и сохраняем их туда периодически.
+
+    Пустой path отключает снимки.
+    """
+    if not path:
+        return None
+    snapshots = HistorySnapshots(path, histories, HISTORY_SNAPSHOT_INTERVAL)
+    snapshots.start()
+    return snapshots
+
+
+def build_error_aggregator() -> ErrorAggregator:
+    """Группировка уведомлений о сбоях с настройками из окружения."""
+    return ErrorAggregator(ERROR_SUPPRESS_WINDOW, ERROR_DIGEST_INTERVAL)
+
+
+def open_dashboard_messages(
+    path: str = DASHBOARD_PATH
+) -> Optional[DashboardMessages]:
+    """Хранилище номеров сводок, если включен режим сводки и задан path."""
+    if not DASHBOARD_MODE or not path:
+        return None
+    return DashboardMessages(path)
+
+
+def build_dashboard(
+    bot: Bot,
+    chat_id: Union[int, str],
+    history: Optional[TransitionHistory] = None,
+    messages: Optional[DashboardMessages] = None,
+) -> Optional[Dashboard]:
+    """Сводка статусов для чата, если включен режим NOTIFY_MODE=dashboard.
+
+    Сводка заполняется последними статусами из history, поэтому после
+    перезапуска в ней остаются работы, которых нет в новых ответах API.
+    """
+    if not DASHBOARD_MODE:
+        return None
+    dashboard = Dashboard(
+        bot, chat_id, HOMEWORK_VERDICTS, DASHBOARD_INTERVAL,
+        timeout=SEND_TIMEOUT, messages=messages,
+    )
+    if history is not None:
+        dashboard.seed(history.keyed_statuses())
+    return dashboard
+
+
+def update_dashboard(
+    send_queue: SendQueue, dashboard: Optional[Dashboard]
+) -> None:
+    """Ставим обновление сводки в очередь отправки.
+
+    Сводку редактирует поток очереди с общим лимитом отправки; сбой
+    Telegram он только записывает в журнал, а изменение, отложенное
+    из-за min_interval, повторяет сам, не дожидаясь следующего опроса.
+    """
+    if dashboard is None:
+        return
+    send_queue.refresh(dashboard.chat_id, dashboard.update)
+
+
+def join_messages(*messages: str) -> str:
+    """Объединяем непустые сообщения в одно."""
+    return '\n'.join(message for message in messages if message)
+
+
+def start_servers(
+    on_homeworks: Callable[[Optional[str], List[dict]], None]
+) -> None:
+    """Запускаем включенные в окружении сервер метрик и прием вебхука."""
+    if METRICS_PORT:
+        metrics.start_metrics_server(METRICS_PORT)
+    if WEBHOOK_PORT:
+        start_webhook_server(
+            WEBHOOK_PORT, on_homeworks,
+            host=WEBHOOK_HOST, secret=WEBHOOK_SECRET,
+        )
+
+
+def start_commands(
+    bot: Bot,
+    send_queue: SendQueue,
+    histories: Dict[str, TransitionHistory],
+) -> Optional[CommandPoller]:
+    """Запускаем ответы на команды, если они включены BOT_COMMANDS=1.
+
+    histories сопоставляет chat_id (строкой) с историей переходов.
+    """
+    if not BOT_COMMANDS:
+        return None
+    commands = CommandPoller(bot, send_queue, histories, HOMEWORK_VERDICTS)
+    commands.start()
+    return commands
+
+
+def save_checkpoint(
+    checkpoint: Optional[Checkpoint], current_timestamp: int, message: str
+) -> None:
+    """Сохраняем состояние бота для продолжения работы после перезапуска."""
+    if checkpoint is None:
+        return
+    try:
+        checkpoint.save(current_timestamp, message)
+    except OSError as error:
+        logger.error(f'Не удалось сохранить контрольную точку: {error}')
+
+
+def poll_loop(
+    send_queue: SendQueue,
+    chat_id: Union[int, str],
+    headers: dict,
+    scheduler: AdaptiveScheduler,
+    status_index: StatusIndex,
+    errors: ErrorAggregator,
+    dashboard: Optional[Dashboard] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    current_timestamp: int = 0,
+    new_message: str = str(),
+    sleep: Optional[Callable[[float], None]] = None,
+    running: Callable[[], bool] = lambda: True,
+) -> None:
+    """Цикл опроса API и отправки уведомлений, пока running() истинно.
+
+    Пауза между опросами выполняется через sleep, поэтому цикл можно
+    прогнать на виртуальных часах (см. benchmarks.replay); по умолчанию
+    это time.sleep.
+    """
+    sleep = sleep or time.sleep
+    sleep(scheduler.initial_delay())
+    while running():
+        response, homeworks, message, retry_after = poll_statuses(
+            current_timestamp, headers, status_index, errors, dashboard
+        )
+        if response is not None:
+            current_timestamp = response['current_date']
+            scheduler.observe_many(homeworks)
+        elif message == new_message:
+            message = str()
+        update_dashboard(send_queue, dashboard)
+        message = join_messages(message, errors.digest())
+        if message:
+            send_queue.put(chat_id, message)
+            new_message = message
+        else:
+            logger.debug('Статус проверки домашней работы не изменился.')
+        save_checkpoint(checkpoint, current_timestamp, new_message)
+        sleep(scheduler.next_delay(retry_after))
+
+
 def main() -> None:
     """Основная логика работы бота."""
     logger.info('Программа запущена!')
@@ -157,41 +675,44 @@ def main() -> None:
         logger.critical(message)
         sys.exit(message)
     bot = Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = 0
-    message = new_message = str()
-    while True:
-        try:
-            response = get_api_answer(current_timestamp=current_timestamp)
-            homework = check_response(response)
-            message = parse_status(homework)
-        except exceptions.ErrorNotifications as exc:
-            logger.error(exc)
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logger.error(message)
-        else:
-            current_timestamp = response['current_date']
-        if message != new_message:
-            try:
-                send_message(bot, message)
-            except exceptions.SendingMessageReportError as error:
-                logger.error(error)
-            new_message = message
-        else:
-            logger.debug('Статус проверки домашней работы не изменился.')
-        time.sleep(RETRY_TIME)
+    checkpoint = Checkpoint(CHECKPOINT_PATH)
+    state = checkpoint.load()
+    scheduler = build_scheduler(key=HEADERS['Authorization'])
+    histories = {str(TELEGRAM_CHAT_ID): build_history()}
+    snapshots = start_history_snapshots(histories)
+    status_index = StatusIndex(histories[str(TELEGRAM_CHAT_ID)])
+    errors = build_error_aggregator()
+    dashboard = build_dashboard(
+        bot, TELEGRAM_CHAT_ID, histories[str(TELEGRAM_CHAT_ID)],
+        open_dashboard_messages(),
+    )
+    send_queue = SendQueue(
+        partial(send_to_chat, bot), outbox=build_outbox()
+    )
+    send_queue.start()
+    start_servers(partial(
+        ingest_homeworks, status_index, send_queue, dashboard=dashboard
+    ))
+    start_commands(bot, send_queue, histories)
+    try:
+        poll_loop(
+            send_queue, TELEGRAM_CHAT_ID, HEADERS, scheduler, status_index,
+            errors, dashboard, checkpoint,
+            current_timestamp=state['current_timestamp'],
+            new_message=state['message'],
+        )
+    finally:
+        send_queue.stop()
+        if snapshots is not None:
+            snapshots.stop()
 
 
 if __name__ == '__main__':
-    logging.basicConfig(
-        format=FORMAT,
-        level=logging.DEBUG,
-        handlers=[
-            logging.StreamHandler(stream=sys.stdout),
-        ],
-        encoding='UTF-8'
-    )
+    log_listener = log_config.setup_logging(FORMAT)
     try:
         main()
     except KeyboardInterrupt:
         logger.info('Работа программы завершена.')
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+LOG_MODE = os.getenv('LOG_MODE', 'sync')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', 1))
+LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', 0))
+LOG_RATE_WINDOW = float(os.getenv('LOG_RATE_WINDOW', 60))
+RATE_LIMIT_MAX_KEYS = 10000
+
+STAGE_PREFIXES = (
+    'Началась проверка',
+    'Проверка данных для получения',
+    'Проверка ответа API',
+    'Идет получение статуса',
+    'Получение статуса успешно',
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Структурированный вывод: одна JSON-запись на строку."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Форматируем запись журнала в JSON."""
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'file': record.filename,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class StageSamplingFilter(logging.Filter):
+    """Выборка сообщений о начале и завершении этапов опроса.
+
+    Из повторяющихся сообщений STAGE_PREFIXES в журнал попадает лишь
+    каждое sample_rate-е, остальные записи проходят без изменений.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        """Фильтр, пропускающий одну из sample_rate записей этапа."""
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Решаем, попадет ли запись в журнал."""
+        if self.sample_rate <= 1 or record.levelno > logging.INFO:
+            return True
+        if not isinstance(record.msg, str):
+            return True
+        if not record.msg.startswith(STAGE_PREFIXES):
+            return True
+        with self.lock:
+            count = self.counters.get(record.msg, 0)
+            self.counters[record.msg] = count + 1
+        return count % self.sample_rate == 0
+
+
+class RateLimitFilter(logging.Filter):
+    """Не более limit одинаковых сообщений за window секунд.
+
+    О подавленных повторах сообщается в первой записи следующего окна.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        """Не больше limit одинаковых записей за window секунд."""
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.seen: Dict[Tuple[str, str], Tuple[float, int, int]] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Решаем, попадет ли запись в журнал."""
+        if self.limit <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            if key not in self.seen and len(self.seen) >= RATE_LIMIT_MAX_KEYS:
+                self.prune(now)
+            window_start, count, suppressed = self.seen.get(key, (now, 0, 0))
+            if now - window_start >= self.window:
+                window_start, count = now, 0
+            if count >= self.limit:
+                self.seen[key] = (window_start, count, suppressed + 1)
+                return False
+            self.seen[key] = (window_start, count + 1, 0)
+        if suppressed and count == 0:
+            record.msg = (
+                f'{record.msg} (подавлено повторов: {suppressed})'
+            )
+        return True
+
+    def prune(self, now: float) -> None:
+        """Забываем сообщения, окно которых истекло."""
+        expired = [
+            key for key, (window_start, _, _) in self.seen.items()
+            if now - window_start >= self.window
+        ]
+        for key in expired:
+            del self.seen[key]
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Обработчик очереди, не блокирующий поток опроса.
+
+    При переполнении очереди запись отбрасывается, а потери считаются.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """Обработчик, кладущий записи в log_queue."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Кладем запись в очередь без ожидания."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def build_formatter(fmt: str) -> logging.Formatter:
+    """Форматтер для выбранного формата журнала."""
+    if LOG_FORMAT == 'json':
+        return JsonFormatter()
+    return logging.Formatter(fmt)
+
+
+def setup_logging(fmt: str) -> Optional[QueueListener]:
+    """Настраиваем журнал бота.
+
+    В режиме LOG_MODE=sync запись идет в stdout прямо из потока опроса,
+    как раньше. В режиме queue поток опроса лишь кладет запись
+    в ограниченную очередь, а в stdout ее пишет фоновый QueueListener;
+    возвращаемый слушатель нужно остановить при завершении программы.
+    """
+    stream_handler = logging.StreamHandler(stream=sys.stdout)
+    stream_handler.setFormatter(build_formatter(fmt))
+    filters = (
+        StageSamplingFilter(LOG_SAMPLE_RATE),
+        RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_WINDOW),
+    )
+    listener = None
+    if LOG_MODE == 'queue':
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = DroppingQueueHandler(log_queue)
+        listener = QueueListener(log_queue, stream_handler)
+    else:
+        handler = stream_handler
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.handlers[:] = [handler]
+    if listener is not None:
+        listener.start()
+    return listener
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+PREFIX = 'homework_bot'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными границами корзин.
+
+    У каждой гистограммы своя блокировка, поэтому запись в разные
+    этапы не конкурирует, а сама запись - это поиск корзины и три
+    сложения.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        """Пустая гистограмма с границами корзин buckets."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Учитываем одно измерение."""
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[list, float, int]:
+        """Согласованная копия накопленных значений."""
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    """Хранилище метрик бота в формате Prometheus."""
+
+    def __init__(self) -> None:
+        """Пустой реестр метрик."""
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.overruns: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        """Гистограмма длительностей этапа, создается при первом обращении."""
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def count_error(self, stage: str, error: BaseException) -> None:
+        """Учитываем исключение этапа по его классу."""
+        key = (stage, type(error).__name__)
+        with self.lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def count_overrun(self, stage: str) -> None:
+        """Учитываем вызов этапа, превысивший отведенное время."""
+        with self.lock:
+            self.overruns[stage] = self.overruns.get(stage, 0) + 1
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        name = f'{PREFIX}_stage_duration_seconds'
+        lines = [
+            f'# HELP {name} Длительность этапов цикла опроса.',
+            f'# TYPE {name} histogram',
+        ]
+        for stage, histogram in sorted(self.histograms.items()):
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{name}_bucket{{stage="{stage}",le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}'
+            )
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+        name = f'{PREFIX}_errors_total'
+        lines.append(f'# HELP {name} Исключения этапов по классам.')
+        lines.append(f'# TYPE {name} counter')
+        with self.lock:
+            errors = sorted(self.errors.items())
+        for (stage, exception), count in errors:
+            lines.append(
+                f'{name}{{stage="{stage}",exception="{exception}"}} {count}'
+            )
+        name = f'{PREFIX}_deadline_exceeded_total'
+        lines.append(
+            f'# HELP {name} Вызовы этапов дольше отведенного времени.'
+        )
+        lines.append(f'# TYPE {name} counter')
+        with self.lock:
+            overruns = sorted(self.overruns.items())
+        for stage, count in overruns:
+            lines.append(f'{name}{{stage="{stage}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def timed(stage: str, deadline: Optional[float] = None) -> Callable:
+    """Декоратор: длительность вызова и исключения этапа в REGISTRY.
+
+    Если задан deadline, вызовы дольше него учитываются отдельно
+    и пишутся в журнал.
+    """
+    def decorator(func: Callable) -> Callable:
+        histogram = REGISTRY.histogram(stage)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                REGISTRY.count_error(stage, error)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                histogram.observe(elapsed)
+                if deadline is not None:
+                    check_deadline(stage, elapsed, deadline)
+        return wrapper
+    return decorator
+
+
+def check_deadline(stage: str, elapsed: float, deadline: float) -> None:
+    """Учитываем и пишем в журнал этап, превысивший отведенное время."""
+    if elapsed > deadline:
+        REGISTRY.count_overrun(stage)
+        logger.warning(
+            f'Этап {stage} занял {elapsed:.1f} с '
+            f'при отведенных {deadline} с.'
+        )
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдаем метрики по адресу /metrics."""
+
+    def do_GET(self) -> None:
+        """Обрабатываем GET-запрос."""
+        if self.path != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Не пишем каждый запрос метрик в журнал."""
+
+
+def start_metrics_server(
+    port: int, host: str = '127.0.0.1'
+) -> ThreadingHTTPServer:
+    """Запускаем HTTP-сервер метрик в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    ).start()
+    logger.info(f'Метрики доступны на http://{host}:{port}/metrics')
+    return server
@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Set, Tuple, Union
+
+ChatId = Union[int, str]
+
+SQLITE_TIMEOUT = 5
+
+
+class Outbox:
+    """Сообщения, которые не удалось отправить, в файле SQLite.
+
+    Записи хранятся в порядке добавления и переживают перезапуск бота;
+    очередь отправки забирает их пачками и удаляет после доставки.
+
+    Файл может быть общим для нескольких процессов: если задан chats,
+    batch, chats и len видят только записи этих чатов. Так
+    недоставленные сообщения чата переходят к новому владельцу вместе
+    с аккаунтом и не теряются, когда воркер убирают.
+    """
+
+    def __init__(
+        self, path: str, chats: Optional[Iterable[ChatId]] = None
+    ) -> None:
+        """Открываем файл path; chats - чаты этого процесса или все."""
+        self.owned = (
+            None if chats is None
+            else sorted({json.dumps(chat_id) for chat_id in chats})
+        )
+        self.connection = sqlite3.connect(
+            path, timeout=SQLITE_TIMEOUT, check_same_thread=False,
+            isolation_level=None,
+        )
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS outbox ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'chat_id TEXT NOT NULL, text TEXT NOT NULL, '
+                'attempts INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL)'
+            )
+
+    def add(self, chat_id: ChatId, text: str) -> None:
+        """Сохраняем сообщение для повторной отправки."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT INTO outbox (chat_id, text, created) VALUES (?, ?, ?)',
+                (json.dumps(chat_id), text, time.time()),
+            )
+
+    def scope(self) -> Tuple[str, Tuple[str, ...]]:
+        """Условие WHERE и его параметры для чатов этого процесса."""
+        if self.owned is None:
+            return str(), ()
+        marks = ', '.join('?' * len(self.owned))
+        return f' WHERE chat_id IN ({marks})', tuple(self.owned)
+
+    def batch(self, limit: int) -> List[Tuple[int, ChatId, str, int]]:
+        """Самые старые сообщения: (id, chat_id, text, attempts)."""
+        where, params = self.scope()
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT id, chat_id, text, attempts FROM outbox'
+                f'{where} ORDER BY id LIMIT ?',
+                params + (limit,),
+            ).fetchall()
+        return [
+            (entry_id, json.loads(chat_id), text, attempts)
+            for entry_id, chat_id, text, attempts in rows
+        ]
+
+    def remove(self, entry_ids: List[int]) -> None:
+        """Удаляем доставленные сообщения."""
+        if not entry_ids:
+            return
+        with self.lock:
+            self.connection.executemany(
+                'DELETE FROM outbox WHERE id = ?',
+                [(entry_id,) for entry_id in entry_ids],
+            )
+
+    def record_attempt(self, entry_ids: List[int]) -> None:
+        """Учитываем неудачную попытку доставки."""
+        with self.lock:
+            self.connection.executemany(
+                'UPDATE outbox SET attempts = attempts + 1 WHERE id = ?',
+                [(entry_id,) for entry_id in entry_ids],
+            )
+
+    def chats(self) -> Set[ChatId]:
+        """Чаты, для которых есть недоставленные сообщения."""
+        where, params = self.scope()
+        with self.lock:
+            rows = self.connection.execute(
+                f'SELECT DISTINCT chat_id FROM outbox{where}', params
+            ).fetchall()
+        return {json.loads(chat_id) for chat_id, in rows}
+
+    def __len__(self) -> int:
+        """Число сообщений, ожидающих доставки."""
+        where, params = self.scope()
+        with self.lock:
+            return self.connection.execute(
+                f'SELECT COUNT(*) FROM outbox{where}', params
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Закрываем соединение с базой."""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,113 @@
+from typing import Any, Collection, Hashable, List, Optional
+
+import exceptions
+
+FIELDS = ('id', 'homework_name', 'status', 'date_updated')
+
+
+class Homework:
+    """Запись о домашней работе: только поля, которые использует бот.
+
+    Остальные поля ответа API (комментарий ревьюера, имя урока и т.п.)
+    не хранятся. Для кода, читающего записи как словари (StatusIndex,
+    планировщик), поддерживаются homework['key'] и homework.get(key).
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        homework_name: str,
+        status: str,
+        id: Optional[Hashable] = None,
+        date_updated: str = str(),
+    ) -> None:
+        """Запись из полей ответа API."""
+        self.id = id
+        self.homework_name = homework_name
+        self.status = status
+        self.date_updated = date_updated
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Значение поля или default, если поле не задано."""
+        value = getattr(self, key, None) if key in FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        """Значение поля; KeyError, если поле не задано."""
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def as_dict(self) -> dict:
+        """Заданные поля записи в виде словаря, как в ответе API."""
+        return {
+            field: getattr(self, field) for field in FIELDS
+            if getattr(self, field) is not None
+        }
+
+    def __eq__(self, other: object) -> bool:
+        """Записи равны, если совпадают все поля."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in FIELDS
+        )
+
+    def __repr__(self) -> str:
+        """Представление для журнала."""
+        return (
+            f'Homework({self.homework_name!r}, {self.status!r}, '
+            f'id={self.id!r}, date_updated={self.date_updated!r})'
+        )
+
+
+def validate_homeworks(
+    homeworks: object, statuses: Collection[str]
+) -> List[Homework]:
+    """Проверяем весь список работ за один проход и сжимаем записи.
+
+    Ошибки те же, что у validate_homework, и IncorrectTypeError, если
+    homeworks не список.
+    """
+    if not isinstance(homeworks, list):
+        raise exceptions.IncorrectTypeError(
+            'Ожидаемый тип данных: список домашних работ.'
+        )
+    return [validate_homework(homework, statuses) for homework in homeworks]
+
+
+def validate_homework(homework: object, statuses: Collection[str]) -> Homework:
+    """Проверяем одну запись о работе и сжимаем ее в Homework.
+
+    Уже проверенная запись Homework возвращается как есть. Ошибки те же,
+    что у parse_status: KeyError без homework_name, UnknownHomeworkStatus
+    без status, UndocumentedHomeworkStatusError при статусе не из
+    statuses; IncorrectTypeError, если запись не словарь.
+    """
+    if isinstance(homework, Homework):
+        return homework
+    if not isinstance(homework, dict):
+        raise exceptions.IncorrectTypeError(
+            f'Ожидаемый тип данных: словарь, получено: {homework}.'
+        )
+    if 'homework_name' not in homework:
+        raise KeyError(
+            f'Словарь {homework} не содержит ключ homework_name.'
+        )
+    status = homework.get('status')
+    if status is None:
+        raise exceptions.UnknownHomeworkStatus(
+            f'Словарь {homework} не содержит ключ status.'
+        )
+    if status not in statuses:
+        raise exceptions.UndocumentedHomeworkStatusError(
+            'Указан недокументированный статус домашней работы!'
+        )
+    return Homework(
+        homework['homework_name'],
+        status,
+        homework.get('id'),
+        homework.get('date_updated') or str(),
+    )
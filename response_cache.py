@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from records import Homework
+
+logger = logging.getLogger(__name__)
+
+MEMORY = 'memory'
+SQLITE = 'sqlite'
+
+TTL = 30
+MAX_ENTRIES = 1024
+SQLITE_TIMEOUT = 5
+
+
+def cache_key(authorization: str, from_date: int) -> str:
+    """Ключ ответа API: хеш токена и from_date.
+
+    Токен хешируется, чтобы он не попадал в файл межпроцессного кэша.
+    """
+    digest = hashlib.sha256(authorization.encode()).hexdigest()
+    return f'{digest}:{from_date}'
+
+
+def encode_record(value: object) -> dict:
+    """Записи Homework из потокового разбора сохраняются словарями."""
+    if isinstance(value, Homework):
+        return value.as_dict()
+    raise TypeError(f'Объект {value!r} нельзя сохранить в кэш.')
+
+
+class ResponseCache(ABC):
+    """Кэш ответов API с ограниченным временем жизни.
+
+    get_or_fetch отдает свежий ответ из кэша, а при промахе выполняет
+    запрос. Одновременные промахи по одному ключу внутри процесса ждут
+    первый запрос, поэтому один запрос к API обслуживает всех
+    подписчиков токена. Исключения запроса не кэшируются.
+    """
+
+    def __init__(self) -> None:
+        """Создаем блокировки для ключей, которые загружаются сейчас."""
+        self.key_locks: Dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Свежий ответ по ключу или None."""
+
+    @abstractmethod
+    def set(self, key: str, value: dict) -> None:
+        """Сохраняем ответ."""
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], dict]) -> dict:
+        """Ответ из кэша или результат fetch, сохраненный в кэш."""
+        value = self.get(key)
+        if value is not None:
+            logger.debug('Ответ API взят из кэша.')
+            return value
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    value = fetch()
+                    self.set(key, value)
+        finally:
+            with self.lock:
+                self.key_locks.pop(key, None)
+        return value
+
+
+class MemoryCache(ResponseCache):
+    """Кэш в памяти процесса с вытеснением давно не читавшихся записей.
+
+    Ответ отдается всем подписчикам одним и тем же объектом, поэтому
+    изменять его нельзя.
+    """
+
+    def __init__(
+        self,
+        ttl: float = TTL,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Кэш на ttl секунд, не больше max_entries ответов."""
+        super().__init__()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries: OrderedDict = OrderedDict()
+        self.entries_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Свежий ответ по ключу или None."""
+        with self.entries_lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            stored, value = entry
+            if self.clock() - stored >= self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        """Сохраняем ответ и вытесняем лишние записи."""
+        with self.entries_lock:
+            self.entries[key] = (self.clock(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Число записей."""
+        return len(self.entries)
+
+
+class SqliteCache(ResponseCache):
+    """Кэш в файле SQLite, общий для процессов на одной машине.
+
+    Время записи и последнего чтения хранятся в секундах time.time,
+    одинаковых во всех процессах. Ошибки базы не прерывают опрос:
+    они пишутся в журнал, а кэш считается промахнувшимся.
+
+    Соединение открывается при первом обращении в каждом процессе:
+    кэш можно создать до fork (как RESPONSE_CACHE при импорте
+    homework в супервизоре), и воркеры не разделят одно соединение
+    SQLite, что запрещено и может повредить файл.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = TTL,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Кэш в файле SQLite path; соединение открывается лениво."""
+        super().__init__()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.path = path
+        self.pid: Optional[int] = None
+        self.connection: Optional[sqlite3.Connection] = None
+        self.connection_lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        """Соединение текущего процесса; вызывается под connection_lock."""
+        if self.connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=SQLITE_TIMEOUT, check_same_thread=False,
+                isolation_level=None,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'stored REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self.connection = connection
+        return self.connection
+
+    def check_process(self) -> None:
+        """После fork забываем соединение и блокировку родителя."""
+        pid = os.getpid()
+        if self.pid != pid:
+            self.pid = pid
+            self.connection = None
+            self.connection_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Свежий ответ по ключу или None."""
+        now = self.clock()
+        self.check_process()
+        try:
+            with self.connection_lock:
+                connection = self.connect()
+                row = connection.execute(
+                    'SELECT value FROM responses WHERE key = ? AND stored > ?',
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute(
+                    'UPDATE responses SET accessed = ? WHERE key = ?',
+                    (now, key),
+                )
+        except sqlite3.Error as error:
+            logger.warning(f'Кэш ответов API недоступен: {error}')
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        """Сохраняем ответ, удаляем устаревшие и лишние записи."""
+        now = self.clock()
+        self.check_process()
+        try:
+            with self.connection_lock:
+                connection = self.connect()
+                connection.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(
+                        value, ensure_ascii=False, default=encode_record
+                    ), now, now),
+                )
+                connection.execute(
+                    'DELETE FROM responses WHERE stored <= ?',
+                    (now - self.ttl,),
+                )
+                connection.execute(
+                    'DELETE FROM responses WHERE key IN ('
+                    'SELECT key FROM responses ORDER BY accessed DESC '
+                    'LIMIT -1 OFFSET ?)',
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as error:
+            logger.warning(f'Кэш ответов API недоступен: {error}')
+
+    def __len__(self) -> int:
+        """Число записей."""
+        self.check_process()
+        with self.connection_lock:
+            return self.connect().execute(
+                'SELECT COUNT(*) FROM responses'
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Закрываем соединение с базой, если оно открыто в этом процессе."""
+        self.check_process()
+        with self.connection_lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+def build_cache(
+    backend: str, ttl: float, max_entries: int, path: str
+) -> Optional[ResponseCache]:
+    """Кэш выбранного типа; None, если время жизни не задано."""
+    if ttl <= 0:
+        return None
+    if backend == SQLITE:
+        return SqliteCache(path, ttl, max_entries)
+    if backend != MEMORY:
+        logger.warning(
+            f'Неизвестный тип кэша {backend}, используется {MEMORY}.'
+        )
+    return MemoryCache(ttl, max_entries)
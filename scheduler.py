@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Optional
+
+from circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 60
+REVIEWING_INTERVAL = 60 * 2
+BASE_INTERVAL = 60 * 10
+MAX_INTERVAL = 60 * 60
+BACKOFF_FACTOR = 2.0
+JITTER = 0.0
+
+REVIEWING_STATUS = 'reviewing'
+
+
+def phase(key: str) -> float:
+    """Доля интервала из [0, 1), одинаковая для ключа во всех процессах."""
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбираем заголовок Retry-After: число секунд или HTTP-дату."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Ведро токенов: не более rate операций в секунду в среднем."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """Ведро на capacity токенов (по умолчанию rate), полное."""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self) -> float:
+        """Забираем токен и возвращаем время ожидания до его появления."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class AdaptiveScheduler:
+    """Адаптивный интервал опроса API вместо фиксированного RETRY_TIME.
+
+    Пока хотя бы одна работа на проверке, опрос идет с интервалом
+    reviewing_interval. Если статусы меняются, интервал сбрасывается
+    к базовому, а при простое растет в backoff_factor раз до
+    max_interval. Подсказка сервера Retry-After и пауза разомкнутого
+    предохранителя API выполняются всегда, даже если превышают
+    max_interval.
+
+    Чтобы экземпляры бота, запущенные одновременно, не опрашивали API
+    в один и тот же момент, первый опрос сдвигается на детерминированную
+    по key долю stagger_window (по умолчанию base_interval), а каждый
+    интервал случайно растягивается или сжимается на долю jitter.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        base_interval: float = BASE_INTERVAL,
+        reviewing_interval: float = REVIEWING_INTERVAL,
+        backoff_factor: float = BACKOFF_FACTOR,
+        breaker: Optional[CircuitBreaker] = None,
+        key: Optional[str] = None,
+        jitter: float = JITTER,
+        stagger_window: Optional[float] = None,
+    ) -> None:
+        """Планировщик с интервалами опроса в секундах."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = base_interval
+        self.reviewing_interval = reviewing_interval
+        self.backoff_factor = backoff_factor
+        self.breaker = breaker
+        self.key = key
+        self.jitter = jitter
+        self.stagger_window = (
+            stagger_window if stagger_window is not None else base_interval
+        )
+        self.interval = base_interval
+        self.statuses: Dict[str, str] = {}
+        self.changed = False
+
+    def observe(self, homework_name: str, status: str) -> None:
+        """Запоминаем статус работы из очередного ответа API."""
+        if self.statuses.get(homework_name) != status:
+            self.changed = True
+        self.statuses[homework_name] = status
+
+    def observe_many(self, homeworks: Iterable[dict]) -> None:
+        """Запоминаем статусы всех работ из ответа API."""
+        for homework in homeworks:
+            self.observe(homework['homework_name'], homework['status'])
+
+    @property
+    def reviewing(self) -> bool:
+        """Есть ли работы, находящиеся на проверке."""
+        return REVIEWING_STATUS in self.statuses.values()
+
+    def clamp(self, interval: float) -> float:
+        """Ограничиваем интервал заданными границами."""
+        return max(self.min_interval, min(interval, self.max_interval))
+
+    def initial_delay(self) -> float:
+        """Пауза перед первым опросом: фаза аккаунта внутри окна."""
+        if self.key is None:
+            return 0.0
+        return phase(self.key) * self.stagger_window
+
+    def next_delay(self, retry_after: Optional[float] = None) -> float:
+        """Вычисляем паузу до следующего опроса."""
+        if self.reviewing:
+            self.interval = self.reviewing_interval
+        elif self.changed:
+            self.interval = self.base_interval
+        else:
+            self.interval = self.interval * self.backoff_factor
+        self.interval = self.clamp(self.interval)
+        self.changed = False
+        delay = self.interval
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        if retry_after is not None and retry_after > delay:
+            delay = retry_after
+        if self.breaker is not None:
+            delay = max(delay, self.breaker.retry_in())
+        logger.debug(f'Следующий опрос API через {delay:.0f} с.')
+        return delay
@@ -0,0 +1,344 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union,
+)
+
+from telegram.constants import MAX_MESSAGE_LENGTH
+
+import exceptions
+from circuit_breaker import full_jitter
+from outbox import Outbox
+from scheduler import TokenBucket
+
+GLOBAL_RATE = 30
+CHAT_INTERVAL = 1.0
+STOP_TIMEOUT = 5.0
+REDELIVERY_BATCH = 50
+REDELIVERY_BASE = 5
+REDELIVERY_MAX = 10 * 60
+MAX_ATTEMPTS = 20
+REDELIVERY: Tuple = ()
+
+ChatId = Union[int, str]
+Update = Callable[[], Optional[float]]
+
+logger = logging.getLogger(__name__)
+
+
+class SendQueue:
+    """Фоновая очередь исходящих сообщений Telegram.
+
+    Опрос API только кладет сообщения в очередь и не ждет отправки.
+    Фоновый поток соблюдает общий лимит бота (global_rate сообщений
+    в секунду) и лимит на чат (не чаще одного сообщения в
+    chat_interval секунд), склеивает накопившиеся для чата сообщения
+    в одно и при ответе 429 выдерживает паузу retry_after.
+
+    Если задан outbox, сообщение, которое не удалось отправить,
+    сохраняется в нем, а не теряется. Пока у чата есть недоставленные
+    сообщения, новые сообщения чата тоже идут в outbox, чтобы не
+    нарушить порядок. Outbox разбирается тем же фоновым потоком пачками
+    по REDELIVERY_BATCH записей с экспоненциальной паузой после сбоя;
+    сообщение, не доставленное за MAX_ATTEMPTS попыток, удаляется.
+
+    Кроме сообщений поток выполняет обновления (например, правку
+    сводки), поставленные через refresh, с теми же лимитами. Из
+    нескольких обновлений чата, ждущих отправки, остается последнее.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[ChatId, str], None],
+        global_rate: float = GLOBAL_RATE,
+        chat_interval: float = CHAT_INTERVAL,
+        outbox: Optional[Outbox] = None,
+    ) -> None:
+        """Очередь, отправляющая сообщения через send."""
+        self.send = send
+        self.outbox = outbox
+        self.backlog_chats = outbox.chats() if outbox is not None else set()
+        self.redeliver_at = 0.0
+        self.failures = 0
+        self.bucket = TokenBucket(global_rate)
+        self.chat_interval = chat_interval
+        self.pending: Dict[ChatId, List[str]] = OrderedDict()
+        self.updates: Dict[ChatId, Update] = OrderedDict()
+        self.update_ready: Dict[ChatId, float] = {}
+        self.chat_ready: Dict[ChatId, float] = {}
+        self.paused_until = 0.0
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(
+            target=self.run, name='send-queue', daemon=True
+        )
+
+    def limit_rate(self, global_rate: float) -> None:
+        """Меняем общий лимит отправки на ходу."""
+        self.bucket = TokenBucket(global_rate)
+
+    def start(self) -> None:
+        """Запускаем фоновую отправку."""
+        self.thread.start()
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        """Останавливаем очередь, дав ей время отправить остаток.
+
+        Если за timeout секунд отправить все не удалось, оставшиеся
+        сообщения откладываются в outbox и уйдут после перезапуска.
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout)
+        self.save_pending()
+
+    def save_pending(self) -> None:
+        """Откладываем в outbox сообщения, оставшиеся в очереди."""
+        if self.outbox is None:
+            return
+        with self.condition:
+            pending = list(self.pending.items())
+            self.pending.clear()
+        saved = 0
+        for chat_id, texts in pending:
+            for text in texts:
+                self.store(chat_id, text)
+                saved += 1
+        if saved:
+            logger.warning(
+                f'Сообщения, не отправленные до остановки, отложены: {saved}.'
+            )
+
+    def put(self, chat_id: ChatId, text: str) -> None:
+        """Ставим сообщение в очередь на отправку."""
+        with self.condition:
+            self.pending.setdefault(chat_id, []).append(text)
+            self.condition.notify()
+
+    def refresh(self, chat_id: ChatId, update: Update) -> None:
+        """Ставим обновление чата в очередь, заменяя прежнее.
+
+        update вызывается фоновым потоком и может бросить
+        SendingRetryAfterError или SendingMessageReportError. Если он
+        вернул число, обновление повторяется через столько секунд.
+        """
+        with self.condition:
+            self.updates.pop(chat_id, None)
+            self.updates[chat_id] = update
+            self.condition.notify()
+
+    def __len__(self) -> int:
+        """Число сообщений, ожидающих отправки."""
+        with self.condition:
+            return sum(len(texts) for texts in self.pending.values())
+
+    def next_ready(
+        self,
+        now: float,
+        chats: Iterable[ChatId],
+        not_before: Optional[Mapping[ChatId, float]] = None,
+    ) -> Tuple[Optional[ChatId], Optional[float]]:
+        """Ищем чат, в который уже можно отправлять, или время ожидания."""
+        wait = None
+        for chat_id in chats:
+            ready_at = max(
+                self.chat_ready.get(chat_id, 0.0), self.paused_until,
+                (not_before or {}).get(chat_id, 0.0),
+            )
+            if ready_at <= now:
+                return chat_id, 0.0
+            if wait is None or ready_at - now < wait:
+                wait = ready_at - now
+        return None, wait
+
+    def coalesce(self, chat_id: ChatId) -> str:
+        """Склеиваем накопившиеся для чата сообщения в пределах лимита."""
+        texts = self.pending[chat_id]
+        parts = [texts.pop(0)]
+        length = len(parts[0])
+        while texts and length + 2 + len(texts[0]) <= MAX_MESSAGE_LENGTH:
+            length += 2 + len(texts[0])
+            parts.append(texts.pop(0))
+        if not texts:
+            del self.pending[chat_id]
+        return '\n\n'.join(parts)
+
+    def take(self) -> Optional[Tuple]:
+        """Ждем, пока какой-либо чат станет доступен для отправки.
+
+        Возвращает (chat_id, text), (chat_id, update) для обновления,
+        REDELIVERY, если пора разбирать outbox, или None после остановки
+        очереди.
+        """
+        with self.condition:
+            while True:
+                if self.stopped and not self.pending and not self.updates:
+                    return None
+                now = time.monotonic()
+                redeliver_at = max(self.redeliver_at, self.paused_until)
+                if self.backlog_chats and redeliver_at <= now:
+                    return REDELIVERY
+                chat_id, wait = self.next_ready(now, self.pending)
+                if chat_id is not None:
+                    return chat_id, self.coalesce(chat_id)
+                chat_id, update_wait = self.next_ready(
+                    now, self.updates,
+                    None if self.stopped else self.update_ready,
+                )
+                if chat_id is not None:
+                    self.update_ready.pop(chat_id, None)
+                    return chat_id, self.updates.pop(chat_id)
+                waits = [wait, update_wait]
+                if self.backlog_chats:
+                    waits.append(redeliver_at - now)
+                self.condition.wait(min(
+                    (delay for delay in waits if delay is not None),
+                    default=None,
+                ))
+
+    def throttle(self) -> None:
+        """Выдерживаем общий лимит отправки."""
+        delay = self.bucket.consume()
+        if delay:
+            time.sleep(delay)
+
+    def store(self, chat_id: ChatId, text: str) -> None:
+        """Откладываем сообщение в outbox."""
+        self.outbox.add(chat_id, text)
+        self.backlog_chats.add(chat_id)
+
+    def backoff(self) -> None:
+        """Откладываем разбор outbox после неудачной отправки."""
+        self.failures += 1
+        self.redeliver_at = time.monotonic() + full_jitter(
+            self.failures, REDELIVERY_BASE, REDELIVERY_MAX
+        )
+
+    def deliver(self, chat_id: ChatId, text: str) -> None:
+        """Отправляем сообщение и учитываем ответ Telegram."""
+        if chat_id in self.backlog_chats:
+            self.store(chat_id, text)
+            return
+        self.throttle()
+        try:
+            self.send(chat_id, text)
+        except exceptions.SendingRetryAfterError as error:
+            logger.warning(error)
+            with self.condition:
+                self.pending.setdefault(chat_id, []).insert(0, text)
+                self.pending.move_to_end(chat_id, last=False)
+                self.paused_until = time.monotonic() + error.retry_after
+            return
+        except exceptions.SendingMessageReportError as error:
+            logger.error(error)
+            if self.outbox is not None:
+                self.store(chat_id, text)
+                self.backoff()
+        with self.condition:
+            self.chat_ready[chat_id] = time.monotonic() + self.chat_interval
+
+    def apply(self, chat_id: ChatId, update: Update) -> None:
+        """Выполняем обновление чата и учитываем ответ Telegram.
+
+        Отложенное обновление (update вернул задержку или Telegram
+        попросил подождать) возвращается в очередь, если его еще не
+        заменил новый refresh. Неудачное обновление не откладывается в
+        outbox: следующий вызов refresh поставит его заново.
+        """
+        self.throttle()
+        delay = None
+        try:
+            delay = update()
+        except exceptions.SendingRetryAfterError as error:
+            logger.warning(error)
+            with self.condition:
+                self.paused_until = time.monotonic() + error.retry_after
+                self.retry(chat_id, update, 0.0)
+            return
+        except exceptions.SendingMessageReportError as error:
+            logger.error(error)
+        with self.condition:
+            self.chat_ready[chat_id] = time.monotonic() + self.chat_interval
+            if delay is not None:
+                self.retry(chat_id, update, delay)
+
+    def retry(self, chat_id: ChatId, update: Update, delay: float) -> None:
+        """Возвращаем обновление в очередь; вызывается под condition."""
+        if self.stopped:
+            return
+        if self.updates.setdefault(chat_id, update) is update:
+            self.update_ready[chat_id] = time.monotonic() + delay
+
+    def redelivery_groups(
+        self, entries: List[Tuple[int, ChatId, str, int]]
+    ) -> Dict[ChatId, Tuple[List[int], List[str], int]]:
+        """Склеиваем пачку outbox по чатам с сохранением порядка."""
+        groups: Dict[ChatId, Tuple[List[int], List[str], int]] = (
+            OrderedDict()
+        )
+        full = set()
+        for entry_id, chat_id, text, attempts in entries:
+            if chat_id in full:
+                continue
+            ids, texts, most = groups.get(chat_id, ([], [], 0))
+            length = sum(len(part) + 2 for part in texts) + len(text)
+            if texts and length > MAX_MESSAGE_LENGTH:
+                full.add(chat_id)
+                continue
+            ids.append(entry_id)
+            texts.append(text)
+            groups[chat_id] = (ids, texts, max(most, attempts))
+        return groups
+
+    def redeliver(self) -> None:
+        """Отправляем пачку сообщений из outbox."""
+        entries = self.outbox.batch(REDELIVERY_BATCH)
+        groups = self.redelivery_groups(entries)
+        for chat_id, (ids, texts, attempts) in groups.items():
+            self.throttle()
+            try:
+                self.send(chat_id, '\n\n'.join(texts))
+            except exceptions.SendingRetryAfterError as error:
+                logger.warning(error)
+                with self.condition:
+                    self.paused_until = time.monotonic() + error.retry_after
+                break
+            except exceptions.SendingMessageReportError as error:
+                logger.error(f'Повторная отправка не удалась: {error}')
+                self.outbox.record_attempt(ids)
+                if attempts + 1 >= MAX_ATTEMPTS:
+                    logger.error(
+                        f'Сообщения для чата {chat_id} не доставлены '
+                        f'за {MAX_ATTEMPTS} попыток и удалены.'
+                    )
+                    self.outbox.remove(ids)
+                self.backoff()
+                break
+            self.outbox.remove(ids)
+            with self.condition:
+                self.chat_ready[chat_id] = (
+                    time.monotonic() + self.chat_interval
+                )
+        else:
+            self.failures = 0
+            if entries:
+                logger.info(
+                    f'Доставлено отложенных сообщений: {len(entries)}.'
+                )
+        self.backlog_chats = self.outbox.chats()
+
+    def run(self) -> None:
+        """Фоновый цикл отправки сообщений."""
+        while True:
+            item = self.take()
+            if item is None:
+                return
+            if item is REDELIVERY:
+                self.redeliver()
+            elif callable(item[1]):
+                self.apply(*item)
+            else:
+                self.deliver(*item)
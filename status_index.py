@@ -0,0 +1,66 @@
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from history import TransitionHistory, parse_timestamp
+
+
+class StatusIndex:
+    """Индекс последних известных статусов домашних работ.
+
+    Ключ записи - id работы, а если его нет, то homework_name; значение -
+    пара (status, date_updated). Переходом считается новый статус или
+    более поздний date_updated при том же статусе (работа успела
+    побывать на повторной проверке между опросами). Запись с более
+    ранним date_updated считается устаревшей и игнорируется.
+
+    Индекс обновляют и цикл опроса, и прием событий вебхука, поэтому
+    пакетное обновление выполняется под блокировкой lock. Если задан
+    history, каждый переход записывается и в него со временем из
+    date_updated (или текущим, если его нет).
+    """
+
+    def __init__(self, history: Optional[TransitionHistory] = None) -> None:
+        """Пустой индекс; переходы пишутся и в history, если он задан."""
+        self.records: Dict[Hashable, Tuple[str, str]] = {}
+        self.history = history
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(homework: dict) -> Hashable:
+        """Ключ работы в индексе."""
+        return homework.get('id', homework['homework_name'])
+
+    def get(self, homework: dict) -> Optional[Tuple[str, str]]:
+        """Последний известный статус работы и время его изменения."""
+        return self.records.get(self.key(homework))
+
+    def is_transition(self, homework: dict) -> bool:
+        """Отличается ли статус работы от последнего известного."""
+        record = self.get(homework)
+        if record is None:
+            return True
+        status, date_updated = record
+        new_date_updated = homework.get('date_updated', str())
+        if new_date_updated and date_updated:
+            if new_date_updated < date_updated:
+                return False
+            if new_date_updated > date_updated:
+                return True
+        return status != homework['status']
+
+    def update(self, homework: dict) -> bool:
+        """Запоминаем статус работы и сообщаем, был ли это переход."""
+        if not self.is_transition(homework):
+            return False
+        self.records[self.key(homework)] = (
+            homework['status'], homework.get('date_updated', str())
+        )
+        if self.history is not None:
+            self.history.record(
+                homework, parse_timestamp(homework.get('date_updated'))
+            )
+        return True
+
+    def __len__(self) -> int:
+        """Число отслеживаемых работ."""
+        return len(self.records)
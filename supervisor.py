@@ -0,0 +1,360 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from bisect import bisect
+from multiprocessing.connection import Connection
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+import async_poller
+import exceptions
+import homework
+import log_config
+from send_queue import GLOBAL_RATE, SendQueue
+
+SUPERVISOR_WORKERS = int(
+    os.getenv('SUPERVISOR_WORKERS', os.cpu_count() or 1)
+)
+RING_REPLICAS = 100
+RESTART_DELAY = 5
+CHECK_INTERVAL = 1
+STOP_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+
+def ring_hash(key: str) -> int:
+    """Положение ключа на кольце, одинаковое во всех процессах."""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Кольцо консистентного хеширования аккаунтов по воркерам.
+
+    У каждого воркера replicas точек на кольце; аккаунт достается
+    воркеру с ближайшей точкой по часовой стрелке. При добавлении или
+    удалении воркера переезжают только аккаунты, попавшие на его точки.
+    """
+
+    def __init__(
+        self, nodes: Iterable[Hashable], replicas: int = RING_REPLICAS
+    ) -> None:
+        """Кольцо из узлов nodes, у каждого replicas точек."""
+        points = sorted(
+            (ring_hash(f'{node}:{replica}'), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self.hashes = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> Hashable:
+        """Воркер, которому принадлежит ключ."""
+        index = bisect(self.hashes, ring_hash(key)) % len(self.hashes)
+        return self.nodes[index]
+
+
+def apply_rate(
+    global_rate: float, send_queue: Optional[SendQueue] = None
+) -> None:
+    """Задаем воркеру долю лимита отправки Telegram и запросов к API.
+
+    Предел запросов к API делится между воркерами в той же доле,
+    что и лимит отправки Telegram.
+    """
+    homework.API_CLIENT.limit_rate(
+        homework.API_RATE_LIMIT * global_rate / GLOBAL_RATE
+    )
+    if send_queue is not None:
+        send_queue.limit_rate(global_rate)
+
+
+def follow_rate(rates: Connection, send_queue: SendQueue) -> None:
+    """Применяем новые доли лимита, которые присылает супервизор.
+
+    Фоновый поток читает их из канала rates до его закрытия.
+    """
+    def run() -> None:
+        while True:
+            try:
+                global_rate = rates.recv()
+            except (EOFError, OSError):
+                return
+            apply_rate(global_rate, send_queue)
+            logger.info(f'Новая доля лимита отправки: {global_rate:.2f}.')
+
+    threading.Thread(target=run, name='rates', daemon=True).start()
+
+
+def stop_worker(signum: int, frame: object) -> None:
+    """Завершаем воркер по SIGTERM так, чтобы выполнились блоки finally.
+
+    Очередь отправки откладывает неотправленное в outbox, а история
+    сохраняет последний снимок; повторный SIGTERM их не прерывает.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+def run_worker(
+    worker_id: int,
+    entries: List[dict],
+    global_rate: float,
+    rates: Connection,
+) -> None:
+    """Воркер: опрашивает свою часть аккаунтов.
+
+    Сервер метрик и прием вебхука воркеры не запускают, иначе они
+    конкурировали бы за один порт. Контрольные точки и история
+    переходов общие, по имени аккаунта, а outbox - общий по чату:
+    недоставленные сообщения переходят к новому владельцу аккаунта.
+    Новую долю лимитов после изменения числа воркеров супервизор
+    присылает через канал rates, без перезапуска воркера.
+    """
+    for signum in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+        signal.signal(signum, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, stop_worker)
+    log_listener = log_config.setup_logging(homework.FORMAT)
+    apply_rate(global_rate)
+    logger.info(f'Воркер {worker_id} опрашивает аккаунтов: {len(entries)}.')
+    try:
+        async_poller.run_accounts(
+            async_poller.build_accounts(
+                entries, async_poller.open_checkpoints()
+            ),
+            global_rate=global_rate,
+            servers=False,
+            on_start=lambda send_queue: follow_rate(rates, send_queue),
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
+
+
+class Supervisor:
+    """Распределяет аккаунты по процессам-воркерам и следит за ними.
+
+    Аккаунты назначаются воркерам по кольцу HashRing, общий лимит
+    отправки Telegram делится между воркерами поровну. Упавший воркер
+    перезапускается не чаще раза в RESTART_DELAY секунд. Сигналы:
+    SIGHUP перечитывает файл аккаунтов, SIGTTIN и SIGTTOU добавляют и
+    убирают воркер, SIGTERM и SIGINT останавливают всех. При смене
+    распределения перезапускаются только воркеры, у которых изменились
+    аккаунты; остальным новая доля лимита отправляется по каналу.
+    Воркер без аккаунтов не запускается. Временные метки аккаунтов
+    хранятся в общем файле контрольных точек, поэтому перезапущенный
+    воркер не присылает заново уведомления о старых статусах.
+    """
+
+    def __init__(
+        self,
+        accounts_path: str,
+        workers: int = SUPERVISOR_WORKERS,
+        target: Callable[
+            [int, List[dict], float, Connection], None
+        ] = run_worker,
+    ) -> None:
+        """Супервизор workers воркеров, запускающих target."""
+        self.accounts_path = accounts_path
+        self.workers = max(1, workers)
+        self.target = target
+        self.entries: List[dict] = []
+        self.shards: Dict[int, List[dict]] = {}
+        self.rates: Dict[int, float] = {}
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.channels: Dict[int, Connection] = {}
+        self.started: Dict[int, float] = {}
+        self.signals: List[int] = []
+        self.running = False
+
+    @property
+    def global_rate(self) -> float:
+        """Доля лимита отправки Telegram на одного воркера."""
+        return GLOBAL_RATE / self.workers
+
+    def assign(self) -> Dict[int, List[dict]]:
+        """Распределение аккаунтов по воркерам."""
+        ring = HashRing(range(self.workers))
+        shards = {worker_id: [] for worker_id in range(self.workers)}
+        for entry in self.entries:
+            shards[ring.node_for(str(entry['name']))].append(entry)
+        return shards
+
+    def spawn(self, worker_id: int) -> None:
+        """Запускаем воркер с его частью аккаунтов."""
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=self.target,
+            args=(
+                worker_id, self.shards[worker_id], self.global_rate, reader
+            ),
+            name=f'worker-{worker_id}',
+            daemon=True,
+        )
+        process.start()
+        reader.close()
+        self.close_channel(worker_id)
+        self.channels[worker_id] = writer
+        self.processes[worker_id] = process
+        self.started[worker_id] = time.monotonic()
+        self.rates[worker_id] = self.global_rate
+
+    def retire(self, worker_id: int) -> None:
+        """Останавливаем воркер."""
+        process = self.processes.pop(worker_id, None)
+        self.started.pop(worker_id, None)
+        self.rates.pop(worker_id, None)
+        self.close_channel(worker_id)
+        if process is None:
+            return
+        if process.is_alive():
+            process.terminate()
+        process.join(STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def close_channel(self, worker_id: int) -> None:
+        """Закрываем канал долей лимита воркера."""
+        channel = self.channels.pop(worker_id, None)
+        if channel is not None:
+            channel.close()
+
+    def send_rate(self, worker_id: int) -> None:
+        """Отправляем работающему воркеру его долю лимита."""
+        if self.rates.get(worker_id) == self.global_rate:
+            return
+        try:
+            self.channels[worker_id].send(self.global_rate)
+        except (KeyError, OSError) as error:
+            logger.warning(
+                f'Воркер {worker_id} не получил долю лимита: {error}'
+            )
+            return
+        self.rates[worker_id] = self.global_rate
+
+    def rebalance(self) -> None:
+        """Перераспределяем аккаунты и перезапускаем затронутые воркеры."""
+        shards = self.assign()
+        changed = [
+            worker_id for worker_id in set(self.processes) | set(shards)
+            if self.shards.get(worker_id) != shards.get(worker_id)
+        ]
+        self.shards = shards
+        for worker_id in changed:
+            self.retire(worker_id)
+        for worker_id in changed:
+            if shards.get(worker_id):
+                self.spawn(worker_id)
+        for worker_id in self.processes:
+            self.send_rate(worker_id)
+        logger.info(
+            f'Аккаунтов: {len(self.entries)}, воркеров: {self.workers}, '
+            f'перезапущено: {len(changed)}.'
+        )
+
+    def reload(self) -> None:
+        """Перечитываем файл аккаунтов и перераспределяем их."""
+        try:
+            self.entries = async_poller.read_account_entries(
+                self.accounts_path
+            )
+        except (
+            OSError,
+            ValueError,
+            exceptions.IncorrectTypeError,
+            exceptions.MissingKeyError,
+        ) as error:
+            logger.error(f'Не удалось прочитать файл аккаунтов: {error}')
+            return
+        self.rebalance()
+
+    def resize(self, workers: int) -> None:
+        """Меняем число воркеров."""
+        workers = max(1, workers)
+        if workers != self.workers:
+            self.workers = workers
+            self.rebalance()
+
+    def check(self) -> None:
+        """Перезапускаем завершившиеся воркеры."""
+        now = time.monotonic()
+        for worker_id, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            if now - self.started[worker_id] < RESTART_DELAY:
+                continue
+            logger.warning(
+                f'Воркер {worker_id} завершился с кодом {process.exitcode}, '
+                'перезапускаем.'
+            )
+            process.join()
+            self.spawn(worker_id)
+
+    def handle_signal(self, signum: int, frame: object) -> None:
+        """Откладываем обработку сигнала до цикла наблюдения."""
+        self.signals.append(signum)
+
+    def process_signals(self) -> None:
+        """Выполняем команды, полученные сигналами."""
+        while self.signals:
+            signum = self.signals.pop(0)
+            if signum == signal.SIGHUP:
+                self.reload()
+            elif signum == signal.SIGTTIN:
+                self.resize(self.workers + 1)
+            elif signum == signal.SIGTTOU:
+                self.resize(self.workers - 1)
+            else:
+                self.running = False
+
+    def run(self) -> None:
+        """Запускаем воркеры и следим за ними до сигнала остановки."""
+        for signum in (
+            signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU,
+            signal.SIGTERM, signal.SIGINT,
+        ):
+            signal.signal(signum, self.handle_signal)
+        self.running = True
+        self.reload()
+        try:
+            while self.running:
+                self.process_signals()
+                self.check()
+                time.sleep(CHECK_INTERVAL)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Останавливаем все воркеры."""
+        for worker_id in list(self.processes):
+            self.retire(worker_id)
+
+
+def main() -> None:
+    """Опрос аккаунтов из файла конфигурации несколькими процессами."""
+    logger.info(
+        f'Программа запущена в режиме супервизора, воркеров: '
+        f'{SUPERVISOR_WORKERS}.'
+    )
+    if not homework.TELEGRAM_TOKEN:
+        message = 'Недоступна переменная окружения!'
+        logger.critical(message)
+        sys.exit(message)
+    Supervisor(async_poller.ACCOUNTS_PATH).run()
+    logger.info('Работа программы завершена.')
+
+
+if __name__ == '__main__':
+    log_listener = log_config.setup_logging(homework.FORMAT)
+    try:
+        main()
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
@@ -0,0 +1,201 @@
+import pytest
+import requests
+
+import api_client
+import exceptions
+
+
+class TestPracticumClient:
+
+    def test_pool_settings(self):
+        client = api_client.PracticumClient(
+            pool_connections=3, pool_maxsize=7
+        )
+        adapter = client.session.get_adapter(
+            'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+        )
+        assert adapter._pool_connections == 3, (
+            'Проверьте, что клиент передает адаптеру число пулов соединений'
+        )
+        assert adapter._pool_maxsize == 7, (
+            'Проверьте, что клиент передает адаптеру размер пула соединений'
+        )
+        client.close()
+
+    def test_client_shared_by_get_api_answer(self):
+        import homework
+
+        assert isinstance(homework.API_CLIENT, api_client.PracticumClient), (
+            'Убедитесь, что get_api_answer использует общий HTTP-клиент'
+        )
+
+    def test_conditional_request_headers(self, monkeypatch):
+        sent_headers = []
+
+        class MockResponse:
+            status_code = 200
+            headers = {'ETag': '"v1"'}
+
+        def mock_session_get(url, headers=None, params=None, **kwargs):
+            sent_headers.append(headers)
+            return MockResponse()
+
+        client = api_client.PracticumClient()
+        monkeypatch.setattr(client.session, 'get', mock_session_get)
+        url = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+        headers = {'Authorization': 'OAuth token'}
+        client.get(url=url, headers=headers, params={'from_date': 1})
+        client.remember_answer(url, headers, {'from_date': 1}, {})
+        client.get(url=url, headers=headers, params={'from_date': 1})
+        client.get(url=url, headers=headers, params={'from_date': 2})
+        assert 'If-None-Match' not in sent_headers[0]
+        assert sent_headers[1]['If-None-Match'] == '"v1"', (
+            'Проверьте, что повторный запрос с теми же параметрами '
+            'передает ETag прошлого ответа'
+        )
+        assert 'If-None-Match' not in sent_headers[2], (
+            'Проверьте, что ETag не передается в запросе '
+            'с другими параметрами'
+        )
+        assert headers == {'Authorization': 'OAuth token'}, (
+            'Проверьте, что переданные заголовки не изменяются'
+        )
+
+    def test_not_modified_shared_token(self, monkeypatch):
+        import json
+
+        import homework
+        from status_index import StatusIndex
+
+        body = {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 100,
+        }
+
+        class MockResponse:
+
+            def __init__(self, headers):
+                self.status_code = 304 if 'If-None-Match' in headers else 200
+                self.headers = {'ETag': '"v1"'}
+                self.content = json.dumps(body).encode()
+
+        def mock_session_get(url, headers=None, **kwargs):
+            return MockResponse(headers)
+
+        client = api_client.PracticumClient()
+        monkeypatch.setattr(client.session, 'get', mock_session_get)
+        monkeypatch.setattr(homework, 'API_CLIENT', client)
+        monkeypatch.setattr(homework, 'RESPONSE_CACHE', None)
+        monkeypatch.setattr(homework, 'API_STREAM_DECODE', False)
+        headers = {'Authorization': 'OAuth shared'}
+        messages = [
+            homework.poll_statuses(
+                0, headers, StatusIndex(), homework.build_error_aggregator()
+            )[2]
+            for _ in range(2)
+        ]
+        assert messages[0] and messages[1] == messages[0], (
+            'Проверьте, что подписчик с тем же токеном, получивший 304, '
+            'тоже узнает о переходе статуса'
+        )
+
+    def test_not_modified_is_not_an_error(self, monkeypatch):
+        import homework
+
+        class MockResponse:
+            status_code = 304
+            headers = {}
+
+        monkeypatch.setattr(
+            homework.API_CLIENT, 'get', lambda **kwargs: MockResponse()
+        )
+        response = homework.fetch_api_answer(100, {})
+        assert response == {'homeworks': [], 'current_date': 100}, (
+            'Проверьте, что ответ 304 обрабатывается как отсутствие изменений'
+        )
+
+    def test_timeouts(self, monkeypatch):
+        import homework
+
+        calls = []
+
+        def mock_session_get(url, timeout=None, **kwargs):
+            calls.append(timeout)
+            raise requests.Timeout('read timed out')
+
+        client = api_client.PracticumClient(timeout=(1, 2))
+        monkeypatch.setattr(client.session, 'get', mock_session_get)
+        monkeypatch.setattr(homework, 'API_CLIENT', client)
+        monkeypatch.setattr(homework, 'RESPONSE_CACHE', None)
+        with pytest.raises(exceptions.BadRequestError):
+            homework.fetch_api_answer(0, {'Authorization': 'OAuth token'})
+        assert calls == [(1, 2)], (
+            'Проверьте, что запрос к API ограничен таймаутами'
+        )
+
+    def test_rate_limit_spreads_requests(self, monkeypatch):
+        import time
+
+        calls = []
+
+        class MockResponse:
+            status_code = 200
+            headers = {}
+
+        def mock_session_get(**kwargs):
+            calls.append(time.monotonic())
+            return MockResponse()
+
+        client = api_client.PracticumClient(rate_limit=50)
+        monkeypatch.setattr(client.session, 'get', mock_session_get)
+        for _ in range(6):
+            client.get(url='http://stub/', headers={}, params={})
+        assert calls[-1] - calls[0] >= 0.09, (
+            'Проверьте, что запросы к API не превышают rate_limit в секунду'
+        )
+
+    def test_stream_read_timeout_is_api_failure(self, monkeypatch):
+        import homework
+        import metrics
+        from urllib3.exceptions import ReadTimeoutError
+
+        class TimingOutBody:
+            decode_content = False
+
+            def read(self, size=-1):
+                raise ReadTimeoutError(None, None, 'read timed out')
+
+        class MockResponse:
+            status_code = 200
+            headers = {}
+            raw = TimingOutBody()
+
+        def mock_session_get(**kwargs):
+            return MockResponse()
+
+        client = api_client.PracticumClient(rate_limit=5)
+        client.throttle()
+        monkeypatch.setattr(client.session, 'get', mock_session_get)
+        monkeypatch.setattr(homework, 'API_CLIENT', client)
+        monkeypatch.setattr(homework, 'RESPONSE_CACHE', None)
+        monkeypatch.setattr(homework, 'API_STREAM_DECODE', True)
+        monkeypatch.setattr(homework, 'API_CONNECT_TIMEOUT', 0.1)
+        monkeypatch.setattr(homework, 'API_READ_TIMEOUT', 0.05)
+        monkeypatch.setattr(metrics.REGISTRY, 'overruns', {})
+        with pytest.raises(exceptions.BadRequestError):
+            homework.fetch_api_answer(0, {'Authorization': 'OAuth token'})
+        assert client.breaker.failures == 1, (
+            'Проверьте, что сбой чтения тела ответа учитывается '
+            'предохранителем'
+        )
+        assert not metrics.REGISTRY.overruns, (
+            'Проверьте, что ожидание rate_limit не входит в бюджет запроса'
+        )
+        for _ in range(client.breaker.failure_threshold):
+            with pytest.raises((exceptions.BadRequestError,
+                                exceptions.CircuitOpenError)):
+                homework.fetch_api_answer(0, {'Authorization': 'OAuth token'})
+        assert client.breaker.state == 'open', (
+            'Проверьте, что при потоковом разборе успех учитывается только '
+            'после чтения тела и повторные сбои размыкают предохранитель'
+        )
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import async_poller
+import exceptions
+
+
+class MockSendQueue:
+
+    def __init__(self):
+        self.sent = []
+
+    def put(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+    def refresh(self, chat_id, update):
+        update()
+
+
+class TestAsyncPoller:
+
+    def test_load_accounts(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        path.write_text(json.dumps([
+            {'name': 'student', 'practicum_token': 'token', 'chat_id': 1}
+        ]), encoding='UTF-8')
+        accounts = async_poller.load_accounts(str(path))
+        assert len(accounts) == 1
+        assert accounts[0].headers == {'Authorization': 'OAuth token'}, (
+            'Проверьте, что для каждого аккаунта формируются свои заголовки'
+        )
+
+    def test_load_accounts_missing_key(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        path.write_text(json.dumps([{'name': 'student'}]), encoding='UTF-8')
+        with pytest.raises(exceptions.MissingKeyError):
+            async_poller.load_accounts(str(path))
+
+    def test_poll_account_sends_only_changes(self, monkeypatch,
+                                             random_timestamp):
+        def mock_fetch(current_timestamp, headers):
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            }
+
+        import homework
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', mock_fetch)
+        send_queue = MockSendQueue()
+        account = async_poller.Account('student', 'token', 42)
+        async_poller.poll_account(send_queue, account)
+        async_poller.poll_account(send_queue, account)
+        assert len(send_queue.sent) == 1, (
+            'Убедитесь, что неизменившийся статус не отправляется повторно'
+        )
+        assert send_queue.sent[0][0] == 42
+        assert account.current_timestamp == random_timestamp
+
+    def test_poll_account_resumes_from_checkpoint(self, monkeypatch,
+                                                  tmp_path,
+                                                  random_timestamp):
+        requested = []
+
+        def mock_fetch(current_timestamp, headers):
+            requested.append(current_timestamp)
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            }
+
+        import homework
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', mock_fetch)
+        path = str(tmp_path / 'accounts.sqlite3')
+        entries = [{'name': 'student', 'practicum_token': 't', 'chat_id': 42}]
+        send_queue = MockSendQueue()
+        account, = async_poller.build_accounts(
+            entries, async_poller.open_checkpoints(path)
+        )
+        async_poller.poll_account(send_queue, account)
+        restarted, = async_poller.build_accounts(
+            entries, async_poller.open_checkpoints(path)
+        )
+        assert restarted.current_timestamp == random_timestamp, (
+            'Проверьте, что после перезапуска аккаунт продолжает опрос '
+            'с сохраненной временной метки'
+        )
+        assert restarted.last_message == send_queue.sent[0][1]
+        async_poller.poll_account(send_queue, restarted)
+        assert requested == [0, random_timestamp]
+
+    def test_poll_account_coalesces_errors(self, monkeypatch,
+                                           random_timestamp):
+        failing = [True]
+
+        def mock_fetch(current_timestamp, headers):
+            if failing[0]:
+                raise exceptions.NotOkStatusCodeError('Статус 500.')
+            return {'homeworks': [], 'current_date': random_timestamp}
+
+        import homework
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', mock_fetch)
+        send_queue = MockSendQueue()
+        account = async_poller.Account('student', 'token', 42)
+        for _ in range(3):
+            async_poller.poll_account(send_queue, account)
+        assert len(send_queue.sent) == 1, (
+            'Убедитесь, что повторяющаяся ошибка не отправляется повторно'
+        )
+        failing[0] = False
+        async_poller.poll_account(send_queue, account)
+        assert len(send_queue.sent) == 2
+        assert 'восстановлена' in send_queue.sent[1][1], (
+            'Убедитесь, что после устранения сбоя отправляется сообщение '
+            'о восстановлении'
+        )
+
+    def test_poll_account_dashboard_mode(self, monkeypatch,
+                                         random_timestamp):
+        def mock_fetch(current_timestamp, headers):
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            }
+
+        class MockDashboard:
+
+            def __init__(self):
+                self.chat_id = 42
+                self.records = []
+                self.updates = 0
+
+            def observe(self, records):
+                self.records.extend(records)
+
+            def update(self):
+                self.updates += 1
+
+        import homework
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', mock_fetch)
+        send_queue = MockSendQueue()
+        account = async_poller.Account('student', 'token', 42)
+        account.dashboard = MockDashboard()
+        async_poller.poll_account(send_queue, account)
+        assert not send_queue.sent, (
+            'Убедитесь, что в режиме сводки переходы не отправляются '
+            'отдельными сообщениями'
+        )
+        assert account.dashboard.records[0].homework_name == 'hw'
+        assert account.dashboard.updates == 1
+
+    def test_concurrency_limit(self, monkeypatch):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def mock_poll_account(send_queue, account):
+            with lock:
+                active.append(account)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(account)
+
+        monkeypatch.setattr(async_poller, 'poll_account', mock_poll_account)
+        accounts = [
+            async_poller.Account(str(i), 'token', i) for i in range(20)
+        ]
+        poller = async_poller.AsyncPoller(None, accounts, concurrency=3)
+
+        async def poll_all():
+            semaphore = asyncio.Semaphore(poller.concurrency)
+            await asyncio.gather(*(
+                poller.poll(account, semaphore) for account in accounts
+            ))
+
+        asyncio.run(poll_all())
+        assert len(peak) == 20
+        assert max(peak) <= 3, (
+            'Проверьте, что число одновременных опросов ограничено'
+        )
@@ -0,0 +1,31 @@
+from benchmarks import run_benchmark
+
+
+class TestBenchmark:
+
+    def test_benchmark_smoke(self, tmp_path):
+        import homework
+
+        endpoint, client = homework.ENDPOINT, homework.API_CLIENT
+        output = tmp_path / 'bench.jsonl'
+        arguments = run_benchmark.parse_args([
+            '--accounts', '3', '--rounds', '2', '--concurrency', '2',
+            '--api-latency', '0', '--telegram-latency', '0',
+            '--memory-accounts', '2',
+        ])
+        report = run_benchmark.run(arguments)
+        run_benchmark.publish(report, str(output))
+        assert report['polls'] == 6, (
+            'Проверьте, что прогон опрашивает каждый аккаунт в каждом цикле'
+        )
+        assert report['api_requests'] >= 6
+        for key in (
+            'polls_per_second', 'cycle_p50_ms', 'cycle_p99_ms',
+            'memory_per_account_bytes',
+        ):
+            assert key in report
+        assert output.read_text(encoding='UTF-8').count('\n') == 1
+        assert (homework.ENDPOINT, homework.API_CLIENT) == (
+            endpoint, client
+        ), 'Проверьте, что прогон восстанавливает ENDPOINT и API_CLIENT'
+
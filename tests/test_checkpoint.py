@@ -0,0 +1,51 @@
+from checkpoint import AccountCheckpoints, Checkpoint
+
+
+class TestCheckpoint:
+
+    def test_load_missing_file(self, tmp_path):
+        state = Checkpoint(str(tmp_path / 'checkpoint.json')).load()
+        assert state == {'current_timestamp': 0, 'message': ''}, (
+            'Проверьте, что при отсутствии контрольной точки '
+            'бот начинает с нулевой временной метки'
+        )
+
+    def test_save_and_load(self, tmp_path, random_timestamp):
+        path = str(tmp_path / 'checkpoint.json')
+        Checkpoint(path).save(random_timestamp, 'Сообщение')
+        state = Checkpoint(path).load()
+        assert state['current_timestamp'] == random_timestamp, (
+            'Проверьте, что временная метка восстанавливается после перезапуска'
+        )
+        assert state['message'] == 'Сообщение', (
+            'Проверьте, что последнее сообщение восстанавливается '
+            'после перезапуска'
+        )
+        assert [p.name for p in tmp_path.iterdir()] == ['checkpoint.json'], (
+            'Убедитесь, что временные файлы не остаются после сохранения'
+        )
+
+    def test_load_corrupted_file(self, tmp_path):
+        path = tmp_path / 'checkpoint.json'
+        path.write_text('{"current_timestamp": ', encoding='UTF-8')
+        state = Checkpoint(str(path)).load()
+        assert state['current_timestamp'] == 0, (
+            'Проверьте, что поврежденная контрольная точка не ломает запуск'
+        )
+
+    def test_account_checkpoints(self, tmp_path, random_timestamp):
+        path = str(tmp_path / 'accounts.sqlite3')
+        checkpoints = AccountCheckpoints(path)
+        assert checkpoints.load('student') == {
+            'current_timestamp': 0, 'message': '',
+        }
+        checkpoints.save('student', random_timestamp, 'Сообщение')
+        checkpoints.save('other', 1, '')
+        checkpoints.close()
+        state = AccountCheckpoints(path).load('student')
+        assert state == {
+            'current_timestamp': random_timestamp, 'message': 'Сообщение',
+        }, (
+            'Проверьте, что контрольная точка аккаунта восстанавливается '
+            'после перезапуска'
+        )
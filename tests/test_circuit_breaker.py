@@ -0,0 +1,67 @@
+import circuit_breaker
+from circuit_breaker import CircuitBreaker
+
+
+class VirtualClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def test_full_jitter_bounds(self):
+        for attempt in range(10):
+            delay = circuit_breaker.full_jitter(attempt, 60, 600)
+            assert 0 <= delay <= min(600, 60 * 2 ** attempt), (
+                'Проверьте, что пауза с полным джиттером не выходит '
+                'за экспоненциальную границу'
+            )
+
+    def test_open_half_open_closed(self, monkeypatch):
+        monkeypatch.setattr(
+            circuit_breaker, 'full_jitter', lambda attempt, base, cap: 10
+        )
+        clock = VirtualClock()
+        breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+        breaker.record_failure()
+        assert breaker.allow(), (
+            'Проверьте, что до порога сбоев запросы проходят'
+        )
+        breaker.record_failure()
+        assert breaker.state == circuit_breaker.OPEN
+        assert not breaker.allow(), (
+            'Проверьте, что разомкнутый предохранитель отклоняет запросы'
+        )
+        assert breaker.retry_in() == 10
+        clock.now = 10
+        assert breaker.allow(), (
+            'Проверьте, что после паузы пропускается пробный запрос'
+        )
+        assert breaker.state == circuit_breaker.HALF_OPEN
+        assert not breaker.allow(), (
+            'Проверьте, что в состоянии half-open пропускается '
+            'только один пробный запрос'
+        )
+        breaker.record_success()
+        assert breaker.state == circuit_breaker.CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self, monkeypatch):
+        monkeypatch.setattr(
+            circuit_breaker, 'full_jitter', lambda attempt, base, cap: 5
+        )
+        clock = VirtualClock()
+        breaker = CircuitBreaker(failure_threshold=1, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == circuit_breaker.OPEN, (
+            'Проверьте, что сбой пробного запроса снова размыкает '
+            'предохранитель'
+        )
+        assert breaker.attempt == 2
@@ -0,0 +1,98 @@
+from commands import CommandPoller, NO_DATA
+from history import TransitionHistory
+from status_index import StatusIndex
+
+VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+}
+
+
+class MockSendQueue:
+
+    def __init__(self):
+        self.sent = []
+
+    def put(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class MockChatMessage:
+
+    def __init__(self, chat_id, text):
+        self.chat_id = chat_id
+        self.text = text
+
+
+class MockUpdate:
+
+    def __init__(self, update_id, chat_id, text):
+        self.update_id = update_id
+        self.effective_message = MockChatMessage(chat_id, text)
+
+
+class MockBot:
+
+    def __init__(self, updates):
+        self.updates = updates
+        self.offsets = []
+
+    def get_updates(self, offset=None, timeout=None, allowed_updates=None):
+        self.offsets.append(offset)
+        updates, self.updates = self.updates, []
+        return updates
+
+
+class TestCommands:
+
+    def test_status_index_records_history(self):
+        history = TransitionHistory(size=2)
+        index = StatusIndex(history)
+        index.update({'homework_name': 'hw1', 'status': 'reviewing'})
+        index.update({'homework_name': 'hw1', 'status': 'reviewing'})
+        index.update({'homework_name': 'hw1', 'status': 'approved'})
+        index.update({'homework_name': 'hw2', 'status': 'reviewing'})
+        assert len(history) == 2, (
+            'Проверьте, что история хранит ограниченное число переходов'
+        )
+        assert history.statuses() == [
+            ('hw1', 'approved'), ('hw2', 'reviewing')
+        ]
+
+    def test_answers_from_history(self, monkeypatch):
+        import homework
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Команды не должны обращаться к API')
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', fail)
+        history = TransitionHistory()
+        history.record({'homework_name': 'hw1', 'status': 'reviewing'})
+        history.record({'homework_name': 'hw1', 'status': 'approved'})
+        bot = MockBot([
+            MockUpdate(10, 42, '/status'),
+            MockUpdate(11, 42, '/history@homework_bot'),
+            MockUpdate(12, 7, '/status'),
+            MockUpdate(13, 42, 'привет'),
+        ])
+        send_queue = MockSendQueue()
+        commands = CommandPoller(bot, send_queue, {'42': history}, VERDICTS)
+        commands.poll()
+        commands.poll()
+        assert bot.offsets == [None, 14], (
+            'Проверьте, что обработанные обновления подтверждаются offset'
+        )
+        assert [chat_id for chat_id, _ in send_queue.sent] == [42, 42], (
+            'Проверьте, что бот отвечает только в известные чаты '
+            'и только на команды'
+        )
+        status, recent = (text for _, text in send_queue.sent)
+        assert status == f'Статусы домашних работ:\nhw1: {VERDICTS["approved"]}'
+        assert recent.count('hw1') == 2
+
+    def test_no_data(self):
+        commands = CommandPoller(
+            None, MockSendQueue(), {'1': TransitionHistory()}, VERDICTS
+        )
+        assert commands.reply('1', '/status') == NO_DATA
+        assert commands.reply('1', '/unknown') is None
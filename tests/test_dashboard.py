@@ -0,0 +1,151 @@
+import pytest
+from telegram.error import BadRequest, RetryAfter
+
+import exceptions
+from dashboard import Dashboard
+from records import Homework
+
+VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+}
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MockMessage:
+
+    def __init__(self, message_id):
+        self.message_id = message_id
+
+
+class MockBot:
+
+    def __init__(self):
+        self.calls = []
+        self.edit_error = None
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.calls.append(('send', text))
+        return MockMessage(len(self.calls))
+
+    def pin_chat_message(self, chat_id, message_id, disable_notification,
+                         **kwargs):
+        self.calls.append(('pin', message_id))
+
+    def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        if self.edit_error is not None:
+            raise self.edit_error
+        self.calls.append(('edit', text))
+
+
+class TestDashboard:
+
+    def make(self, min_interval=10):
+        bot = MockBot()
+        clock = FakeClock()
+        return bot, clock, Dashboard(bot, 42, VERDICTS, min_interval, clock)
+
+    def test_first_flush_sends_and_pins(self):
+        bot, clock, dashboard = self.make()
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        assert dashboard.flush()
+        assert [call[0] for call in bot.calls] == ['send', 'pin']
+        assert 'hw1: Работа взята на проверку ревьюером.' in bot.calls[0][1]
+
+    def test_unchanged_content_not_resent(self):
+        bot, clock, dashboard = self.make()
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        dashboard.flush()
+        clock.now += 100
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        assert not dashboard.flush(), (
+            'Проверьте, что неизменившаяся сводка не отправляется повторно'
+        )
+        assert len(bot.calls) == 2
+
+    def test_throttled_edit(self):
+        bot, clock, dashboard = self.make()
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        dashboard.flush()
+        dashboard.observe([Homework('hw1', 'approved')])
+        assert not dashboard.flush(), (
+            'Проверьте, что сводка обновляется не чаще min_interval'
+        )
+        clock.now += 10
+        assert dashboard.flush()
+        assert bot.calls[-1][0] == 'edit', (
+            'Проверьте, что сводка редактируется, а не отправляется заново'
+        )
+        assert 'Ура!' in bot.calls[-1][1]
+
+    def test_throttled_update_asks_for_retry(self):
+        bot, clock, dashboard = self.make()
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        assert dashboard.update() is None
+        clock.now += 4
+        dashboard.observe([Homework('hw1', 'approved')])
+        assert dashboard.update() == 6, (
+            'Проверьте, что отложенное изменение сводки просит повтора '
+            'к next_update'
+        )
+        clock.now += 6
+        assert dashboard.update() is None
+        assert 'Ура!' in bot.calls[-1][1]
+
+    def test_resend_when_message_deleted(self):
+        bot, clock, dashboard = self.make(min_interval=0)
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        dashboard.flush()
+        bot.edit_error = BadRequest('Message to edit not found')
+        dashboard.observe([Homework('hw1', 'approved')])
+        dashboard.flush()
+        assert [call[0] for call in bot.calls] == [
+            'send', 'pin', 'send', 'pin'
+        ]
+
+    def test_retry_after(self):
+        bot, clock, dashboard = self.make(min_interval=0)
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        dashboard.flush()
+        bot.edit_error = RetryAfter(30)
+        dashboard.observe([Homework('hw1', 'approved')])
+        with pytest.raises(exceptions.SendingRetryAfterError):
+            dashboard.flush()
+        bot.edit_error = None
+        clock.now += 10
+        assert not dashboard.flush()
+        clock.now += 20
+        assert dashboard.flush()
+
+    def test_restored_after_restart(self, tmp_path):
+        from checkpoint import DashboardMessages
+        from history import TransitionHistory
+
+        history = TransitionHistory()
+        history.record({'id': 1, 'homework_name': 'hw1', 'status': 'approved'})
+        messages = DashboardMessages(str(tmp_path / 'dashboard.sqlite3'))
+        bot = MockBot()
+        dashboard = Dashboard(bot, 42, VERDICTS, 0, FakeClock(),
+                              messages=messages)
+        dashboard.seed(history.keyed_statuses())
+        assert dashboard.flush()
+        restarted = Dashboard(bot, 42, VERDICTS, 0, FakeClock(),
+                              messages=messages)
+        restarted.seed(history.keyed_statuses())
+        restarted.observe([Homework('hw2', 'reviewing', 2)])
+        assert restarted.flush()
+        assert [call[0] for call in bot.calls] == ['send', 'pin', 'edit'], (
+            'Проверьте, что после перезапуска сводка редактирует '
+            'сохраненное сообщение'
+        )
+        assert 'hw1: Работа проверена' in bot.calls[-1][1], (
+            'Проверьте, что сводка заполняется статусами из истории'
+        )
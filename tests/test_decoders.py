@@ -0,0 +1,100 @@
+import io
+import json
+
+import pytest
+
+import decoders
+from exceptions import IncorrectTypeError
+
+
+class TestDecoders:
+
+    RESPONSE = {
+        'homeworks': [
+            {
+                'id': 1,
+                'homework_name': 'hw1',
+                'status': 'approved',
+                'date_updated': '2022-01-02T10:00:00Z',
+                'reviewer_comment': 'Всё нравится',
+                'lesson': {'name': 'Итоговый проект', 'id': 7},
+            },
+            {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+        ],
+        'current_date': 1000198991,
+    }
+
+    def test_decode(self):
+        content = json.dumps(self.RESPONSE).encode()
+        assert decoders.decode(content) == self.RESPONSE
+
+    def test_decode_invalid(self):
+        with pytest.raises(decoders.DECODE_ERRORS):
+            decoders.decode(b'{"homeworks": ')
+
+    def test_stream_decode(self):
+        pytest.importorskip('ijson')
+        content = io.BytesIO(json.dumps(self.RESPONSE).encode())
+        response = decoders.stream_decode(content)
+        assert response['current_date'] == 1000198991
+        assert response['homeworks'] == [
+            {
+                'id': 1,
+                'homework_name': 'hw1',
+                'status': 'approved',
+                'date_updated': '2022-01-02T10:00:00Z',
+            },
+            {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+        ], (
+            'Проверьте, что при потоковом разборе от работы '
+            'остаются только нужные поля'
+        )
+
+    def test_stream_decode_invalid(self):
+        pytest.importorskip('ijson')
+        with pytest.raises(decoders.DECODE_ERRORS):
+            decoders.stream_decode(io.BytesIO(b'{"homeworks": ['))
+
+    def test_stream_decode_validates_records(self):
+        pytest.importorskip('ijson')
+        from records import Homework, validate_homework
+
+        statuses = ('approved', 'reviewing')
+        validated = []
+
+        def validate(record):
+            validated.append(record['homework_name'])
+            return validate_homework(record, statuses)
+
+        content = io.BytesIO(json.dumps(self.RESPONSE).encode())
+        response = decoders.stream_decode(content, validate)
+        assert validated == ['hw1', 'hw2']
+        assert response['homeworks'] == [
+            Homework('hw1', 'approved', 1, '2022-01-02T10:00:00Z'),
+            Homework('hw2', 'reviewing', 2),
+        ], 'Проверьте, что записи проверяются по мере потокового разбора'
+        broken = {'homeworks': ['hw1', {'homework_name': 'hw2'}]}
+        with pytest.raises(IncorrectTypeError):
+            decoders.stream_decode(
+                io.BytesIO(json.dumps(broken).encode()),
+                lambda record: validate_homework(record, statuses),
+            )
+
+    @pytest.mark.parametrize('homeworks', ['hw', 7, {}, {'hw': 1}, None])
+    def test_stream_decode_keeps_homeworks_type(self, homeworks):
+        pytest.importorskip('ijson')
+        import homework
+
+        body = {'homeworks': homeworks, 'current_date': 1000198991}
+        errors = []
+        for response in (
+            json.loads(json.dumps(body)),
+            decoders.stream_decode(io.BytesIO(json.dumps(body).encode())),
+        ):
+            with pytest.raises(Exception) as error:
+                homework.check_homeworks(response)
+            errors.append(error.type)
+        assert errors[0] is errors[1], (
+            'Проверьте, что потоковый разбор сохраняет тип homeworks '
+            'и исключения совпадают с обычным разбором'
+        )
@@ -0,0 +1,64 @@
+from error_digest import ErrorAggregator
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1_600_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestErrorAggregator:
+
+    def test_suppresses_repeats_within_window(self):
+        clock = FakeClock()
+        errors = ErrorAggregator(window=60, digest_interval=600, clock=clock)
+        assert errors.report(ValueError('сбой')) == (
+            'Сбой в работе программы: сбой'
+        )
+        clock.now += 10
+        assert errors.report(ValueError('сбой')) == '', (
+            'Проверьте, что повтор ошибки в окне подавляется'
+        )
+        assert errors.report(KeyError('ключ')), (
+            'Проверьте, что ошибки другого класса не подавляются'
+        )
+        clock.now += 60
+        assert errors.report(ValueError('сбой')), (
+            'Проверьте, что после окна ошибка снова отправляется'
+        )
+
+    def test_digest(self):
+        clock = FakeClock()
+        errors = ErrorAggregator(window=600, digest_interval=60, clock=clock)
+        errors.report(ValueError())
+        assert errors.digest() == ''
+        clock.now += 30
+        errors.report(ValueError())
+        errors.report(ValueError())
+        clock.now += 30
+        digest = errors.digest()
+        assert digest.startswith('Сводка ошибок:')
+        assert 'ValueError: 3 раз' in digest, (
+            'Проверьте, что сводка содержит число ошибок класса'
+        )
+        clock.now += 60
+        assert errors.digest() == '', (
+            'Проверьте, что без новых подавленных ошибок сводка не отправляется'
+        )
+
+    def test_recover(self):
+        errors = ErrorAggregator(clock=FakeClock())
+        assert errors.recover() == ''
+        errors.report(ValueError())
+        errors.report(ValueError())
+        message = errors.recover()
+        assert 'ValueError (2 раз)' in message
+        assert errors.recover() == '', (
+            'Проверьте, что сообщение о восстановлении отправляется один раз'
+        )
+        assert errors.report(ValueError()), (
+            'Проверьте, что после восстановления ошибка отправляется сразу'
+        )
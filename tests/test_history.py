@@ -0,0 +1,128 @@
+from history import (
+    HISTORY_OVERHEAD, HOMEWORK_SIZE, HOMEWORKS_LIMIT, SLOT_SIZE,
+    HistoryStore, TransitionHistory, fit_size,
+)
+
+
+def record(history, name, status, timestamp, homework_id=None):
+    homework = {'homework_name': name, 'status': status}
+    if homework_id is not None:
+        homework['id'] = homework_id
+    history.record(homework, timestamp)
+
+
+class TestHistory:
+
+    def test_ring_buffer_evicts_oldest(self):
+        history = TransitionHistory(size=3)
+        for timestamp in range(5):
+            record(history, f'hw{timestamp}', 'reviewing', timestamp)
+        assert len(history) == 3, (
+            'Проверьте, что история хранит не больше size переходов'
+        )
+        assert history.recent(10) == [
+            (2.0, 'hw2', 'reviewing'),
+            (3.0, 'hw3', 'reviewing'),
+            (4.0, 'hw4', 'reviewing'),
+        ], 'Проверьте, что новые переходы вытесняют самые старые'
+        assert len(history.statuses()) == 5, (
+            'Проверьте, что последние статусы хранятся для всех работ'
+        )
+
+    def test_range_queries(self):
+        history = TransitionHistory(size=6)
+        record(history, 'hw1', 'reviewing', 10)
+        record(history, 'hw2', 'reviewing', 20)
+        record(history, 'hw1', 'rejected', 30)
+        record(history, 'hw2', 'approved', 40)
+        record(history, 'hw1', 'reviewing', 50)
+        record(history, 'hw1', 'approved', 60)
+        record(history, 'hw2', 'rejected', 70)
+        assert history.between(20, 50) == [
+            (20.0, 'hw2', 'reviewing'),
+            (30.0, 'hw1', 'rejected'),
+            (40.0, 'hw2', 'approved'),
+        ], 'Проверьте выборку переходов за интервал [start, end)'
+        assert history.between(name='hw1') == [
+            (30.0, 'hw1', 'rejected'),
+            (50.0, 'hw1', 'reviewing'),
+            (60.0, 'hw1', 'approved'),
+        ], (
+            'Проверьте, что выборка по имени возвращает только хранимые '
+            'переходы работы'
+        )
+        assert history.between(55, name='hw1') == [
+            (60.0, 'hw1', 'approved'),
+        ]
+        assert history.between(name='unknown') == []
+
+    def test_memory_cap(self):
+        assert fit_size(1, 0, 50) == 50, (
+            'Проверьте, что без лимита памяти размер истории не меняется'
+        )
+        accounts = 100
+        limit = accounts * (
+            HISTORY_OVERHEAD + HOMEWORKS_LIMIT * HOMEWORK_SIZE + 20 * SLOT_SIZE
+        )
+        size = fit_size(accounts, limit, 50)
+        assert size == 20, (
+            'Проверьте, что истории всех аккаунтов укладываются в лимит памяти'
+        )
+        assert fit_size(10 ** 6, 1, 50) == 1, (
+            'Проверьте, что размер истории не округляется вверх сверх лимита'
+        )
+        histories = [TransitionHistory(size) for _ in range(accounts)]
+        for history in histories:
+            for number in range(10 * size):
+                record(
+                    history, f'{number:064}', 'reviewing', number,
+                    homework_id=number,
+                )
+        assert sum(history.nbytes() for history in histories) <= limit, (
+            'Проверьте, что память историй не растет сверх лимита'
+        )
+        history = histories[0]
+        assert len(history.statuses()) == HOMEWORKS_LIMIT
+        assert len(history.names) <= 2 * size, (
+            'Проверьте, что вытесненные из буфера имена удаляются'
+        )
+        last = f'{10 * size - 1:064}'
+        assert history.between(name=last) == [
+            (10 * size - 1.0, last, 'reviewing')
+        ]
+
+    def test_snapshot_round_trip(self, tmp_path):
+        path = str(tmp_path / 'history.sqlite3')
+        history = TransitionHistory(size=4)
+        record(history, 'hw1', 'reviewing', 10, homework_id=1)
+        record(history, 'hw1', 'approved', 20, homework_id=1)
+        HistoryStore(path).save({'student': history})
+        restored = TransitionHistory(size=4)
+        assert HistoryStore(path).load({'student': restored}) == 1
+        assert restored.recent(10) == history.recent(10), (
+            'Проверьте, что история восстанавливается из снимка'
+        )
+        assert restored.statuses() == [('hw1', 'approved')]
+
+    def test_snapshots_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / 'history.sqlite3')
+        first, second = TransitionHistory(), TransitionHistory()
+        record(first, 'hw1', 'approved', 10)
+        record(second, 'hw2', 'rejected', 20)
+        HistoryStore(path).save({'first': first})
+        HistoryStore(path).save({'second': second})
+        moved = TransitionHistory()
+        assert HistoryStore(path).load({'first': moved}) == 1, (
+            'Проверьте, что снимок аккаунта не теряется, когда другой '
+            'воркер сохраняет свои аккаунты в тот же файл'
+        )
+        assert moved.statuses() == [('hw1', 'approved')]
+
+    def test_load_corrupted_snapshot(self, tmp_path):
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+        store.connection.execute(
+            "INSERT INTO histories (key, snapshot) VALUES ('student', '{')"
+        )
+        history = TransitionHistory()
+        assert store.load({'student': history, 'missing': history}) == 0
+        assert len(history) == 0
@@ -0,0 +1,53 @@
+import json
+import logging
+import queue
+
+import log_config
+
+
+def make_record(msg, level=logging.INFO):
+    return logging.LogRecord(
+        'homework', level, 'homework.py', 1, msg, None, None
+    )
+
+
+class TestLogConfig:
+
+    def test_json_formatter(self):
+        line = log_config.JsonFormatter().format(make_record('Сообщение'))
+        entry = json.loads(line)
+        assert entry['message'] == 'Сообщение'
+        assert entry['level'] == 'INFO'
+
+    def test_stage_sampling(self):
+        sampling = log_config.StageSamplingFilter(sample_rate=3)
+        passed = [
+            sampling.filter(make_record('Началась проверка ответа API.'))
+            for _ in range(6)
+        ]
+        assert passed == [True, False, False, True, False, False], (
+            'Проверьте, что сообщения об этапах опроса выбираются '
+            'с заданной частотой'
+        )
+        assert sampling.filter(make_record('Сообщение отправлено.')), (
+            'Проверьте, что прочие сообщения не прореживаются'
+        )
+
+    def test_rate_limit(self):
+        rate_limit = log_config.RateLimitFilter(limit=2, window=60)
+        passed = [
+            rate_limit.filter(make_record('Сбой', logging.ERROR))
+            for _ in range(4)
+        ]
+        assert passed == [True, True, False, False], (
+            'Проверьте, что повторы одного сообщения ограничиваются'
+        )
+
+    def test_queue_handler_does_not_block(self):
+        handler = log_config.DroppingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record('первое'))
+        handler.handle(make_record('второе'))
+        assert handler.dropped == 1, (
+            'Проверьте, что при переполнении очереди запись '
+            'отбрасывается без ожидания'
+        )
@@ -0,0 +1,81 @@
+import time
+import urllib.request
+
+import pytest
+
+import exceptions
+import metrics
+
+
+class TestMetrics:
+
+    def test_timed_records_latency_and_errors(self):
+        @metrics.timed('test_stage')
+        def stage(fail):
+            if fail:
+                raise exceptions.NotOkStatusCodeError('500')
+            return 'ok'
+
+        histogram = metrics.REGISTRY.histogram('test_stage')
+        _, _, before = histogram.snapshot()
+        assert stage(False) == 'ok'
+        with pytest.raises(exceptions.NotOkStatusCodeError):
+            stage(True)
+        _, _, after = histogram.snapshot()
+        assert after - before == 2, (
+            'Проверьте, что длительность записывается для каждого вызова'
+        )
+        assert metrics.REGISTRY.errors[
+            ('test_stage', 'NotOkStatusCodeError')
+        ] >= 1, (
+            'Проверьте, что исключения этапа учитываются по их классу'
+        )
+
+    def test_deadline_overrun_counted(self):
+        @metrics.timed('slow_stage', deadline=0.001)
+        def stage(delay):
+            time.sleep(delay)
+
+        stage(0)
+        assert 'slow_stage' not in metrics.REGISTRY.overruns
+        stage(0.01)
+        assert metrics.REGISTRY.overruns['slow_stage'] == 1, (
+            'Проверьте, что вызовы дольше отведенного времени учитываются'
+        )
+        assert (
+            'homework_bot_deadline_exceeded_total{stage="slow_stage"} 1'
+            in metrics.REGISTRY.render()
+        )
+
+    def test_stage_functions_keep_signature(self):
+        import homework
+        import utils
+
+        utils.check_function(homework, 'parse_status', 1)
+        utils.check_function(homework, 'fetch_api_answer', 2)
+
+    def test_render_prometheus(self):
+        registry = metrics.Registry()
+        registry.histogram('parse_status').observe(0.003)
+        registry.count_error('send_message', exceptions.SendingMessageReportError())
+        text = registry.render()
+        name = 'homework_bot_stage_duration_seconds'
+        assert f'{name}_bucket{{stage="parse_status",le="0.005"}} 1' in text
+        assert f'{name}_count{{stage="parse_status"}} 1' in text
+        assert (
+            'homework_bot_errors_total{stage="send_message",'
+            'exception="SendingMessageReportError"} 1'
+        ) in text
+
+    def test_metrics_server(self):
+        server = metrics.start_metrics_server(0)
+        port = server.server_address[1]
+        try:
+            with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics'
+            ) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'homework_bot_stage_duration_seconds' in body
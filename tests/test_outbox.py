@@ -0,0 +1,40 @@
+from outbox import Outbox
+
+
+class TestOutbox:
+
+    def test_batch_in_order(self, tmp_path):
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        outbox.add(1, 'первое')
+        outbox.add('@channel', 'второе')
+        outbox.add(1, 'третье')
+        entries = outbox.batch(2)
+        assert [entry[1:3] for entry in entries] == [
+            (1, 'первое'), ('@channel', 'второе')
+        ], 'Проверьте, что записи отдаются в порядке добавления'
+        assert outbox.chats() == {1, '@channel'}
+        outbox.record_attempt([entries[0][0]])
+        outbox.remove([entries[1][0]])
+        assert len(outbox) == 2
+        assert outbox.batch(1)[0][3] == 1
+        outbox.close()
+
+    def test_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / 'outbox.sqlite3')
+        retired = Outbox(path, chats=[1, 2])
+        retired.add(1, 'первое')
+        retired.add(2, 'второе')
+        retired.close()
+        owner = Outbox(path, chats=[2, 3])
+        owner.add(3, 'третье')
+        assert owner.chats() == {2, 3}, (
+            'Проверьте, что outbox видит только чаты своего процесса'
+        )
+        assert [text for _, _, text, _ in owner.batch(10)] == [
+            'второе', 'третье'
+        ], (
+            'Проверьте, что сообщения чата переходят к его новому владельцу'
+        )
+        assert len(owner) == 2
+        assert len(Outbox(path)) == 3
+        owner.close()
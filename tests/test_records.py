@@ -0,0 +1,53 @@
+import sys
+
+import pytest
+
+import exceptions
+from records import Homework, validate_homeworks
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+class TestValidateHomeworks:
+
+    def test_keeps_only_used_fields(self):
+        [record] = validate_homeworks([{
+            'id': 1,
+            'homework_name': 'hw1',
+            'status': 'approved',
+            'date_updated': '2022-01-01T10:00:00Z',
+            'reviewer_comment': 'Отлично!' * 100,
+            'lesson_name': 'Итоговый проект',
+        }], STATUSES)
+        assert record == Homework('hw1', 'approved', 1, '2022-01-01T10:00:00Z')
+        assert not hasattr(record, '__dict__'), (
+            'Проверьте, что запись не хранит лишних полей'
+        )
+        assert sys.getsizeof(record) < sys.getsizeof({'id': 1}), (
+            'Проверьте, что запись компактнее словаря'
+        )
+
+    def test_dict_access(self):
+        record = Homework('hw1', 'approved')
+        assert record['homework_name'] == 'hw1'
+        assert record.get('id', 'hw1') == 'hw1'
+        with pytest.raises(KeyError):
+            record['id']
+
+    @pytest.mark.parametrize('homeworks, error', [
+        ({'homework_name': 'hw1'}, exceptions.IncorrectTypeError),
+        (['hw1'], exceptions.IncorrectTypeError),
+        ([{'status': 'approved'}], KeyError),
+        ([{'homework_name': 'hw1'}], exceptions.UnknownHomeworkStatus),
+        (
+            [{'homework_name': 'hw1', 'status': 'unknown'}],
+            exceptions.UndocumentedHomeworkStatusError,
+        ),
+    ])
+    def test_errors(self, homeworks, error):
+        with pytest.raises(error):
+            validate_homeworks(homeworks, STATUSES)
+
+    def test_records_pass_through(self):
+        record = Homework('hw1', 'approved')
+        assert validate_homeworks([record], STATUSES)[0] is record
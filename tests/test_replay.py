@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timezone
+
+from benchmarks import replay
+
+DAY = 24 * 60 * 60
+
+
+def recorded_responses(days):
+    responses = []
+    start = 1640995200
+    for day in range(days):
+        now = start + day * DAY
+        status = ('reviewing', 'rejected', 'approved')[day % 3]
+        responses.append({
+            'homeworks': [{
+                'id': day // 3,
+                'homework_name': f'hw{day // 3}',
+                'status': status,
+                'date_updated': datetime.fromtimestamp(
+                    now, timezone.utc
+                ).isoformat(),
+            }],
+            'current_date': now,
+        })
+    return responses
+
+
+class TestReplay:
+
+    def test_replay_reports_delivery(self, tmp_path):
+        import homework
+
+        client = homework.API_CLIENT
+        responses = recorded_responses(30)
+        path = tmp_path / 'recording.jsonl'
+        path.write_text(
+            '\n'.join(json.dumps(response) for response in responses),
+            encoding='UTF-8',
+        )
+        report = replay.run(replay.parse_args([str(path), '--seed', '1']))
+        assert homework.API_CLIENT is client, (
+            'Проверьте, что после прогона API_CLIENT восстанавливается'
+        )
+        assert report['simulated_seconds'] >= 29 * DAY
+        assert report['elapsed_seconds'] < 29 * DAY
+        assert report['transitions'] == 30
+        assert report['notified_transitions'] == 30, (
+            'Проверьте, что бот замечает каждый переход из записи'
+        )
+        assert report['messages_sent'] == 30
+        assert report['api_calls'] > 30
+        assert 0 <= report['delay_p50_s'] <= report['delay_max_s']
+        assert report['delay_max_s'] <= homework.POLL_MAX_INTERVAL * 1.1, (
+            'Проверьте, что задержка уведомления не превышает интервал опроса'
+        )
+        assert replay.replay(responses, seed=1) == replay.replay(
+            responses, seed=1
+        ), 'Проверьте, что прогон с тем же seed воспроизводим'
+
+    def test_timeline_returns_latest_changes(self):
+        timeline = replay.Timeline([
+            {'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+            ], 'current_date': 100},
+            {'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+            ], 'current_date': 200},
+        ])
+        assert [
+            record['status'] for record in timeline.changes(0, 150)
+        ] == ['reviewing']
+        assert [
+            (record['id'], record['status'])
+            for record in timeline.changes(150, 250)
+        ] == [(2, 'reviewing'), (1, 'approved')]
+        assert timeline.changes(250, 300) == []
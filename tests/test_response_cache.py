@@ -0,0 +1,185 @@
+import json
+import multiprocessing
+import threading
+import time
+from http import HTTPStatus
+
+import response_cache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryCache:
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = response_cache.MemoryCache(ttl=30, clock=clock)
+        cache.set('key', {'homeworks': []})
+        assert cache.get('key') == {'homeworks': []}
+        clock.now += 30
+        assert cache.get('key') is None, (
+            'Проверьте, что устаревший ответ не отдается из кэша'
+        )
+
+    def test_lru_eviction(self):
+        cache = response_cache.MemoryCache(ttl=30, max_entries=2)
+        cache.set('a', {'value': 1})
+        cache.set('b', {'value': 2})
+        cache.get('a')
+        cache.set('c', {'value': 3})
+        assert cache.get('b') is None, (
+            'Проверьте, что вытесняется давно не читавшаяся запись'
+        )
+        assert cache.get('a') == {'value': 1}
+        assert len(cache) == 2
+
+    def test_single_upstream_request(self):
+        cache = response_cache.MemoryCache(ttl=30)
+        calls = []
+        barrier = threading.Barrier(5)
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'homeworks': []}
+
+        def subscriber():
+            barrier.wait()
+            cache.get_or_fetch('key', fetch)
+
+        threads = [threading.Thread(target=subscriber) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, (
+            'Проверьте, что одновременные подписчики получают ответ '
+            'одного запроса'
+        )
+
+    def test_errors_are_not_cached(self):
+        cache = response_cache.MemoryCache(ttl=30)
+
+        def failing():
+            raise ValueError
+
+        try:
+            cache.get_or_fetch('key', failing)
+        except ValueError:
+            pass
+        assert cache.get('key') is None
+        assert not cache.key_locks
+
+
+def store_in_child(cache):
+    parent_connection = cache.connection
+    cache.set('child', {'value': 2})
+    if cache.connection is parent_connection:
+        raise SystemExit(1)
+    assert cache.get('parent') == {'value': 1}
+
+
+class TestSqliteCache:
+
+    def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / 'cache.sqlite3')
+        first = response_cache.SqliteCache(path, ttl=30)
+        second = response_cache.SqliteCache(path, ttl=30)
+        first.set('key', {'homeworks': [{'status': 'approved'}]})
+        assert second.get('key') == {'homeworks': [{'status': 'approved'}]}, (
+            'Проверьте, что ответ виден другим экземплярам кэша'
+        )
+        first.close()
+        second.close()
+
+    def test_stores_streamed_records(self, tmp_path):
+        from records import Homework
+
+        cache = response_cache.SqliteCache(str(tmp_path / 'cache.sqlite3'))
+        cache.set('key', {'homeworks': [Homework('hw', 'approved', 1)]})
+        assert cache.get('key') == {'homeworks': [
+            {'id': 1, 'homework_name': 'hw', 'status': 'approved',
+             'date_updated': ''},
+        ]}, 'Проверьте, что записи потокового разбора сохраняются в кэш'
+        cache.close()
+
+    def test_connection_per_process(self, tmp_path):
+        cache = response_cache.SqliteCache(str(tmp_path / 'cache.sqlite3'))
+        assert cache.connection is None, (
+            'Проверьте, что соединение не открывается до первого обращения'
+        )
+        cache.set('parent', {'value': 1})
+        parent_connection = cache.connection
+        process = multiprocessing.get_context('fork').Process(
+            target=store_in_child, args=(cache,)
+        )
+        process.start()
+        process.join(10)
+        assert process.exitcode == 0, (
+            'Проверьте, что после fork воркер открывает свое соединение'
+        )
+        assert cache.connection is parent_connection
+        assert cache.get('child') == {'value': 2}
+        cache.close()
+
+    def test_ttl_and_eviction(self, tmp_path):
+        clock = FakeClock()
+        cache = response_cache.SqliteCache(
+            str(tmp_path / 'cache.sqlite3'), ttl=30, max_entries=2,
+            clock=clock,
+        )
+        cache.set('a', {'value': 1})
+        clock.now += 1
+        cache.set('b', {'value': 2})
+        clock.now += 1
+        cache.get('a')
+        clock.now += 1
+        cache.set('c', {'value': 3})
+        assert cache.get('b') is None
+        assert cache.get('a') == {'value': 1}
+        clock.now += 30
+        assert cache.get('c') is None
+        cache.close()
+
+    def test_cache_key_hides_token(self):
+        key = response_cache.cache_key('OAuth secret', 0)
+        assert 'secret' not in key
+        assert key != response_cache.cache_key('OAuth secret', 1)
+
+
+class TestFetchWithCache:
+
+    def test_one_request_per_token_and_date(self, monkeypatch):
+        import homework
+
+        calls = []
+
+        class Response:
+            status_code = HTTPStatus.OK
+            headers = {}
+            content = json.dumps(
+                {'homeworks': [], 'current_date': 1}
+            ).encode()
+
+        def get(**kwargs):
+            calls.append(kwargs['headers']['Authorization'])
+            return Response()
+
+        monkeypatch.setattr(homework.API_CLIENT, 'get', get)
+        monkeypatch.setattr(
+            homework, 'RESPONSE_CACHE', response_cache.MemoryCache(ttl=30)
+        )
+        headers = {'Authorization': 'OAuth token'}
+        homework.fetch_api_answer(0, headers)
+        homework.fetch_api_answer(0, headers)
+        homework.fetch_api_answer(0, {'Authorization': 'OAuth other'})
+        assert calls == ['OAuth token', 'OAuth other'], (
+            'Проверьте, что подписчики одного токена разделяют ответ API'
+        )
@@ -0,0 +1,105 @@
+import scheduler
+
+
+class TestAdaptiveScheduler:
+
+    def make_scheduler(self):
+        return scheduler.AdaptiveScheduler(
+            min_interval=60, max_interval=3600,
+            base_interval=600, reviewing_interval=120, backoff_factor=2,
+        )
+
+    def test_reviewing_tightens_interval(self):
+        poll = self.make_scheduler()
+        poll.observe('hw', 'reviewing')
+        assert poll.next_delay() == 120, (
+            'Проверьте, что при работе на проверке интервал сокращается'
+        )
+        assert poll.next_delay() == 120, (
+            'Проверьте, что интервал остается коротким, '
+            'пока работа на проверке'
+        )
+
+    def test_idle_backoff_bounded(self):
+        poll = self.make_scheduler()
+        delays = [poll.next_delay() for _ in range(5)]
+        assert delays == [1200, 2400, 3600, 3600, 3600], (
+            'Проверьте, что при простое интервал растет '
+            'экспоненциально до верхней границы'
+        )
+        poll.observe('hw', 'approved')
+        assert poll.next_delay() == 600, (
+            'Проверьте, что при изменении статуса интервал сбрасывается'
+        )
+
+    def test_retry_after_honored(self):
+        poll = self.make_scheduler()
+        poll.observe('hw', 'reviewing')
+        assert poll.next_delay(retry_after=7200) == 7200, (
+            'Проверьте, что подсказка сервера Retry-After выполняется'
+        )
+
+    def test_parse_retry_after(self):
+        assert scheduler.parse_retry_after('120') == 120
+        assert scheduler.parse_retry_after(None) is None
+        assert scheduler.parse_retry_after('garbage') is None
+        assert scheduler.parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:00 GMT'
+        ) == 0
+
+    def test_open_breaker_delays_poll(self):
+        from circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        breaker.open_until = breaker.clock() + 5000
+        poll = scheduler.AdaptiveScheduler(breaker=breaker)
+        assert poll.next_delay() >= 4999, (
+            'Проверьте, что планировщик не опрашивает API, '
+            'пока предохранитель разомкнут'
+        )
+
+    def test_staggered_phase(self):
+        phases = [
+            scheduler.AdaptiveScheduler(key=f'student{number}').initial_delay()
+            for number in range(1000)
+        ]
+        assert all(0 <= delay < scheduler.BASE_INTERVAL for delay in phases)
+        buckets = [0] * 10
+        for delay in phases:
+            buckets[int(delay / scheduler.BASE_INTERVAL * 10)] += 1
+        assert min(buckets) > 50, (
+            'Проверьте, что первые опросы аккаунтов распределены '
+            'по интервалу равномерно'
+        )
+        assert scheduler.AdaptiveScheduler(
+            key='student1'
+        ).initial_delay() == phases[1], (
+            'Проверьте, что фаза аккаунта не меняется между запусками'
+        )
+        assert scheduler.AdaptiveScheduler().initial_delay() == 0
+
+    def test_jitter_bounds(self):
+        delays = set()
+        for _ in range(50):
+            poll = scheduler.AdaptiveScheduler(
+                min_interval=60, max_interval=3600, base_interval=600,
+                jitter=0.1,
+            )
+            poll.observe('hw', 'approved')
+            delays.add(poll.next_delay())
+        assert all(540 <= delay <= 660 for delay in delays)
+        assert len(delays) > 1, (
+            'Проверьте, что интервалы опроса различаются на случайную долю'
+        )
+
+
+class TestTokenBucket:
+
+    def test_token_bucket(self):
+        bucket = scheduler.TokenBucket(rate=10, capacity=2)
+        assert bucket.consume() == 0
+        assert bucket.consume() == 0
+        assert bucket.consume() > 0, (
+            'Проверьте, что после исчерпания токенов возвращается ожидание'
+        )
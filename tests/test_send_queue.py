@@ -0,0 +1,172 @@
+import threading
+
+import exceptions
+from send_queue import SendQueue
+
+
+class TestSendQueue:
+
+    def test_coalesce_pending_messages(self):
+        sent = []
+        send_queue = SendQueue(lambda chat_id, text: sent.append(
+            (chat_id, text)
+        ))
+        send_queue.put(1, 'первое')
+        send_queue.put(1, 'второе')
+        send_queue.put(2, 'другой чат')
+        send_queue.start()
+        send_queue.stop()
+        assert sorted(sent) == [
+            (1, 'первое\n\nвторое'), (2, 'другой чат')
+        ], (
+            'Проверьте, что накопившиеся для чата сообщения '
+            'отправляются одним сообщением'
+        )
+
+    def test_retry_after_requeues(self):
+        sent = []
+        done = threading.Event()
+
+        def send(chat_id, text):
+            if not sent:
+                sent.append(None)
+                raise exceptions.SendingRetryAfterError('429', 0.01)
+            sent.append(text)
+            done.set()
+
+        send_queue = SendQueue(send)
+        send_queue.start()
+        send_queue.put(1, 'сообщение')
+        assert done.wait(1), (
+            'Проверьте, что после ответа 429 сообщение отправляется повторно'
+        )
+        send_queue.stop()
+        assert sent == [None, 'сообщение']
+
+    def test_failed_send_is_redelivered_in_order(self, monkeypatch,
+                                                 tmp_path):
+        import send_queue as send_queue_module
+        from outbox import Outbox
+
+        monkeypatch.setattr(send_queue_module, 'REDELIVERY_BASE', 0.01)
+        sent = []
+        failures = [1]
+        done = threading.Event()
+
+        def send(chat_id, text):
+            if failures[0]:
+                failures[0] -= 1
+                raise exceptions.SendingMessageReportError('Сбой')
+            sent.append(text)
+            if 'третье' in text:
+                done.set()
+
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        send_queue = SendQueue(send, chat_interval=0, outbox=outbox)
+        send_queue.start()
+        send_queue.put(1, 'первое')
+        send_queue.put(1, 'второе')
+        send_queue.put(1, 'третье')
+        assert done.wait(2), (
+            'Проверьте, что неотправленное сообщение доставляется повторно'
+        )
+        send_queue.stop()
+        assert '\n\n'.join(sent).split('\n\n') == [
+            'первое', 'второе', 'третье'
+        ], 'Проверьте, что сообщения доставляются в исходном порядке'
+        assert len(outbox) == 0
+
+    def test_outbox_survives_restart(self, tmp_path):
+        from outbox import Outbox
+
+        path = str(tmp_path / 'outbox.sqlite3')
+        Outbox(path).add(7, 'отложенное')
+        sent = []
+        done = threading.Event()
+
+        def send(chat_id, text):
+            sent.append((chat_id, text))
+            done.set()
+
+        send_queue = SendQueue(send, outbox=Outbox(path))
+        send_queue.start()
+        assert done.wait(1), (
+            'Проверьте, что сообщения из outbox отправляются после запуска'
+        )
+        send_queue.stop()
+        assert sent == [(7, 'отложенное')]
+
+    def test_refresh_runs_latest_update_in_sender_thread(self):
+        calls = []
+        send_queue = SendQueue(lambda chat_id, text: calls.append(text))
+        send_queue.refresh(1, lambda: calls.append('старое'))
+        send_queue.refresh(1, lambda: calls.append(
+            threading.current_thread().name
+        ))
+        send_queue.start()
+        send_queue.stop()
+        assert calls == ['send-queue'], (
+            'Проверьте, что обновление выполняет поток очереди и из '
+            'ждущих обновлений чата остается последнее'
+        )
+
+    def test_delayed_update_runs_again(self):
+        from dashboard import Dashboard
+        from records import Homework
+
+        sent = threading.Event()
+        edited = threading.Event()
+
+        class MockBot:
+
+            def send_message(self, chat_id, text, **kwargs):
+                sent.set()
+                return type('Message', (), {'message_id': 1})
+
+            def pin_chat_message(self, *args, **kwargs):
+                pass
+
+            def edit_message_text(self, text, **kwargs):
+                edited.set()
+
+        dashboard = Dashboard(MockBot(), 1, {'approved': 'да',
+                                             'reviewing': 'нет'},
+                              min_interval=0.2)
+        send_queue = SendQueue(lambda chat_id, text: None, chat_interval=0)
+        send_queue.start()
+        dashboard.observe([Homework('hw1', 'reviewing')])
+        send_queue.refresh(1, dashboard.update)
+        assert sent.wait(1)
+        dashboard.observe([Homework('hw1', 'approved')])
+        send_queue.refresh(1, dashboard.update)
+        assert edited.wait(2), (
+            'Проверьте, что отложенное из-за min_interval обновление '
+            'выполняется без нового вызова refresh'
+        )
+        send_queue.stop()
+
+    def test_stop_moves_pending_to_outbox(self, tmp_path):
+        from outbox import Outbox
+
+        release = threading.Event()
+        started = threading.Event()
+
+        def send(chat_id, text):
+            started.set()
+            release.wait(1)
+
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        send_queue = SendQueue(send, outbox=outbox)
+        send_queue.start()
+        send_queue.put(1, 'первое')
+        assert started.wait(1)
+        send_queue.put(2, 'второе')
+        send_queue.put(3, 'третье')
+        send_queue.stop(timeout=0.1)
+        release.set()
+        assert [
+            (chat_id, text) for _, chat_id, text, _ in outbox.batch(10)
+        ] == [(2, 'второе'), (3, 'третье')], (
+            'Проверьте, что при остановке неотправленные сообщения '
+            'откладываются в outbox'
+        )
@@ -0,0 +1,68 @@
+from status_index import StatusIndex
+
+
+class TestStatusIndex:
+
+    def test_transitions(self):
+        index = StatusIndex()
+        homework = {
+            'id': 1, 'homework_name': 'hw', 'status': 'reviewing',
+            'date_updated': '2022-01-01T10:00:00Z',
+        }
+        assert index.update(homework), (
+            'Проверьте, что новая работа считается переходом статуса'
+        )
+        assert not index.update(dict(homework)), (
+            'Проверьте, что повтор того же статуса не считается переходом'
+        )
+        approved = dict(
+            homework, status='approved', date_updated='2022-01-02T10:00:00Z'
+        )
+        assert index.update(approved)
+        assert index.get(homework) == ('approved', '2022-01-02T10:00:00Z')
+
+    def test_stale_record_ignored(self):
+        index = StatusIndex()
+        index.update({
+            'id': 1, 'homework_name': 'hw', 'status': 'approved',
+            'date_updated': '2022-01-02T10:00:00Z',
+        })
+        assert not index.update({
+            'id': 1, 'homework_name': 'hw', 'status': 'reviewing',
+            'date_updated': '2022-01-01T10:00:00Z',
+        }), (
+            'Проверьте, что устаревшая запись не считается переходом'
+        )
+
+    def test_same_status_newer_date(self):
+        index = StatusIndex()
+        record = {
+            'homework_name': 'hw', 'status': 'rejected',
+            'date_updated': '2022-01-01T10:00:00Z',
+        }
+        index.update(record)
+        assert index.update(
+            dict(record, date_updated='2022-01-03T10:00:00Z')
+        ), (
+            'Проверьте, что повторная проверка с тем же вердиктом '
+            'считается переходом'
+        )
+
+    def test_history_uses_date_updated(self):
+        from history import TransitionHistory
+
+        history = TransitionHistory()
+        index = StatusIndex(history)
+        index.update({
+            'id': 1, 'homework_name': 'hw', 'status': 'reviewing',
+            'date_updated': '2022-01-01T10:00:00Z',
+        })
+        index.update({'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'})
+        transitions = history.recent(2)
+        assert transitions[0] == (1641031200.0, 'hw', 'reviewing'), (
+            'Проверьте, что переход записывается в историю со временем '
+            'из date_updated'
+        )
+        assert transitions[1][0] > transitions[0][0], (
+            'Проверьте, что без date_updated используется текущее время'
+        )
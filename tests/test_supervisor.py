@@ -0,0 +1,211 @@
+import json
+import multiprocessing
+import time
+
+import supervisor
+
+
+def sleeping_worker(worker_id, entries, global_rate, rates):
+    time.sleep(60)
+
+
+def crashing_worker(worker_id, entries, global_rate, rates):
+    raise SystemExit(1)
+
+
+def write_accounts(path, count):
+    path.write_text(json.dumps([
+        {'name': f'student{number}', 'practicum_token': 't', 'chat_id': 1}
+        for number in range(count)
+    ]), encoding='UTF-8')
+
+
+def pids(manager):
+    return {
+        worker_id: process.pid
+        for worker_id, process in manager.processes.items()
+    }
+
+
+class TestHashRing:
+
+    def test_distribution(self):
+        ring = supervisor.HashRing(range(4))
+        shards = {}
+        for number in range(4000):
+            node = ring.node_for(f'student{number}')
+            shards[node] = shards.get(node, 0) + 1
+        assert set(shards) == {0, 1, 2, 3}
+        assert min(shards.values()) > 500, (
+            'Проверьте, что аккаунты распределяются по воркерам равномерно'
+        )
+
+    def test_adding_node_moves_few_keys(self):
+        before = supervisor.HashRing(range(4))
+        after = supervisor.HashRing(range(5))
+        keys = [f'student{number}' for number in range(4000)]
+        moved = [
+            key for key in keys if before.node_for(key) != after.node_for(key)
+        ]
+        assert len(moved) < len(keys) / 3, (
+            'Проверьте, что при добавлении воркера переезжает малая часть '
+            'аккаунтов'
+        )
+        assert all(after.node_for(key) == 4 for key in moved), (
+            'Проверьте, что аккаунты переезжают только на новый воркер'
+        )
+
+
+class TestSupervisor:
+
+    def test_reload_restarts_only_changed_workers(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        write_accounts(path, 20)
+        manager = supervisor.Supervisor(str(path), 3, sleeping_worker)
+        try:
+            manager.reload()
+            assert sum(map(len, manager.shards.values())) == 20
+            before = pids(manager)
+            write_accounts(path, 21)
+            manager.reload()
+            after = pids(manager)
+            restarted = [
+                worker_id for worker_id in after
+                if before.get(worker_id) != after[worker_id]
+            ]
+            assert len(restarted) == 1, (
+                'Проверьте, что перезапускается только воркер, '
+                'получивший новый аккаунт'
+            )
+        finally:
+            manager.stop()
+        assert not manager.processes
+
+    def test_resize_sends_rate_without_restart(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        write_accounts(path, 10)
+        manager = supervisor.Supervisor(str(path), 2, sleeping_worker)
+        try:
+            manager.reload()
+            shards = dict(manager.shards)
+            before = pids(manager)
+            manager.resize(3)
+            kept = [
+                worker_id for worker_id in before
+                if shards[worker_id] == manager.shards[worker_id]
+            ]
+            assert kept, 'Распределение в тесте должно сохранить воркер'
+            assert all(
+                pids(manager)[worker_id] == before[worker_id]
+                for worker_id in kept
+            ), (
+                'Проверьте, что воркер с прежними аккаунтами не '
+                'перезапускается при изменении числа воркеров'
+            )
+            assert manager.global_rate == supervisor.GLOBAL_RATE / 3
+            assert set(manager.rates.values()) == {manager.global_rate}, (
+                'Проверьте, что после изменения числа воркеров '
+                'лимит отправки делится заново'
+            )
+        finally:
+            manager.stop()
+
+    def test_worker_follows_rate(self, monkeypatch):
+        limits = []
+        monkeypatch.setattr(supervisor.homework, 'API_RATE_LIMIT', 10)
+        monkeypatch.setattr(
+            supervisor.homework.API_CLIENT, 'limit_rate', limits.append
+        )
+        send_queue = supervisor.SendQueue(lambda chat_id, text: None)
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        supervisor.follow_rate(reader, send_queue)
+        writer.send(supervisor.GLOBAL_RATE / 2)
+        writer.close()
+        deadline = time.monotonic() + 5
+        while (
+            send_queue.bucket.rate == supervisor.GLOBAL_RATE
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        assert limits == [5], (
+            'Проверьте, что воркер применяет долю лимита из канала'
+        )
+        assert send_queue.bucket.rate == supervisor.GLOBAL_RATE / 2
+
+    def test_terminated_worker_saves_state(self, monkeypatch, tmp_path):
+        import async_poller
+        import homework
+        from history import HistoryStore, TransitionHistory
+
+        history_path = str(tmp_path / 'history.sqlite3')
+        start_history_snapshots = homework.start_history_snapshots
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '123:token')
+        monkeypatch.setattr(
+            homework, 'OUTBOX_PATH', str(tmp_path / 'outbox.sqlite3')
+        )
+        monkeypatch.setattr(
+            homework, 'start_history_snapshots',
+            lambda histories, path: start_history_snapshots(
+                histories, history_path
+            ),
+        )
+        monkeypatch.setattr(async_poller, 'open_checkpoints', lambda: None)
+        monkeypatch.setattr(
+            homework, 'fetch_api_answer',
+            lambda current_timestamp, headers: {
+                'homeworks': [], 'current_date': current_timestamp,
+            },
+        )
+        path = tmp_path / 'accounts.json'
+        write_accounts(path, 1)
+        manager = supervisor.Supervisor(str(path), 1)
+        try:
+            manager.reload()
+            process = manager.processes[0]
+            deadline = time.monotonic() + 10
+            while (
+                not (tmp_path / 'history.sqlite3').exists()
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.05)
+            time.sleep(1)
+        finally:
+            manager.stop()
+        assert process.exitcode == 0, (
+            'Проверьте, что воркер завершается по SIGTERM штатно'
+        )
+        history = TransitionHistory()
+        assert HistoryStore(history_path).load({'student0': history}) == 1, (
+            'Проверьте, что воркер, остановленный по SIGTERM, сохраняет '
+            'последний снимок истории'
+        )
+
+    def test_dead_worker_restarts(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(supervisor, 'RESTART_DELAY', 0)
+        path = tmp_path / 'accounts.json'
+        write_accounts(path, 1)
+        manager = supervisor.Supervisor(str(path), 1, crashing_worker)
+        try:
+            manager.reload()
+            [worker_id] = manager.processes
+            process = manager.processes[worker_id]
+            process.join(5)
+            manager.check()
+            assert manager.processes[worker_id] is not process, (
+                'Проверьте, что завершившийся воркер перезапускается'
+            )
+        finally:
+            manager.stop()
+
+    def test_bad_accounts_file_keeps_workers(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        write_accounts(path, 5)
+        manager = supervisor.Supervisor(str(path), 2, sleeping_worker)
+        try:
+            manager.reload()
+            before = pids(manager)
+            path.write_text('{}', encoding='UTF-8')
+            manager.reload()
+            assert pids(manager) == before
+        finally:
+            manager.stop()
@@ -0,0 +1,131 @@
+import http.client
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import exceptions
+import webhook
+
+
+@pytest.fixture
+def webhook_server():
+    received = []
+
+    def on_homeworks(account, homeworks):
+        if account not in (None, 'student'):
+            raise exceptions.MissingKeyError(account)
+        import homework
+        for record in homeworks:
+            homework.parse_status(record)
+        received.append((account, homeworks))
+
+    server = webhook.start_webhook_server(0, on_homeworks, secret='secret')
+    yield server, received
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, data, secret='secret'):
+    port = server.server_address[1]
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{port}{path}',
+        data=json.dumps(data).encode(),
+        headers={webhook.SECRET_HEADER: secret},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+class TestWebhook:
+
+    HOMEWORK = {'homework_name': 'hw', 'status': 'approved'}
+
+    def test_accepts_homework(self, webhook_server):
+        server, received = webhook_server
+        assert post(server, '/homeworks', self.HOMEWORK) == 202
+        assert post(server, '/homeworks/student', [self.HOMEWORK]) == 202
+        assert received == [
+            (None, [self.HOMEWORK]), ('student', [self.HOMEWORK])
+        ], (
+            'Проверьте, что принятые события передаются в обработчик'
+        )
+
+    def test_rejects_bad_secret(self, webhook_server):
+        server, received = webhook_server
+        assert post(server, '/homeworks', self.HOMEWORK, secret='x') == 401
+        assert not received
+
+    def test_rejects_invalid_homework(self, webhook_server):
+        server, received = webhook_server
+        invalid = {'homework_name': 'hw', 'status': 'unknown'}
+        assert post(server, '/homeworks', invalid) == 400, (
+            'Проверьте, что событие с недокументированным статусом '
+            'отклоняется'
+        )
+        assert post(server, '/homeworks/other', self.HOMEWORK) == 400
+        assert post(server, '/other', self.HOMEWORK) == 404
+
+    @pytest.mark.parametrize('length, status', [
+        (None, 411), ('abc', 400), ('-1', 400), (str(10 ** 9), 413),
+    ])
+    def test_rejects_bad_content_length(self, webhook_server, length,
+                                        status):
+        server, received = webhook_server
+        connection = http.client.HTTPConnection(
+            '127.0.0.1', server.server_address[1], timeout=5
+        )
+        connection.putrequest('POST', '/homeworks')
+        connection.putheader(webhook.SECRET_HEADER, 'secret')
+        if length is not None:
+            connection.putheader('Content-Length', length)
+        connection.endheaders()
+        assert connection.getresponse().status == status, (
+            'Проверьте, что неверный Content-Length отклоняется сразу'
+        )
+        connection.close()
+        assert received == []
+
+    def test_rejects_non_ascii_secret(self, webhook_server):
+        server, received = webhook_server
+        connection = http.client.HTTPConnection(
+            '127.0.0.1', server.server_address[1], timeout=5
+        )
+        body = json.dumps(self.HOMEWORK).encode()
+        connection.putrequest('POST', '/homeworks')
+        connection.putheader(webhook.SECRET_HEADER, 'секрет'.encode())
+        connection.putheader('Content-Length', str(len(body)))
+        connection.endheaders(body)
+        assert connection.getresponse().status == 401, (
+            'Проверьте, что секрет с не-ASCII символами отклоняется ответом '
+            '401, а не обрывает соединение'
+        )
+        connection.close()
+        assert received == []
+
+    def test_ingest_homeworks(self):
+        import homework
+        from status_index import StatusIndex
+
+        class MockSendQueue:
+            sent = []
+
+            def put(self, chat_id, text):
+                self.sent.append(text)
+
+        send_queue = MockSendQueue()
+        status_index = StatusIndex()
+        homework.ingest_homeworks(
+            status_index, send_queue, None, [self.HOMEWORK]
+        )
+        homework.ingest_homeworks(
+            status_index, send_queue, None, [self.HOMEWORK]
+        )
+        assert len(send_queue.sent) == 1, (
+            'Проверьте, что событие без смены статуса не отправляется'
+        )
@@ -0,0 +1,155 @@
+import hmac
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+from urllib.parse import unquote, urlsplit
+
+import decoders
+import exceptions
+
+WEBHOOK_PATH = '/homeworks'
+SECRET_HEADER = 'X-Webhook-Secret'
+MAX_BODY_SIZE = 1024 * 1024
+
+VALIDATION_ERRORS = (
+    KeyError,
+    exceptions.UnknownHomeworkStatus,
+    exceptions.UndocumentedHomeworkStatusError,
+    exceptions.IncorrectTypeError,
+    exceptions.MissingKeyError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_events(events: object) -> List[dict]:
+    """Приводим принятое событие к списку записей homeworks."""
+    if isinstance(events, dict) and 'homeworks' in events:
+        events = events['homeworks']
+    if isinstance(events, dict):
+        events = [events]
+    if not isinstance(events, list) or not all(
+        isinstance(event, dict) for event in events
+    ):
+        raise exceptions.IncorrectTypeError(
+            'Ожидаемый тип данных: запись или список домашних работ.'
+        )
+    return events
+
+
+def secret_matches(header: str, secret: str) -> bool:
+    """Сравниваем секрет с заголовком за постоянное время.
+
+    http.server декодирует заголовки как latin-1, поэтому сравниваются
+    исходные байты заголовка с секретом в UTF-8.
+    """
+    try:
+        received = header.encode('latin-1')
+    except UnicodeEncodeError:
+        return False
+    return hmac.compare_digest(received, secret.encode())
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Прием событий о смене статуса домашней работы.
+
+    POST /homeworks принимает запись в формате элемента списка homeworks
+    из ответа API (или список таких записей) для основного аккаунта,
+    POST /homeworks/<имя аккаунта> - для аккаунта из файла конфигурации.
+    """
+
+    def do_POST(self) -> None:
+        """Обрабатываем событие."""
+        path = urlsplit(self.path).path.rstrip('/')
+        if path == WEBHOOK_PATH:
+            account = None
+        elif path.startswith(WEBHOOK_PATH + '/'):
+            account = unquote(path[len(WEBHOOK_PATH) + 1:])
+        else:
+            self.reply(HTTPStatus.NOT_FOUND, 'Неизвестный адрес.')
+            return
+        secret = self.server.secret
+        if secret and not secret_matches(
+            self.headers.get(SECRET_HEADER, str()), secret
+        ):
+            self.reply(HTTPStatus.UNAUTHORIZED, 'Неверный секрет.')
+            return
+        length = self.content_length()
+        if length is None:
+            return
+        try:
+            homeworks = normalize_events(
+                decoders.decode(self.rfile.read(length))
+            )
+            self.server.on_homeworks(account, homeworks)
+        except decoders.DECODE_ERRORS:
+            self.reply(HTTPStatus.BAD_REQUEST, 'Недопустимый JSON.')
+            return
+        except VALIDATION_ERRORS as error:
+            logger.warning(f'Отклонено событие вебхука: {error}')
+            self.reply(HTTPStatus.BAD_REQUEST, str(error))
+            return
+        self.reply(HTTPStatus.ACCEPTED, accepted=len(homeworks))
+
+    def content_length(self) -> Optional[int]:
+        """Длина тела из Content-Length или None после ответа с ошибкой.
+
+        Без заголовка - 411, нечисловое или отрицательное значение - 400:
+        rfile.read(-1) ждал бы закрытия соединения клиентом.
+        """
+        value = self.headers.get('Content-Length')
+        if value is None:
+            self.reply(HTTPStatus.LENGTH_REQUIRED, 'Нужен Content-Length.')
+            return None
+        if not value.strip().isdigit():
+            self.reply(HTTPStatus.BAD_REQUEST, 'Неверный Content-Length.')
+            return None
+        length = int(value)
+        if length > MAX_BODY_SIZE:
+            self.reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Слишком много.')
+            return None
+        return length
+
+    def reply(
+        self, status: HTTPStatus, error: str = None, **fields
+    ) -> None:
+        """Отвечаем JSON-документом."""
+        if error is not None:
+            fields['error'] = error
+        body = json.dumps(fields, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Пишем запросы вебхука в журнал бота."""
+        logger.debug(f'Вебхук: {format % args}')
+
+
+def start_webhook_server(
+    port: int,
+    on_homeworks: Callable[[Optional[str], List[dict]], None],
+    host: str = '127.0.0.1',
+    secret: str = None,
+) -> ThreadingHTTPServer:
+    """Запускаем прием событий в фоновом потоке.
+
+    on_homeworks получает имя аккаунта (None для основного) и список
+    записей; исключения VALIDATION_ERRORS превращаются в ответ 400.
+    """
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    server.daemon_threads = True
+    server.on_homeworks = on_homeworks
+    server.secret = secret
+    threading.Thread(
+        target=server.serve_forever, name='webhook', daemon=True
+    ).start()
+    logger.info(
+        f'Прием событий о статусах: http://{host}:{port}{WEBHOOK_PATH}'
+    )
+    return server